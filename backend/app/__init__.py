@@ -1,13 +1,48 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_cors import CORS
 from app.config import config
+from app.auth import hashing, last_login, revocation
+from app import cache
 import os
 
 # Initialize extensions
 db = SQLAlchemy()
-migrate = Migrate()
+
+
+class MigrateCommands(click.Group):
+    """
+    The `flask db` command group, registered on every app
+
+    Flask-Migrate pulls in alembic and its templates, which is a good share
+    of startup time, and only these commands use it. It is set up the
+    first time the group resolves a subcommand; Migrate then replaces this
+    group with its own.
+    """
+
+    def __init__(self, app):
+        super().__init__('db', help='Perform database migrations.')
+        self.app = app
+
+    def load(self):
+        """Register Flask-Migrate; returns its db command group"""
+        from flask_migrate import Migrate
+
+        if 'migrate' not in self.app.extensions:
+            Migrate(self.app, db)
+        return self.app.cli.commands['db']
+
+    def list_commands(self, ctx):
+        return self.load().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self.load().get_command(ctx, name)
+
+
+def init_migrate(app):
+    """Register the `flask db` commands without importing Flask-Migrate"""
+    app.cli.add_command(MigrateCommands(app))
 
 
 def create_app(config_name=None):
@@ -18,21 +53,41 @@ def create_app(config_name=None):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    # Encode responses with the fast JSON provider (ISO datetimes, orjson if installed)
+    from app import jsonprovider
+    
+    jsonprovider.init_app(app)
+    
     # Initialize extensions with app
+    from app import database, writer
+    
+    database.configure_engine_options(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    database.init_app(app)
+    writer.init_app(app)
+    init_migrate(app)
+    hashing.init_app(app)
+    cache.init_app(app)
+    revocation.init_app(app)
+    last_login.init_app(app)
     
     # Configure CORS
     CORS(app, resources={
         r"/api/*": {
             "origins": app.config['CORS_ORIGINS'],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "If-None-Match", "If-Modified-Since"],
             "supports_credentials": True,
-            "expose_headers": ["Content-Type", "Authorization"]
+            "expose_headers": ["Content-Type", "Authorization", "ETag", "Last-Modified"]
         }
     })
     
+    # Keep materialized user counts in step with ORM writes
+    from app import counters
+    
+    # Create the users_fts search index alongside the users table
+    from app import search
+    
     # Register blueprints
     from app.auth.routes import auth_bp
     from app.users.routes import users_bp
@@ -75,6 +130,22 @@ def create_app(config_name=None):
             'status': 404
         }, 404
     
+    @app.errorhandler(hashing.HashingQueueFull)
+    def hashing_busy(error):
+        return {
+            'error': 'Service Unavailable',
+            'message': 'Server is busy, please retry shortly',
+            'status': 503
+        }, 503, {'Retry-After': '1'}
+    
+    @app.errorhandler(writer.DatabaseBusy)
+    def database_busy(error):
+        return {
+            'error': 'Service Unavailable',
+            'message': 'Server is busy, please retry shortly',
+            'status': 503
+        }, 503, {'Retry-After': '1'}
+    
     @app.errorhandler(500)
     def internal_error(error):
         db.session.rollback()
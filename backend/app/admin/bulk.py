@@ -0,0 +1,115 @@
+"""
+Set-based status changes for the admin console
+
+A bulk request names its targets either by id or by a role/status filter.
+The targets are read in one SELECT, changed in one UPDATE and reported back
+per id. Bulk UPDATEs bypass the ORM mapper events, so the counters and
+refresh tokens are adjusted here in the same transaction.
+"""
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from app import db
+from app.auth import refresh
+from app.counters import VERSION, adjust_counters
+from app.models import User
+
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_FOUND = 'not_found'
+SELF = 'self'
+
+FILTER_FIELDS = ('role', 'status')
+
+
+class BulkRequestError(ValueError):
+    """Raised when a bulk request body is malformed or too large"""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+def target_criteria(data):
+    """
+    Translate a request body into WHERE criteria
+    Returns: (criteria, ids) where ids is None for filter requests
+    """
+    ids = data.get('ids')
+    filters = data.get('filter')
+    if (ids is None) == (filters is None):
+        raise BulkRequestError('Provide either ids or filter')
+
+    if ids is not None:
+        if (not isinstance(ids, list) or not ids
+                or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+            raise BulkRequestError('ids must be a non-empty list of integers')
+        ids = list(dict.fromkeys(ids))
+        return [User.id.in_(ids)], ids
+
+    if (not isinstance(filters, dict) or not filters
+            or set(filters) - set(FILTER_FIELDS)
+            or not all(isinstance(value, str) for value in filters.values())):
+        raise BulkRequestError(f'filter must contain only: {", ".join(FILTER_FIELDS)}')
+    return [getattr(User, field) == value for field, value in filters.items()], None
+
+
+def set_status(data, status, acting_user_id, limit):
+    """
+    Move every targeted user to status (caller commits)
+    Returns: (results, changed) where results is a list of {id, outcome} and
+    changed a list of (user_id, token_version) for the rows actually updated
+    """
+    criteria, ids = target_criteria(data)
+    if ids is not None and len(ids) > limit:
+        raise BulkRequestError(f'At most {limit} users can be changed at once')
+
+    rows = db.session.execute(
+        select(User.id, User.status).where(*criteria).limit(limit + 1)
+    ).all()
+    if len(rows) > limit:
+        raise BulkRequestError(f'At most {limit} users can be changed at once')
+
+    outcomes = {}
+    previous = {}
+    for user_id, current in rows:
+        if status == 'inactive' and user_id == acting_user_id:
+            outcomes[user_id] = SELF
+        elif current == status:
+            outcomes[user_id] = UNCHANGED
+        else:
+            previous[user_id] = current
+
+    changed = []
+    if previous:
+        values = {'status': status, 'updated_at': datetime.utcnow()}
+        if status == 'inactive':
+            # Deactivation also revokes every access token already issued
+            values['token_version'] = User.token_version + 1
+
+        # The status guard skips rows another request changed in the meantime
+        changed = db.session.execute(
+            update(User)
+            .where(User.id.in_(list(previous)), User.status != status)
+            .values(**values)
+            .returning(User.id, User.token_version),
+            execution_options={'synchronize_session': False}
+        ).all()
+
+        deltas = {f'status:{status}': len(changed), VERSION: 1}
+        for user_id, _ in changed:
+            key = f'status:{previous[user_id]}'
+            deltas[key] = deltas.get(key, 0) - 1
+        adjust_counters(db.session.connection(), deltas)
+
+        if status == 'inactive':
+            refresh.revoke_for_users([user_id for user_id, _ in changed])
+
+    changed_ids = {user_id for user_id, _ in changed}
+    for user_id in previous:
+        outcomes[user_id] = UPDATED if user_id in changed_ids else UNCHANGED
+
+    order = ids if ids is not None else sorted(user_id for user_id, _ in rows)
+    results = [{'id': user_id, 'outcome': outcomes.get(user_id, NOT_FOUND)} for user_id in order]
+    return results, changed
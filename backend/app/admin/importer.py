@@ -0,0 +1,186 @@
+"""
+Streaming bulk user import
+
+Rows are read one at a time from CSV or NDJSON, validated with the signup
+validators and collected into batches. Each batch checks its emails against
+the users table in one query, hashes its passwords across the hashing pool
+and is written through the write queue with a single executemany INSERT. Core
+inserts bypass the ORM mapper events, so counters are adjusted per batch;
+the users_fts triggers fire in the database as usual.
+
+Progress is reported as a checkpoint (the number of input rows fully
+handled), so an interrupted import can be restarted with start=checkpoint.
+"""
+import csv
+import json
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.auth import hashing
+from app.counters import VERSION, adjust_counters, counter_keys
+from app.models import User
+from app.schemas import IMPORT_ROW
+from app.writer import write
+
+FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(name=None, content_type=None):
+    """Guess the input format from a file name or content type, or None"""
+    name = (name or '').lower()
+    content_type = (content_type or '').lower()
+    if name.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    return None
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (row_number, row, error) for each record of a text stream
+    row is None when the record itself could not be parsed
+    """
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, row, None
+        return
+
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield number, None, 'Each line must be a JSON object'
+            continue
+        yield number, row, None
+
+
+def validate_row(row):
+    """
+    Validate and normalize one input row
+    Returns: (values, error_message)
+    """
+    row = {key: value for key, value in row.items() if key and isinstance(value, str)}
+
+    values, error = IMPORT_ROW.validate(row)
+    if error:
+        return None, error.message
+    return values, None
+
+
+def _existing_emails(emails):
+    return set(db.session.execute(
+        select(func.lower(User.email)).where(func.lower(User.email).in_(emails))
+    ).scalars())
+
+
+def _insert_records(records):
+    """
+    Write unit: insert hashed user records, skipping emails registered since they were checked
+    Returns: (emails that were skipped, number of rows inserted)
+    """
+    taken = _existing_emails([record['email'] for record in records])
+    records = [record for record in records if record['email'] not in taken]
+    if not records:
+        return taken, 0
+
+    db.session.execute(insert(User.__table__), records)
+
+    deltas = {VERSION: 1}
+    for record in records:
+        for key in counter_keys(record['role'], record['status']):
+            deltas[key] = deltas.get(key, 0) + 1
+    adjust_counters(db.session.connection(), deltas)
+    return taken, len(records)
+
+
+def _insert_batch(batch, executor):
+    """
+    Hash, insert and commit one batch of validated rows
+    Returns: (emails that were already registered, number of rows inserted)
+    """
+    existing = _existing_emails([values['email'] for _, values in batch])
+    batch = [(number, values) for number, values in batch if values['email'] not in existing]
+    if not batch:
+        return existing, 0
+
+    # Hash before queueing the write, so the writer is not held up by it
+    hashes = hashing.hash_passwords([values['password'] for _, values in batch], executor)
+    records = []
+    for (_, values), password_hash in zip(batch, hashes):
+        record = {key: value for key, value in values.items() if key != 'password'}
+        record['password_hash'] = password_hash
+        records.append(record)
+
+    taken, imported = write(_insert_records, records)
+    return existing | taken, imported
+
+
+def import_users(rows, batch_size=1000, start=0, executor=None, on_error=None, on_checkpoint=None):
+    """
+    Import users from (row_number, row, error) tuples as produced by read_rows
+
+    Rows numbered <= start are skipped. on_error(row_number, email, message)
+    is called for every rejected row and on_checkpoint(row_number) after
+    every committed batch.
+    Returns: {'processed', 'imported', 'failed', 'checkpoint'}
+    """
+    summary = {'processed': 0, 'imported': 0, 'failed': 0, 'checkpoint': start}
+    seen = set()
+    batch = []
+    last_number = start
+
+    def reject(number, email, message):
+        summary['failed'] += 1
+        if on_error is not None:
+            on_error(number, email, message)
+
+    def flush():
+        if batch:
+            try:
+                existing, imported = _insert_batch(batch, executor)
+            except IntegrityError:
+                # Someone else created one of these emails since we checked
+                db.session.rollback()
+                existing, imported = _insert_batch(batch, executor)
+            for number, values in batch:
+                if values['email'] in existing:
+                    reject(number, values['email'], 'Email already registered')
+            summary['imported'] += imported
+            batch.clear()
+        summary['checkpoint'] = last_number
+        if on_checkpoint is not None:
+            on_checkpoint(last_number)
+
+    for number, row, error in rows:
+        if number <= start:
+            continue
+        summary['processed'] += 1
+        last_number = number
+
+        if error is None:
+            values, error = validate_row(row)
+        if error is not None:
+            reject(number, row.get('email') if isinstance(row, dict) else None, error)
+            continue
+
+        if values['email'] in seen:
+            reject(number, values['email'], 'Duplicate email in import')
+            continue
+        seen.add(values['email'])
+
+        batch.append((number, values))
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+    return summary
@@ -0,0 +1,63 @@
+"""
+Keyset (cursor) pagination for user listings
+
+Cursors encode the (created_at, id) of the last row on a page, so the next
+page is a range scan on ix_users_created_at_id instead of an OFFSET that
+grows with the page number.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+from app.models import User
+
+
+class InvalidCursor(ValueError):
+    """Raised when an `after` cursor cannot be decoded"""
+
+
+def encode_cursor(user):
+    """Opaque cursor pointing just past user in listing order"""
+    raw = json.dumps([user.created_at.isoformat(), user.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns: (created_at, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, user_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(user_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def listing_order(query):
+    """Newest first, with id as a tie-breaker so the order is total"""
+    return query.order_by(User.created_at.desc(), User.id.desc())
+
+
+def keyset_statement(query, after, per_page):
+    """
+    Query (or select()) for one page after the given cursor, plus one row
+    that tells whether another page exists without a COUNT
+    """
+    query = listing_order(query)
+    if after:
+        created_at, user_id = decode_cursor(after)
+        query = query.filter(tuple_(User.created_at, User.id) < tuple_(created_at, user_id))
+    return query.limit(per_page + 1)
+
+
+def split_page(users, per_page):
+    """
+    Trim the look-ahead row fetched by keyset_statement
+    Returns: (users, next_cursor)
+    """
+    if len(users) > per_page:
+        users = users[:per_page]
+        return users, encode_cursor(users[-1])
+
+    return users, None
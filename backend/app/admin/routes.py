@@ -1,48 +1,165 @@
-from flask import Blueprint, request, jsonify, g, current_app
-from app import db
+import io
+import math
+from flask import Blueprint, Response, request, jsonify, g, current_app, stream_with_context
+from sqlalchemy import func, select
+from app import db, readmodel
 from app.models import User
 from app.users.decorators import token_required, admin_required
+from app.cache import invalidate_user
+from app.auth import refresh
+from app import database
+from app.admin.pagination import keyset_statement, listing_order, split_page, InvalidCursor
+from app.counters import VERSION, get_counter, total_counter
+from app.conditional import listing_etag, not_modified, with_validators
+from app.search import search_users
+from app.readmodel import serialize_rows
+from app.admin import bulk, exporter, importer
+from app.writer import write, DatabaseBusy
 
 admin_bp = Blueprint('admin', __name__)
 
 
-@admin_bp.route('/users', methods=['GET'])
-@token_required
-@admin_required
-def get_all_users():
-    """Get all users with pagination (admin only)"""
+def _set_user_status(user_id, status):
+    """Write unit: move one user to status, revoking tokens on deactivation"""
+    user = db.session.get(User, user_id)
+    user.status = status
+    if status == 'inactive':
+        user.revoke_tokens()
+        refresh.revoke_for_user(user.id)
+    db.session.flush()
+    return user.to_dict(include_timestamps=True), user.token_version
+
+
+def _listing_statements():
+    """
+    Build the statements behind an admin listing from the query string
+    Returns: (listing, None) or (None, error_response). listing has page,
+    per_page, cursor (keyset mode), rows (the page's SELECT) and for the
+    total either count (a COUNT SELECT), counter (a counter name) or neither.
+    """
     # Get pagination parameters
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', current_app.config['USERS_PER_PAGE'], type=int)
     
-    # Limit per_page to prevent abuse
-    per_page = min(per_page, 100)
+    # Limit per_page to prevent abuse; pages below 1 mean page 1
+    page = max(1, page)
+    per_page = max(1, min(per_page, 100))
+    listing = {'page': page, 'per_page': per_page, 'cursor': False, 'count': None, 'counter': None}
     
-    # Query users with pagination
-    pagination = User.query.order_by(User.created_at.desc()).paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
+    # Optional filters, served by the (status|role, created_at, id) indexes
+    status = request.args.get('status')
+    role = request.args.get('role')
+    query = select(*readmodel.columns())
+    if status:
+        query = query.where(User.status == status)
+    if role:
+        query = query.where(User.role == role)
     
-    users = pagination.items
+    # Cursor mode: constant cost per page and no COUNT(*)
+    if 'after' in request.args:
+        try:
+            listing['rows'] = keyset_statement(query, request.args['after'], per_page)
+        except InvalidCursor:
+            return None, (jsonify({
+                'error': 'Bad Request',
+                'message': 'Invalid pagination cursor',
+                'status': 400
+            }), 400)
+        listing['cursor'] = True
+        return listing, None
     
-    return jsonify({
-        'users': [user.to_dict(include_timestamps=True) for user in users],
-        'total': pagination.total,
-        'page': pagination.page,
-        'pages': pagination.pages,
-        'per_page': per_page
-    }), 200
+    # Totals: exact COUNT(*), materialized counters, or none at all
+    count_mode = request.args.get('count', 'exact')
+    if count_mode not in ('exact', 'cached', 'none'):
+        return None, (jsonify({
+            'error': 'Bad Request',
+            'message': 'count must be one of: exact, cached, none',
+            'status': 400
+        }), 400)
+    
+    listing['rows'] = listing_order(query).limit(per_page).offset((page - 1) * per_page)
+    if count_mode == 'cached':
+        listing['counter'] = total_counter(role=role, status=status)
+    if count_mode != 'none' and listing['counter'] is None:
+        # Exact count, or no counter covers both filters at once
+        listing['count'] = select(func.count()).select_from(query.subquery())
+    return listing, None
 
 
-@admin_bp.route('/users/<int:user_id>/activate', methods=['PUT'])
+def _listing_response(listing, rows, total, etag):
+    """The listing page for the rows read and total (None when not counted)"""
+    per_page = listing['per_page']
+    if listing['cursor']:
+        users, next_cursor = split_page(rows, per_page)
+        response = jsonify({
+            'users': serialize_rows(users),
+            'next_cursor': next_cursor,
+            'per_page': per_page
+        })
+    else:
+        response = jsonify({
+            'users': serialize_rows(rows),
+            'total': total,
+            'page': listing['page'],
+            'pages': math.ceil(total / per_page) if total is not None else None,
+            'per_page': per_page
+        })
+    return with_validators(response, etag), 200
+
+
+@admin_bp.route('/users', methods=['GET'])
 @token_required
 @admin_required
-def activate_user(user_id):
-    """Activate a user account (admin only)"""
-    user = User.query.get(user_id)
+def get_all_users():
+    """Get all users with page or cursor pagination (admin only)"""
+    # Listed changes bump the version, so an unchanged one means an equivalent page
+    etag = listing_etag(get_counter(VERSION))
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    
+    listing, error = _listing_statements()
+    if error:
+        return error
+    
+    rows = db.session.execute(listing['rows']).all()
+    total = None
+    if listing['counter'] is not None:
+        total = get_counter(listing['counter'])
+    elif listing['count'] is not None:
+        total = db.session.execute(listing['count']).scalar()
+    return _listing_response(listing, rows, total, etag)
+
+
+@admin_bp.route('/users/search', methods=['GET'])
+@token_required
+@admin_required
+def search_all_users():
+    """Search users by email or name prefix, best matches first (admin only)"""
+    q = request.args.get('q', '').strip()
+    limit = request.args.get('limit', current_app.config['USERS_PER_PAGE'], type=int)
+    
+    if not q:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'Search query is required',
+            'status': 400
+        }), 400
+    
+    # Limit results to prevent abuse
+    limit = max(1, min(limit, 100))
+    
+    users = search_users(q, limit)
     
+    return jsonify({
+        'users': serialize_rows(users),
+        'query': q,
+        'limit': limit
+    }), 200
+
+
+def _status_change_error(user, status):
+    """The response for a status change with nothing to write, or None"""
     if not user:
         return jsonify({
             'error': 'Not Found',
@@ -50,29 +167,62 @@ def activate_user(user_id):
             'status': 404
         }), 404
     
-    # Check if already active
-    if user.status == 'active':
+    # Prevent admin from deactivating themselves
+    if status == 'inactive' and user.id == g.current_user.id:
         return jsonify({
-            'message': 'User is already active',
-            'user': user.to_dict(include_timestamps=True)
-        }), 200
-    
-    user.status = 'active'
+            'error': 'Bad Request',
+            'message': 'You cannot deactivate your own account',
+            'status': 400
+        }), 400
     
-    try:
-        db.session.commit()
+    # Check if already in that status
+    if user.status == status:
         return jsonify({
-            'message': 'User activated successfully',
+            'message': f'User is already {status}',
             'user': user.to_dict(include_timestamps=True)
         }), 200
-    
-    except Exception as e:
-        db.session.rollback()
+    return None
+
+
+def _status_response(user_id, status, changed):
+    """200 with _set_user_status's result, or a 500 when it is None (the write failed)"""
+    action = 'activate' if status == 'active' else 'deactivate'
+    if changed is None:
         return jsonify({
             'error': 'Internal Server Error',
-            'message': 'Failed to activate user',
+            'message': f'Failed to {action} user',
             'status': 500
         }), 500
+    
+    user_data, token_version = changed
+    invalidate_user(user_id, token_version if status == 'inactive' else None)
+    return jsonify({
+        'message': f'User {action}d successfully',
+        'user': user_data
+    }), 200
+
+
+def _set_status(user_id, status):
+    user = User.query.get(user_id)
+    error = _status_change_error(user, status)
+    if error:
+        return error
+    
+    try:
+        changed = write(_set_user_status, user.id, status)
+    except DatabaseBusy:
+        raise
+    except Exception:
+        changed = None
+    return _status_response(user.id, status, changed)
+
+
+@admin_bp.route('/users/<int:user_id>/activate', methods=['PUT'])
+@token_required
+@admin_required
+def activate_user(user_id):
+    """Activate a user account (admin only)"""
+    return _set_status(user_id, 'active')
 
 
 @admin_bp.route('/users/<int:user_id>/deactivate', methods=['PUT'])
@@ -80,43 +230,176 @@ def activate_user(user_id):
 @admin_required
 def deactivate_user(user_id):
     """Deactivate a user account (admin only)"""
-    user = User.query.get(user_id)
+    return _set_status(user_id, 'inactive')
+
+
+def _bulk_set_status(status, action):
+    data = request.get_json(silent=True)
     
-    if not user:
+    if not isinstance(data, dict):
         return jsonify({
-            'error': 'Not Found',
-            'message': 'User not found',
-            'status': 404
-        }), 404
+            'error': 'Bad Request',
+            'message': 'No data provided',
+            'status': 400
+        }), 400
     
-    # Prevent admin from deactivating themselves
-    if user.id == g.current_user.id:
+    try:
+        results, changed = write(
+            bulk.set_status, data, status, g.current_user.id, current_app.config['ADMIN_BULK_LIMIT']
+        )
+    except bulk.BulkRequestError as e:
         return jsonify({
             'error': 'Bad Request',
-            'message': 'You cannot deactivate your own account',
+            'message': e.message,
             'status': 400
         }), 400
+    except DatabaseBusy:
+        raise
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': f'Failed to {action} users',
+            'status': 500
+        }), 500
+    
+    for user_id, token_version in changed:
+        invalidate_user(user_id, token_version if status == 'inactive' else None)
+    
+    summary = {}
+    for result in results:
+        summary[result['outcome']] = summary.get(result['outcome'], 0) + 1
     
-    # Check if already inactive
-    if user.status == 'inactive':
+    return jsonify({
+        'message': f'{len(changed)} user(s) {action}d',
+        'summary': summary,
+        'results': results
+    }), 200
+
+
+@admin_bp.route('/users/bulk/activate', methods=['PUT'])
+@token_required
+@admin_required
+def bulk_activate_users():
+    """Activate many users by id or filter in one statement (admin only)"""
+    return _bulk_set_status('active', 'activate')
+
+
+@admin_bp.route('/users/bulk/deactivate', methods=['PUT'])
+@token_required
+@admin_required
+def bulk_deactivate_users():
+    """Deactivate many users by id or filter in one statement (admin only)"""
+    return _bulk_set_status('inactive', 'deactivate')
+
+
+@admin_bp.route('/users/import', methods=['POST'])
+@token_required
+@admin_required
+def import_users():
+    """Import users from a CSV or NDJSON request body (admin only)"""
+    fmt = request.args.get('format') or importer.detect_format(content_type=request.content_type)
+    if fmt not in importer.FORMATS:
         return jsonify({
-            'message': 'User is already inactive',
-            'user': user.to_dict(include_timestamps=True)
-        }), 200
+            'error': 'Bad Request',
+            'message': 'format must be one of: csv, ndjson',
+            'status': 400
+        }), 400
+    
+    start = max(0, request.args.get('start', 0, type=int))
+    report_limit = current_app.config['IMPORT_ERROR_REPORT_LIMIT']
+    errors = []
+    checkpoint = [start]
+    
+    def on_error(row, email, message):
+        if len(errors) < report_limit:
+            errors.append({'row': row, 'email': email, 'message': message})
+    
+    def on_checkpoint(row):
+        checkpoint[0] = row
     
-    user.status = 'inactive'
+    # Read the body as a stream so large files are never held in memory
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
     
     try:
-        db.session.commit()
+        summary = importer.import_users(
+            importer.read_rows(stream, fmt),
+            batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+            start=start,
+            on_error=on_error,
+            on_checkpoint=on_checkpoint
+        )
+    except UnicodeDecodeError:
+        # Batches before the bad bytes are committed; resume from the checkpoint
+        db.session.rollback()
         return jsonify({
-            'message': 'User deactivated successfully',
-            'user': user.to_dict(include_timestamps=True)
-        }), 200
+            'error': 'Bad Request',
+            'message': 'Import data must be UTF-8 encoded',
+            'status': 400,
+            'checkpoint': checkpoint[0]
+        }), 400
     
-    except Exception as e:
-        db.session.rollback()
+    return jsonify({
+        'message': f'{summary["imported"]} user(s) imported',
+        **summary,
+        'errors': errors
+    }), 200
+
+
+@admin_bp.route('/users/export', methods=['GET'])
+@token_required
+@admin_required
+def export_users():
+    """Stream all users as NDJSON or CSV, optionally gzipped (admin only)"""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in exporter.FORMATS:
         return jsonify({
-            'error': 'Internal Server Error',
-            'message': 'Failed to deactivate user',
-            'status': 500
-        }), 500
+            'error': 'Bad Request',
+            'message': 'format must be one of: ndjson, csv',
+            'status': 400
+        }), 400
+    
+    try:
+        columns = exporter.parse_columns(request.args.get('columns'))
+    except exporter.ExportRequestError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': e.message,
+            'status': 400
+        }), 400
+    
+    compress = request.args.get('gzip', 'false').lower() in ('1', 'true')
+    body = exporter.export_users(
+        columns,
+        fmt,
+        status=request.args.get('status'),
+        role=request.args.get('role'),
+        chunk_size=current_app.config['EXPORT_CHUNK_SIZE'],
+        compress=compress
+    )
+    
+    filename = f'users.{fmt}' + ('.gz' if compress else '')
+    # No Content-Length, so the body goes out with chunked transfer encoding
+    return Response(
+        stream_with_context(body),
+        mimetype='application/gzip' if compress else exporter.CONTENT_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@admin_bp.route('/diagnostics', methods=['GET'])
+@token_required
+@admin_required
+def diagnostics():
+    """Runtime performance diagnostics (admin only)"""
+    token_cache = current_app.extensions.get('token_cache')
+    user_cache = current_app.extensions.get('user_cache')
+    
+    return jsonify({
+        'database': database.diagnostics(),
+        'hashing': current_app.extensions['hashing'].stats(),
+        'token_cache': token_cache.stats() if token_cache else None,
+        'user_cache': user_cache.stats() if user_cache else None,
+        'revocation': current_app.extensions['revocation'].stats(),
+        'last_login': current_app.extensions['last_login'].stats(),
+        'writer': current_app.extensions['writer'].stats()
+    }), 200
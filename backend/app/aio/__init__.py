@@ -0,0 +1,46 @@
+"""
+Async request handling for the ASGI entry point (asgi.py)
+
+The auth, users and admin routes that carry most traffic run as
+coroutines: reads go through an async SQLAlchemy engine, while password
+hashing, revocation syncs and write units are awaited on worker threads,
+so one event loop keeps serving requests while they block. Write units
+still go through the app's writer (app.writer), which keeps SQLite
+writes serialized and group-committed across workers.
+
+Each coroutine runs inside a regular Flask request context built from the
+ASGI scope, so config, extensions, request parsing, error handlers and
+CORS behave exactly as under WSGI. Every other path is handed to the
+Flask app itself through an ASGI-to-WSGI adapter.
+"""
+import asyncio
+
+
+async def offload(fn, *args):
+    """Run blocking fn(*args) on a worker thread; it sees the same request context"""
+    return await asyncio.to_thread(fn, *args)
+
+
+async def write(fn, *args):
+    """
+    Await a write unit on the app's writer (see app.writer.write)
+    The request's async connection is handed back to the pool first, so
+    requests waiting on the writer do not hold connections meanwhile.
+    """
+    from app import writer
+    from app.aio import database
+
+    await database.close_session()
+    return await offload(writer.write, fn, *args)
+
+
+def create_asgi_app(config_name=None):
+    """ASGI application factory wrapping create_app(config_name)"""
+    from app import create_app
+    from app.aio import database
+    from app.aio.app import AsyncApp
+    from app.aio.routes import router
+
+    flask_app = create_app(config_name)
+    database.init_app(flask_app)
+    return AsyncApp(flask_app, router)
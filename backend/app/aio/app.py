@@ -0,0 +1,160 @@
+"""
+ASGI application
+
+AsyncApp matches each HTTP request against the coroutine routes. A match
+is run inside a Flask request context built from the ASGI scope, through
+the same before/after request hooks, error handlers and response
+conversion a WSGI request gets. Anything else (other paths, OPTIONS
+preflights, trailing-slash redirects) goes to the Flask app unchanged.
+"""
+import inspect
+import io
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, Rule
+
+from app.aio import database
+
+
+class Router:
+    """URL map of coroutine handlers, using Flask's rule syntax"""
+
+    def __init__(self):
+        self.url_map = Map()
+        self.handlers = {}
+
+    def route(self, rule, methods):
+        def decorator(f):
+            endpoint = f'{f.__module__}.{f.__name__}'
+            self.url_map.add(Rule(rule, endpoint=endpoint, methods=methods))
+            self.handlers[endpoint] = f
+            return f
+
+        return decorator
+
+    def match(self, method, path):
+        """Returns: (handler, view_args), or (None, None) to fall back to Flask"""
+        try:
+            endpoint, view_args = self.url_map.bind('localhost').match(path, method)
+        except HTTPException:
+            return None, None
+        return self.handlers[endpoint], view_args
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI http scope and its full request body"""
+    script_name = scope.get('root_path', '')
+    path = scope['path']
+    if script_name and path.startswith(script_name):
+        path = path[len(script_name):]
+
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.input_terminated': True,  # the whole body is buffered, length or not
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin-1')
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+
+    return environ
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+class AsyncApp:
+    """ASGI callable serving coroutine routes, with the Flask app as fallback"""
+
+    def __init__(self, flask_app, router):
+        self.flask_app = flask_app
+        self.router = router
+        self.wsgi = WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        handler, view_args = self.router.match(scope['method'], scope['path'])
+        if handler is None:
+            return await self.wsgi(scope, receive, send)
+
+        environ = build_environ(scope, await read_body(receive))
+        response = await self.dispatch(environ, handler, view_args)
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': response.status_code,
+                'headers': [
+                    (name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in response.headers.items()
+                ]
+            })
+            body = b'' if scope['method'] == 'HEAD' else response.get_data()
+            await send({'type': 'http.response.body', 'body': body})
+        finally:
+            response.close()
+
+    async def dispatch(self, environ, handler, view_args):
+        """Run a coroutine handler the way Flask runs a view; returns the response"""
+        app = self.flask_app
+        ctx = app.request_context(environ)
+        ctx.push()
+        try:
+            try:
+                rv = app.preprocess_request()
+                if rv is None:
+                    rv = handler(**view_args)
+                    if inspect.isawaitable(rv):
+                        rv = await rv
+            except Exception as e:
+                rv = self._handle_exception(e)
+            return app.process_response(app.make_response(rv))
+        finally:
+            await database.close_session()
+            ctx.pop()
+
+    def _handle_exception(self, error):
+        try:
+            return self.flask_app.handle_user_exception(error)
+        except Exception as unhandled:
+            return self.flask_app.handle_exception(unhandled)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await database.dispose(self.flask_app)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
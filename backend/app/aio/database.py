@@ -0,0 +1,71 @@
+"""
+Async engine for the ASGI entry point
+
+The async engine points at the same database as the sync one, with the
+driver swapped for an asyncio one: aiosqlite for SQLite, asyncpg for
+PostgreSQL (ASYNC_DATABASE_URL overrides the derived URL). SQLite
+connections get the SQLITE_PRAGMAS profile. On PostgreSQL one event loop
+serves every request of a worker, so the pool takes the worker's whole
+share of DB_MAX_CONNECTIONS instead of one connection per thread.
+
+An in-memory SQLite database is private to its connection, so the async
+engine cannot see the sync engine's tables there; use a file.
+"""
+from flask import current_app, g
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import database
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',  # Heroku/Render style URLs
+}
+
+
+def async_url(uri):
+    """The database URL with its driver replaced by the asyncio one"""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver for {backend} databases; set ASYNC_DATABASE_URL')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def init_app(app):
+    """Create the async engine and session factory for app"""
+    url = make_url(app.config['ASYNC_DATABASE_URL'] or async_url(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    options = {}
+    if url.get_backend_name() != 'sqlite':
+        options = database.pool_options(app.config, concurrency=app.config['DB_MAX_CONNECTIONS'])
+        # Async engines need an asyncio-aware pool; use the default one
+        options.pop('poolclass')
+
+    engine = create_async_engine(url, **options)
+    if url.get_backend_name() == 'sqlite' and app.config['SQLITE_PRAGMAS']:
+        event.listen(engine.sync_engine, 'connect', database._apply_sqlite_pragmas(app.config['SQLITE_PRAGMAS']))
+
+    app.extensions['async_engine'] = engine
+    app.extensions['async_sessions'] = async_sessionmaker(engine, expire_on_commit=False)
+
+
+def session():
+    """The AsyncSession of the current request, opened on first use"""
+    if 'async_session' not in g:
+        g.async_session = current_app.extensions['async_sessions']()
+    return g.async_session
+
+
+async def close_session():
+    """Close the current request's AsyncSession, if it opened one"""
+    async_session = g.pop('async_session', None)
+    if async_session is not None:
+        await async_session.close()
+
+
+async def dispose(app):
+    """Close every pooled async connection, e.g. at shutdown"""
+    await app.extensions['async_engine'].dispose()
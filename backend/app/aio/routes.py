@@ -0,0 +1,212 @@
+"""
+Coroutine versions of the auth, users and admin routes
+
+Each handler answers exactly like its Flask view in app.auth.routes,
+app.users.routes or app.admin.routes. Validation, error messages and
+response bodies come from the helpers and write units next to those
+views; a handler here only does its reads, password hashing and writes
+differently: reads are awaited on the async engine, and hashing and
+writes on worker threads.
+"""
+from datetime import datetime
+
+from flask import g, request
+from sqlalchemy import select
+
+from app.aio import database, offload, write
+from app.aio.app import Router
+from app.aio.decorators import current_user_snapshot, token_required
+from app.admin.routes import (
+    _listing_response, _listing_statements, _set_user_status, _status_change_error, _status_response
+)
+from app.auth import hashing
+from app.auth.routes import (
+    _complete_login, _create_user, _invalid_credentials, _login_response, _new_user, _signup_error,
+    _signup_response
+)
+from app.conditional import listing_etag, not_modified, user_response
+from app.counters import VERSION, counter_query
+from app.models import User
+from app.schemas import LOGIN, PASSWORD_CHANGE, PROFILE_UPDATE, SIGNUP
+from app.users.decorators import active_user_required, admin_required
+from app.users.routes import (
+    _email_in_use_error, _password_change_error, _password_response, _profile_response, _set_password,
+    _update_user
+)
+from app.writer import DatabaseBusy
+
+router = Router()
+
+
+async def find_by_email(email):
+    """Async counterpart of User.find_by_email"""
+    result = await database.session().execute(select(User).where(User.email_matches(email)).limit(1))
+    return result.scalars().first()
+
+
+async def get_counter(name):
+    """Async counterpart of app.counters.get_counter"""
+    value = (await database.session().execute(counter_query(name))).scalar()
+    return value or 0
+
+
+@router.route('/api/auth/signup', methods=['POST'])
+async def signup():
+    """User signup endpoint"""
+    data, error = SIGNUP.validate(request.get_json())
+    if error:
+        return error.response()
+
+    error = _signup_error(data, await find_by_email(data['email']) is not None)
+    if error:
+        return error
+
+    values = _new_user(data, await offload(hashing.hash_password, data['password']))
+
+    try:
+        created = await write(_create_user, values)
+    except DatabaseBusy:
+        raise
+    except Exception:
+        created = None
+    return _signup_response(created)
+
+
+@router.route('/api/auth/login', methods=['POST'])
+async def login():
+    """User login endpoint"""
+    data, error = LOGIN.validate(request.get_json())
+    if error:
+        return error.response()
+
+    user = await find_by_email(data['email'])
+    if not user or not await offload(user.check_password, data['password']):
+        return _invalid_credentials()
+
+    password_hash = None
+    if user.password_needs_rehash():
+        password_hash = await offload(hashing.hash_password, data['password'])
+
+    last_login = datetime.utcnow()
+    refresh_token = await write(_complete_login, user.id, last_login, password_hash)
+    return _login_response(user, last_login, refresh_token)
+
+
+@router.route('/api/auth/me', methods=['GET'])
+@token_required
+async def get_current_user():
+    """Get current user information from token"""
+    return user_response(await current_user_snapshot())
+
+
+@router.route('/api/users/profile', methods=['GET'])
+@token_required
+@active_user_required
+async def get_profile():
+    """Get current user's profile (answers conditional requests with 304)"""
+    return user_response(await current_user_snapshot())
+
+
+@router.route('/api/users/profile', methods=['PUT'])
+@token_required
+@active_user_required
+async def update_profile():
+    """Update current user's profile (name and email)"""
+    changes, error = PROFILE_UPDATE.validate(request.get_json())
+    if error:
+        return error.response()
+
+    user_id = g.current_user.id
+    if 'email' in changes:
+        error = _email_in_use_error(await find_by_email(changes['email']), user_id)
+        if error:
+            return error
+
+    try:
+        user_data = await write(_update_user, user_id, changes)
+    except DatabaseBusy:
+        raise
+    except Exception:
+        user_data = None
+    return _profile_response(user_id, user_data)
+
+
+@router.route('/api/users/password', methods=['PUT'])
+@token_required
+@active_user_required
+async def change_password():
+    """Change user's password"""
+    data, error = PASSWORD_CHANGE.validate(request.get_json())
+    if error:
+        return error.response()
+
+    user = await database.session().get(User, g.current_user.id)
+    current_password_ok = await offload(user.check_password, data['current_password'])
+    error = _password_change_error(current_password_ok, data['new_password'])
+    if error:
+        return error
+
+    password_hash = await offload(hashing.hash_password, data['new_password'])
+
+    try:
+        changed = await write(_set_password, user.id, password_hash)
+    except DatabaseBusy:
+        raise
+    except Exception:
+        changed = None
+    return _password_response(user.id, changed)
+
+
+@router.route('/api/admin/users', methods=['GET'])
+@token_required
+@admin_required
+async def get_all_users():
+    """Get all users with page or cursor pagination (admin only)"""
+    etag = listing_etag(await get_counter(VERSION))
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
+    listing, error = _listing_statements()
+    if error:
+        return error
+
+    session = database.session()
+    rows = (await session.execute(listing['rows'])).all()
+    total = None
+    if listing['counter'] is not None:
+        total = await get_counter(listing['counter'])
+    elif listing['count'] is not None:
+        total = (await session.execute(listing['count'])).scalar()
+    return _listing_response(listing, rows, total, etag)
+
+
+async def _set_status(user_id, status):
+    user = await database.session().get(User, user_id)
+    error = _status_change_error(user, status)
+    if error:
+        return error
+
+    try:
+        changed = await write(_set_user_status, user.id, status)
+    except DatabaseBusy:
+        raise
+    except Exception:
+        changed = None
+    return _status_response(user.id, status, changed)
+
+
+@router.route('/api/admin/users/<int:user_id>/activate', methods=['PUT'])
+@token_required
+@admin_required
+async def activate_user(user_id):
+    """Activate a user account (admin only)"""
+    return await _set_status(user_id, 'active')
+
+
+@router.route('/api/admin/users/<int:user_id>/deactivate', methods=['PUT'])
+@token_required
+@admin_required
+async def deactivate_user(user_id):
+    """Deactivate a user account (admin only)"""
+    return await _set_status(user_id, 'inactive')
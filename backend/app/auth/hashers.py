@@ -0,0 +1,197 @@
+"""
+Password hasher registry
+
+Each hasher produces a self-describing encoded string, so stored hashes can
+be verified with the parameters they were created with while new hashes use
+whatever PASSWORD_HASHER and cost settings are currently configured.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import time
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(data):
+    return base64.b64decode(data + '=' * (-len(data) % 4))
+
+
+class BcryptHasher:
+    """bcrypt with a configurable log2 work factor"""
+    algorithm = 'bcrypt'
+    cost_setting = 'BCRYPT_ROUNDS'
+    cost_range = range(4, 18)
+
+    def __init__(self, cost=12):
+        self.cost = cost
+
+    @staticmethod
+    def identify(encoded):
+        return encoded.startswith(('$2a$', '$2b$', '$2y$'))
+
+    @classmethod
+    def from_encoded(cls, encoded):
+        return cls(cost=int(encoded.split('$')[2]))
+
+    def hash(self, password):
+        import bcrypt
+
+        salt = bcrypt.gensalt(rounds=self.cost)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password, encoded):
+        import bcrypt
+
+        return bcrypt.checkpw(password.encode('utf-8'), encoded.encode('utf-8'))
+
+    def needs_update(self, encoded):
+        return not self.identify(encoded) or self.from_encoded(encoded).cost != self.cost
+
+
+class ScryptHasher:
+    """scrypt from hashlib, cost is log2(N)"""
+    algorithm = 'scrypt'
+    cost_setting = 'SCRYPT_COST'
+    cost_range = range(10, 21)
+    block_size = 8
+    parallelism = 1
+    key_length = 32
+
+    def __init__(self, cost=15):
+        self.cost = cost
+
+    @staticmethod
+    def identify(encoded):
+        return encoded.startswith('$scrypt$')
+
+    @classmethod
+    def from_encoded(cls, encoded):
+        params = dict(item.split('=') for item in encoded.split('$')[2].split(','))
+        return cls(cost=int(params['ln']))
+
+    def _derive(self, password, salt):
+        n = 2 ** self.cost
+        return hashlib.scrypt(
+            password.encode('utf-8'),
+            salt=salt,
+            n=n,
+            r=self.block_size,
+            p=self.parallelism,
+            maxmem=256 * n * self.block_size,
+            dklen=self.key_length
+        )
+
+    def hash(self, password):
+        salt = os.urandom(16)
+        key = self._derive(password, salt)
+        return (f'$scrypt$ln={self.cost},r={self.block_size},p={self.parallelism}'
+                f'${_b64encode(salt)}${_b64encode(key)}')
+
+    def verify(self, password, encoded):
+        _, _, _, salt, key = encoded.split('$')
+        return hmac.compare_digest(self._derive(password, _b64decode(salt)), _b64decode(key))
+
+    def needs_update(self, encoded):
+        return not self.identify(encoded) or self.from_encoded(encoded).cost != self.cost
+
+
+class Argon2Hasher:
+    """argon2id via argon2-cffi, cost is the time cost (iterations)"""
+    algorithm = 'argon2id'
+    cost_setting = 'ARGON2_TIME_COST'
+    cost_range = range(1, 21)
+
+    def __init__(self, cost=3, memory_cost=65536, parallelism=4):
+        self.cost = cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+
+    @staticmethod
+    def identify(encoded):
+        return encoded.startswith('$argon2id$')
+
+    @classmethod
+    def from_encoded(cls, encoded):
+        params = dict(item.split('=') for item in encoded.split('$')[3].split(','))
+        return cls(cost=int(params['t']), memory_cost=int(params['m']),
+                   parallelism=int(params['p']))
+
+    def _hasher(self):
+        from argon2 import PasswordHasher
+        return PasswordHasher(
+            time_cost=self.cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism
+        )
+
+    def hash(self, password):
+        return self._hasher().hash(password)
+
+    def verify(self, password, encoded):
+        from argon2.exceptions import VerificationError, InvalidHashError
+        try:
+            return self._hasher().verify(encoded, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_update(self, encoded):
+        return not self.identify(encoded) or self._hasher().check_needs_rehash(encoded)
+
+
+HASHERS = {
+    BcryptHasher.algorithm: BcryptHasher,
+    ScryptHasher.algorithm: ScryptHasher,
+    Argon2Hasher.algorithm: Argon2Hasher,
+}
+
+
+def from_config(config, algorithm=None):
+    """Build the hasher selected by PASSWORD_HASHER (or algorithm) with its configured parameters"""
+    algorithm = algorithm or config['PASSWORD_HASHER']
+    if algorithm not in HASHERS:
+        raise ValueError(f'Unknown PASSWORD_HASHER: {algorithm}')
+
+    hasher_class = HASHERS[algorithm]
+    if hasher_class is Argon2Hasher:
+        return Argon2Hasher(
+            cost=config['ARGON2_TIME_COST'],
+            memory_cost=config['ARGON2_MEMORY_COST'],
+            parallelism=config['ARGON2_PARALLELISM']
+        )
+    return hasher_class(cost=config[hasher_class.cost_setting])
+
+
+def identify(encoded):
+    """Return a hasher carrying the parameters of an existing hash"""
+    for hasher_class in HASHERS.values():
+        if hasher_class.identify(encoded):
+            return hasher_class.from_encoded(encoded)
+    raise ValueError('Unrecognized password hash format')
+
+
+def calibrate(hasher, target_ms, password='Calibrate123'):
+    """
+    Find the highest cost whose verify time stays within target_ms on this host
+    Returns: (cost, measured_ms)
+    """
+    best = None
+    for cost in hasher.cost_range:
+        hasher.cost = cost
+        encoded = hasher.hash(password)
+        start = time.perf_counter()
+        hasher.verify(password, encoded)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if elapsed_ms > target_ms:
+            break
+        best = (cost, elapsed_ms)
+
+    if best is None:
+        # Even the cheapest setting is over budget, so use it anyway
+        best = (hasher.cost_range[0], elapsed_ms)
+    hasher.cost = best[0]
+    return best
@@ -0,0 +1,233 @@
+"""
+Password hashing executor
+
+Password hashes are CPU-bound by design, so running them on the request
+thread lets a login spike tie up every worker. Hashing and verification are
+handed to a bounded process pool instead; set HASHING_POOL_SIZE=0 to hash
+inline. Algorithms and cost factors live in app.auth.hashers.
+
+Bulk hashing (admin imports) shares the pool with logins but may only
+occupy HASHING_BULK_WORKERS of its processes, in small chunks, so a login
+verify always finds a worker free or next in line.
+
+A worker that dies (OOM kill, segfault) breaks the whole pool. The broken
+pool is replaced and the hash retried once, rather than failing every
+later hash in the process.
+"""
+import os
+import threading
+import time
+from functools import partial
+from itertools import islice
+
+from flask import current_app
+
+from app.auth import hashers
+from app.metrics import LatencyStats
+
+
+class HashingQueueFull(Exception):
+    """Raised when too many hashes are already waiting for the pool"""
+
+
+def _hash_password(hasher, password):
+    return hasher.hash(password)
+
+
+def _check_password(hasher, password, password_hash):
+    return hasher.verify(password, password_hash)
+
+
+def _map_chunk(fn, chunk):
+    return [fn(*args) for args in chunk]
+
+
+class HashingExecutor:
+    """Per-app process pool for password hashing with a bounded queue"""
+
+    # Inputs per bulk job: a login waits for at most one chunk when every
+    # worker is busy
+    bulk_chunk_size = 4
+
+    def __init__(self, pool_size, queue_limit, hasher=None, bulk_workers=None):
+        self.pool_size = pool_size
+        self.queue_limit = queue_limit
+        self.hasher = hasher or hashers.BcryptHasher()
+        # By default bulk work leaves one worker to interactive hashing
+        self.bulk_workers = bulk_workers or max(1, pool_size - 1)
+        self.latency = LatencyStats()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._bulk_pending = 0
+        self._rejected = 0
+        self._pool = None
+        self._pid = None
+
+    @property
+    def enabled(self):
+        return self.pool_size > 0
+
+    def _get_pool(self):
+        # A pool inherited across fork() is unusable, so build one per process
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                # Imported here: inline hashing (HASHING_POOL_SIZE=0) never needs them
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.pool_size,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def _discard_pool(self, pool):
+        """Drop a broken pool so the next _get_pool() starts a new one"""
+        with self._lock:
+            if self._pool is not pool:
+                # Another thread already replaced it
+                return
+            self._pool = None
+        pool.shutdown(wait=False)
+
+    def _retry_broken(self, call):
+        """call(pool), repeated once on a fresh pool if the first one broke"""
+        from concurrent.futures.process import BrokenProcessPool
+
+        pool = self._get_pool()
+        try:
+            return call(pool)
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            return call(self._get_pool())
+
+    def run(self, fn, *args):
+        """Run a hashing function in the pool (or inline) and wait for it"""
+        start = time.perf_counter()
+
+        if not self.enabled:
+            try:
+                return fn(*args)
+            finally:
+                self.latency.record(time.perf_counter() - start)
+
+        with self._lock:
+            if self._pending >= self.pool_size + self.queue_limit:
+                self._rejected += 1
+                raise HashingQueueFull()
+            self._pending += 1
+
+        try:
+            return self._retry_broken(lambda pool: pool.submit(fn, *args).result())
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self.latency.record(time.perf_counter() - start)
+
+    def map(self, fn, *iterables):
+        """
+        Run fn over many inputs on at most bulk_workers pool processes (or
+        inline), in order. Chunks in flight count as pending work.
+        """
+        if not self.enabled:
+            return list(map(fn, *iterables))
+
+        # Kept as lists so a retry on a fresh pool can start over
+        iterables = [list(iterable) for iterable in iterables]
+        return self._retry_broken(lambda pool: self._map(pool, fn, iterables))
+
+    def _map(self, pool, fn, iterables):
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        inputs = zip(*iterables)
+        chunks = iter(lambda: list(islice(inputs, self.bulk_chunk_size)), [])
+        results = []
+        running = set()
+        try:
+            for chunk in chunks:
+                if len(running) >= self.bulk_workers:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    self._bulk_done(len(done))
+                future = pool.submit(_map_chunk, fn, chunk)
+                with self._lock:
+                    self._pending += 1
+                    self._bulk_pending += 1
+                running.add(future)
+                results.append(future)
+            wait(running)
+        finally:
+            self._bulk_done(len(running))
+        return [result for future in results for result in future.result()]
+
+    def _bulk_done(self, count):
+        with self._lock:
+            self._pending -= count
+            self._bulk_pending -= count
+
+    def shutdown(self):
+        """Stop the worker processes, if any were started"""
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def stats(self):
+        """Queue depth and per-hash latency for diagnostics"""
+        with self._lock:
+            pending = self._pending
+            bulk_pending = self._bulk_pending
+            rejected = self._rejected
+        return {
+            'mode': 'pool' if self.enabled else 'inline',
+            'algorithm': self.hasher.algorithm,
+            'cost': self.hasher.cost,
+            'pool_size': self.pool_size,
+            'queue_limit': self.queue_limit,
+            'in_flight': pending,
+            'bulk_in_flight': bulk_pending,
+            'bulk_workers': self.bulk_workers,
+            'queue_depth': max(0, pending - self.pool_size),
+            'rejected': rejected,
+            'latency': self.latency.to_dict()
+        }
+
+
+def init_app(app):
+    """Attach a hashing executor to the app"""
+    app.extensions['hashing'] = HashingExecutor(
+        pool_size=app.config['HASHING_POOL_SIZE'],
+        queue_limit=app.config['HASHING_QUEUE_LIMIT'],
+        hasher=hashers.from_config(app.config),
+        bulk_workers=app.config['HASHING_BULK_WORKERS']
+    )
+
+
+def get_executor():
+    return current_app.extensions['hashing']
+
+
+def hash_password(password):
+    """Hash a plaintext password with the configured hasher"""
+    executor = get_executor()
+    return executor.run(_hash_password, executor.hasher, password)
+
+
+def hash_passwords(passwords, executor=None):
+    """Hash many plaintext passwords at once, fanned out across the pool"""
+    executor = executor or get_executor()
+    return executor.map(partial(_hash_password, executor.hasher), passwords)
+
+
+def check_password(password, password_hash):
+    """Verify a plaintext password using the parameters stored in its hash"""
+    try:
+        hasher = hashers.identify(password_hash)
+    except ValueError:
+        return False
+    return get_executor().run(_check_password, hasher, password, password_hash)
+
+
+def needs_rehash(password_hash):
+    """Whether a stored hash uses an outdated algorithm or cost"""
+    return get_executor().hasher.needs_update(password_hash)
@@ -0,0 +1,183 @@
+"""
+Write-behind last_login stamps
+
+Stamping last_login on every login turns each one into a users UPDATE,
+which on SQLite means taking the database-wide write lock. Logins record
+the stamp in a per-process buffer instead; a background thread hands the
+buffered stamps to the write queue as one executemany UPDATE every
+LAST_LOGIN_FLUSH_SECONDS, as soon as LAST_LOGIN_FLUSH_SIZE users are
+waiting, and at process exit.
+Set LAST_LOGIN_FLUSH_SECONDS=0 to write the stamp with the login instead.
+
+Stamps only move forward, so workers flushing out of order cannot
+overwrite a newer login with an older one.
+"""
+import atexit
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import bindparam, or_, update
+
+from app.metrics import LatencyStats
+
+
+def _write_stamps(pending):
+    """
+    Write unit: apply {user_id: stamp} entries in one executemany UPDATE
+    Listings show last_login, so the batch bumps the listing version once.
+    """
+    from app import db
+    from app.counters import VERSION, adjust_counters
+
+    db.session.execute(_update_statement(), [
+        {'user_id': user_id, 'stamp': stamp} for user_id, stamp in pending.items()
+    ])
+    adjust_counters(db.session.connection(), {VERSION: 1})
+
+
+def _update_statement():
+    from app.models import User
+
+    table = User.__table__
+    return (
+        update(table)
+        .where(table.c.id == bindparam('user_id'))
+        .where(or_(table.c.last_login.is_(None), table.c.last_login < bindparam('stamp')))
+        # A login is not a profile change, so leave updated_at alone
+        .values(last_login=bindparam('stamp'), updated_at=table.c.updated_at)
+    )
+
+
+class LastLoginBuffer:
+    """Per-app buffer of {user_id: last login time} flushed by a background thread"""
+
+    def __init__(self, app, flush_interval, max_entries):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._pid = None
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.flush_latency = LatencyStats()
+
+    @property
+    def enabled(self):
+        return self.flush_interval > 0
+
+    def _ensure_thread(self):
+        # Threads do not survive fork(), so start one per process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._stopping = False
+        self._wakeup.clear()
+        self._thread = threading.Thread(target=self._run, name='last-login-flush', daemon=True)
+        self._pid = os.getpid()
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def record(self, user_id, stamp):
+        """Buffer a login time for user_id, keeping the newest per user"""
+        with self._lock:
+            self._ensure_thread()
+            if user_id not in self._pending or self._pending[user_id] < stamp:
+                self._pending[user_id] = stamp
+            full = len(self._pending) >= self.max_entries
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write every buffered stamp in one UPDATE; returns the number of users"""
+        from app import db
+        from app.cache import invalidate_user
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            start = time.perf_counter()
+            with self.app.app_context():
+                try:
+                    self.app.extensions['writer'].run(_write_stamps, pending)
+                except Exception:
+                    self.failures += 1
+                    # Put the stamps back, unless newer logins replaced them meanwhile
+                    with self._lock:
+                        for user_id, stamp in pending.items():
+                            if user_id not in self._pending or self._pending[user_id] < stamp:
+                                self._pending[user_id] = stamp
+                    self.app.logger.exception('Failed to flush %d last_login stamps', len(pending))
+                    return 0
+                finally:
+                    db.session.remove()
+
+                for user_id in pending:
+                    invalidate_user(user_id)
+
+            self.flush_latency.record(time.perf_counter() - start)
+            self.flushes += 1
+            self.rows_written += len(pending)
+            return len(pending)
+
+    def close(self):
+        """Stop the flush thread and write whatever is still buffered"""
+        self._stopping = True
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval + 5)
+        self._thread = None
+        self.flush()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def stats(self):
+        return {
+            'mode': 'write-behind' if self.enabled else 'inline',
+            'pending': len(self._pending),
+            'flush_interval': self.flush_interval,
+            'max_entries': self.max_entries,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'failures': self.failures,
+            'flush_latency': self.flush_latency.to_dict()
+        }
+
+
+def init_app(app):
+    """Attach the last_login buffer to the app"""
+    app.extensions['last_login'] = LastLoginBuffer(
+        app,
+        flush_interval=app.config['LAST_LOGIN_FLUSH_SECONDS'],
+        max_entries=app.config['LAST_LOGIN_FLUSH_SIZE']
+    )
+
+
+def record_login(user, stamp):
+    """
+    Stamp a successful login for user
+    Write-behind mode buffers it; inline mode adds the UPDATE to the
+    current session, to be committed with the rest of the login.
+    """
+    buffer = current_app.extensions['last_login']
+    if buffer.enabled:
+        buffer.record(user.id, stamp)
+    else:
+        _write_stamps({user.id: stamp})
@@ -0,0 +1,108 @@
+"""
+Rotating refresh tokens
+
+Refresh tokens are opaque random strings stored only as SHA-256 digests.
+Every use rotates the token within its family; presenting a token that was
+already rotated means it leaked, so the whole family is revoked.
+"""
+import hashlib
+import secrets
+import uuid
+from datetime import datetime
+
+from flask import current_app
+
+from app import db
+from app.models import RefreshToken
+from app.writer import write
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token cannot be exchanged"""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def issue(user, family_id=None):
+    """Create a refresh token for user (caller commits); returns the raw token"""
+    token = secrets.token_urlsafe(32)
+    db.session.add(RefreshToken(
+        user_id=user.id,
+        token_hash=_digest(token),
+        family_id=family_id or uuid.uuid4().hex,
+        expires_at=datetime.utcnow() + current_app.config['JWT_REFRESH_EXPIRATION_DELTA']
+    ))
+    return token
+
+
+def _rotate(token):
+    """
+    Write unit: mark a refresh token used and issue its successor
+    Returns: (access_token, new_token, None) or (None, None, error message);
+    errors are returned rather than raised so a revoked family is committed
+    """
+    record = RefreshToken.query.filter_by(token_hash=_digest(token)).first()
+    if record is None or record.expires_at <= datetime.utcnow():
+        return None, None, 'Invalid or expired refresh token'
+
+    if record.used_at is not None or record.revoked_at is not None:
+        # A rotated token came back: assume theft and end the session family
+        revoke_family(record.family_id)
+        return None, None, 'Refresh token reuse detected'
+
+    record.used_at = datetime.utcnow()
+    new_token = issue(record.user, family_id=record.family_id)
+    db.session.flush()
+    return record.user.generate_token(), new_token, None
+
+
+def rotate(token):
+    """
+    Exchange a refresh token for a new one in the same family
+    Returns: (access_token, new_token)
+    """
+    access_token, new_token, error = write(_rotate, token)
+    if error is not None:
+        raise RefreshTokenError(error)
+    return access_token, new_token
+
+
+def revoke_family(family_id):
+    """Revoke every live token in a family (caller commits)"""
+    RefreshToken.query.filter_by(family_id=family_id, revoked_at=None).update(
+        {'revoked_at': datetime.utcnow()}, synchronize_session=False
+    )
+
+
+def revoke_token(token):
+    """Revoke the family of a presented refresh token, e.g. on logout"""
+    record = RefreshToken.query.filter_by(token_hash=_digest(token)).first()
+    if record is not None:
+        revoke_family(record.family_id)
+
+
+def revoke_for_user(user_id):
+    """Revoke every refresh token issued to a user (caller commits)"""
+    RefreshToken.query.filter_by(user_id=user_id, revoked_at=None).update(
+        {'revoked_at': datetime.utcnow()}, synchronize_session=False
+    )
+
+
+def revoke_for_users(user_ids):
+    """Revoke the refresh tokens of many users in one statement (caller commits)"""
+    if not user_ids:
+        return
+    RefreshToken.query.filter(
+        RefreshToken.user_id.in_(user_ids), RefreshToken.revoked_at.is_(None)
+    ).update({'revoked_at': datetime.utcnow()}, synchronize_session=False)
+
+
+def prune_expired():
+    """Delete refresh tokens past their expiry (caller commits); returns the number removed"""
+    return RefreshToken.query.filter(RefreshToken.expires_at < datetime.utcnow()).delete()
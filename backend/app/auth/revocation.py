@@ -0,0 +1,234 @@
+"""
+Revoked token store
+
+Logged-out tokens are recorded by jti in the revoked_tokens table and
+mirrored into an in-memory bloom filter. The common "not revoked" answer
+comes from the filter with no I/O; only filter hits (revoked tokens or the
+rare false positive) are confirmed against the database. Each worker
+reloads new revocations every REVOCATION_SYNC_SECONDS and rebuilds its
+filter from the unexpired rows every REVOCATION_PRUNE_SECONDS.
+
+Checks only read. On the same interval a background thread per worker
+deletes expired revocations and refresh tokens through the write queue;
+the prune-tokens command does the same on demand.
+
+Incremental syncs re-read everything stamped REVOCATION_SYNC_OVERLAP_SECONDS
+before the previous sync: revoked_at is stamped before the row commits, and
+a revocation waiting on SQLite's write lock may become visible up to
+busy_timeout later, so the overlap has to outlast that wait.
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationStore:
+    """Database-backed set of revoked jtis with an in-memory bloom filter"""
+
+    def __init__(self, app, capacity, sync_interval, rebuild_interval, overlap):
+        self.app = app
+        self.capacity = capacity
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.prune_interval = rebuild_interval
+        self.overlap = overlap
+        self._bloom = BloomFilter(capacity)
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self._watermark = None
+        self._rebuilt_at = None
+        self._pruner = None
+        self._pid = None
+        self.checks = 0
+        self.confirmations = 0
+        self.pruned = 0
+        self.prune_failures = 0
+
+    def _ensure_pruner(self):
+        # Threads do not survive fork(), so start one per process
+        if self.prune_interval <= 0 or (self._pruner is not None and self._pid == os.getpid()):
+            return
+        self._pruner = threading.Thread(target=self._run_pruner, name='token-prune', daemon=True)
+        self._pid = os.getpid()
+        self._pruner.start()
+
+    def _run_pruner(self):
+        while True:
+            time.sleep(self.prune_interval)
+            self.prune()
+
+    def prune(self):
+        """Delete expired revocations and refresh tokens; returns the number removed"""
+        from app import db
+
+        with self.app.app_context():
+            try:
+                removed = self.app.extensions['writer'].run(_prune_tokens)
+            except Exception:
+                self.prune_failures += 1
+                self.app.logger.exception('Failed to prune expired tokens')
+                return 0
+            finally:
+                db.session.remove()
+
+        self.pruned += removed
+        return removed
+
+    def _rebuild(self):
+        from app.models import RevokedToken
+
+        # Rows for expired tokens stay until the next prune; those tokens fail
+        # their exp check anyway, so the filter leaves them out
+        jtis = [row.jti for row in RevokedToken.query.with_entities(RevokedToken.jti).filter(
+            RevokedToken.expires_at >= datetime.utcnow()
+        )]
+        capacity = self.capacity
+        while capacity < len(jtis) * 2:
+            capacity *= 2
+
+        bloom = BloomFilter(capacity)
+        for jti in jtis:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._rebuilt_at = time.monotonic()
+
+    def sync(self):
+        """Pull revocations made by other workers (reads only)"""
+        from app.models import RevokedToken
+
+        with self._lock:
+            self._ensure_pruner()
+            now = datetime.utcnow()
+            if self._rebuilt_at is None or time.monotonic() - self._rebuilt_at >= self.rebuild_interval:
+                # Bloom filters cannot delete, so start from the live rows
+                self._rebuild()
+            else:
+                recent = RevokedToken.query.with_entities(RevokedToken.jti).filter(
+                    RevokedToken.revoked_at >= self._watermark
+                )
+                for row in recent:
+                    self._bloom.add(row.jti)
+                if self._bloom.count > self._bloom.capacity:
+                    self._rebuild()
+
+            # Overlap windows to catch rows stamped before, but committed after, this sync
+            self._watermark = now - timedelta(seconds=self.overlap)
+            self._synced_at = time.monotonic()
+
+    def sync_due(self):
+        """Whether the next check pulls revocations from the database first"""
+        return self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_interval
+
+    def needs_database(self, jti):
+        """Whether is_revoked(jti) would query the database (sync due or bloom match)"""
+        return self.sync_due() or jti in self._bloom
+
+    def is_revoked(self, jti):
+        """Check a jti; O(1) and I/O-free unless the bloom filter matches"""
+        if self.sync_due():
+            self.sync()
+
+        self.checks += 1
+        if jti not in self._bloom:
+            return False
+
+        from app.models import RevokedToken
+
+        self.confirmations += 1
+        return RevokedToken.query.filter_by(jti=jti).first() is not None
+
+    def revoke(self, jti, expires_at):
+        """Record a revocation (caller commits) and apply it to this worker immediately"""
+        from app import db
+        from app.models import RevokedToken
+
+        db.session.merge(RevokedToken(jti=jti, expires_at=expires_at))
+        # Should the commit fail, the extra filter entry only costs a lookup
+        with self._lock:
+            self._bloom.add(jti)
+
+    def stats(self):
+        return {
+            'entries': self._bloom.count,
+            'capacity': self._bloom.capacity,
+            'checks': self.checks,
+            'confirmations': self.confirmations,
+            'pruned': self.pruned,
+            'prune_failures': self.prune_failures
+        }
+
+
+def init_app(app):
+    """Attach the revocation store to the app"""
+    app.extensions['revocation'] = RevocationStore(
+        app,
+        capacity=app.config['REVOCATION_BLOOM_CAPACITY'],
+        sync_interval=app.config['REVOCATION_SYNC_SECONDS'],
+        rebuild_interval=app.config['REVOCATION_PRUNE_SECONDS'],
+        overlap=app.config['REVOCATION_SYNC_OVERLAP_SECONDS']
+    )
+
+
+def prune_expired():
+    """Delete revocations of tokens past their expiry (caller commits); returns the number removed"""
+    from app.models import RevokedToken
+
+    return RevokedToken.query.filter(RevokedToken.expires_at < datetime.utcnow()).delete()
+
+
+def _prune_tokens():
+    """Write unit: delete expired refresh tokens and revocations"""
+    from app.auth import refresh
+
+    return refresh.prune_expired() + prune_expired()
+
+
+def is_revoked(payload):
+    """Whether a decoded token has been revoked by logout"""
+    jti = payload.get('jti')
+    return jti is not None and current_app.extensions['revocation'].is_revoked(jti)
+
+
+def needs_database(payload):
+    """Whether checking a decoded token would query the database"""
+    jti = payload.get('jti')
+    return jti is not None and current_app.extensions['revocation'].needs_database(jti)
+
+
+def revoke(payload):
+    """Revoke a decoded token until it would have expired anyway (caller commits)"""
+    jti = payload.get('jti')
+    if jti is not None:
+        expires_at = datetime.utcfromtimestamp(payload['exp'])
+        current_app.extensions['revocation'].revoke(jti, expires_at)
@@ -1,41 +1,50 @@
 from flask import Blueprint, request, jsonify, g
 from app import db
 from app.models import User
-from app.auth.utils import validate_email, validate_password_strength, validate_required_fields
+from app.schemas import LOGIN, REFRESH, SIGNUP
+from app.validation import check_password_strength
+from app.cache import invalidate_user
+from app.auth import hashing, revocation, refresh
+from app.auth.last_login import record_login
+from app.writer import write, DatabaseBusy
+from app.conditional import user_response
+from app.auth.refresh import RefreshTokenError
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
 
 
-@auth_bp.route('/signup', methods=['POST'])
-def signup():
-    """User signup endpoint"""
-    data = request.get_json()
-    
-    # Validate required fields
-    is_valid, missing_fields = validate_required_fields(data, ['email', 'password', 'full_name'])
-    if not is_valid:
-        return jsonify({
-            'error': 'Bad Request',
-            'message': f'Missing required fields: {", ".join(missing_fields)}',
-            'status': 400
-        }), 400
-    
-    email = data['email'].lower().strip()
-    password = data['password']
-    full_name = data['full_name'].strip()
-    
-    # Validate email format
-    is_valid, error_msg = validate_email(email)
-    if not is_valid:
-        return jsonify({
-            'error': 'Bad Request',
-            'message': f'Invalid email: {error_msg}',
-            'status': 400
-        }), 400
-    
-    # Check if email already exists
-    if User.query.filter_by(email=email).first():
+def _create_user(values):
+    """Write unit: insert a user and their first refresh token"""
+    user = User(**values)
+    db.session.add(user)
+    db.session.flush()
+    refresh_token = refresh.issue(user)
+    return user.to_dict(), user.generate_token(), refresh_token
+
+
+def _complete_login(user_id, stamp, password_hash=None):
+    """Write unit: stamp a login, upgrade the hash if needed and issue a refresh token"""
+    user = db.session.get(User, user_id)
+    if password_hash is not None:
+        user.password_hash = password_hash
+    record_login(user, stamp)
+    return refresh.issue(user)
+
+
+def _revoke_session(payload, refresh_token=None):
+    """Write unit: revoke the presented access token and its refresh token's family"""
+    if refresh_token:
+        refresh.revoke_token(refresh_token)
+    revocation.revoke(payload)
+
+
+def _signup_error(data, email_taken):
+    """
+    The response refusing a validated signup payload, or None
+    email_taken: whether a user already has data['email']
+    """
+    if email_taken:
         return jsonify({
             'error': 'Bad Request',
             'message': 'Email already registered',
@@ -43,104 +52,168 @@ def signup():
         }), 400
     
     # Validate password strength
-    is_valid, error_msg = validate_password_strength(password)
-    if not is_valid:
-        return jsonify({
-            'error': 'Bad Request',
-            'message': error_msg,
-            'status': 400
-        }), 400
-    
-    # Create new user
-    user = User(
-        email=email,
-        full_name=full_name,
-        role='user',  # Default role
-        status='active'
-    )
-    user.set_password(password)
-    
-    try:
-        db.session.add(user)
-        db.session.commit()
-        
-        # Generate token
-        token = user.generate_token()
-        
-        return jsonify({
-            'token': token,
-            'user': user.to_dict()
-        }), 201
-    
-    except Exception as e:
-        db.session.rollback()
+    error = check_password_strength(data['password'])
+    if error:
+        return error.response()
+    return None
+
+
+def _new_user(data, password_hash):
+    """Column values of the user a signup creates"""
+    return {
+        'email': data['email'],
+        'full_name': data['full_name'],
+        'role': 'user',  # Default role
+        'status': 'active',
+        'password_hash': password_hash
+    }
+
+
+def _signup_response(created):
+    """201 for _create_user's result, or a 500 when it is None (the write failed)"""
+    if created is None:
         return jsonify({
             'error': 'Internal Server Error',
             'message': 'Failed to create user',
             'status': 500
         }), 500
+    
+    user_data, token, refresh_token = created
+    return jsonify({
+        'token': token,
+        'refresh_token': refresh_token,
+        'user': user_data
+    }), 201
+
+
+def _invalid_credentials():
+    return jsonify({
+        'error': 'Unauthorized',
+        'message': 'Invalid email or password',
+        'status': 401
+    }), 401
+
+
+def _login_response(user, last_login, refresh_token):
+    """200 with the tokens of a recorded login"""
+    invalidate_user(user.id)
+    
+    user_data = user.to_dict(include_timestamps=True)
+    user_data['last_login'] = last_login.isoformat()
+    
+    return jsonify({
+        'token': user.generate_token(),
+        'refresh_token': refresh_token,
+        'user': user_data
+    }), 200
+
+
+@auth_bp.route('/signup', methods=['POST'])
+def signup():
+    """User signup endpoint"""
+    # Required fields, email format and normalization in one pass
+    data, error = SIGNUP.validate(request.get_json())
+    if error:
+        return error.response()
+    
+    # Email not registered yet and a strong password
+    error = _signup_error(data, User.find_by_email(data['email']) is not None)
+    if error:
+        return error
+    
+    # Create new user (hashed here, written by the writer)
+    values = _new_user(data, hashing.hash_password(data['password']))
+    
+    try:
+        created = write(_create_user, values)
+    except DatabaseBusy:
+        raise
+    except Exception:
+        created = None
+    return _signup_response(created)
 
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """User login endpoint"""
-    data = request.get_json()
-    
     # Validate required fields
-    is_valid, missing_fields = validate_required_fields(data, ['email', 'password'])
-    if not is_valid:
-        return jsonify({
-            'error': 'Bad Request',
-            'message': f'Missing required fields: {", ".join(missing_fields)}',
-            'status': 400
-        }), 400
-    
-    email = data['email'].lower().strip()
-    password = data['password']
-    
-    # Find user by email
-    user = User.query.filter_by(email=email).first()
+    data, error = LOGIN.validate(request.get_json())
+    if error:
+        return error.response()
+    
+    # Find user by email and verify credentials
+    user = User.find_by_email(data['email'])
+    if not user or not user.check_password(data['password']):
+        return _invalid_credentials()
+    
+    # Upgrade hashes made with an outdated algorithm or cost
+    password_hash = None
+    if user.password_needs_rehash():
+        password_hash = hashing.hash_password(data['password'])
+    
+    # Update last login (buffered and written in batches unless inline); the
+    # refresh token row is committed before the token is handed out
+    last_login = datetime.utcnow()
+    refresh_token = write(_complete_login, user.id, last_login, password_hash)
+    return _login_response(user, last_login, refresh_token)
+
+
+@auth_bp.route('/refresh', methods=['POST'])
+def refresh_access_token():
+    """Exchange a refresh token for a new access token and refresh token"""
+    data, error = REFRESH.validate(request.get_json(silent=True))
+    if error:
+        return error.response()
     
-    # Verify credentials
-    if not user or not user.check_password(password):
+    try:
+        token, refresh_token = refresh.rotate(data['refresh_token'])
+    except RefreshTokenError as e:
         return jsonify({
             'error': 'Unauthorized',
-            'message': 'Invalid email or password',
+            'message': e.message,
             'status': 401
         }), 401
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.session.commit()
-    
-    # Generate token
-    token = user.generate_token()
-    
     return jsonify({
         'token': token,
-        'user': user.to_dict(include_timestamps=True)
+        'refresh_token': refresh_token
     }), 200
 
 
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
-    """User logout endpoint (client-side token deletion)"""
-    # In JWT-based auth, logout is typically handled client-side
-    # by deleting the token. For enhanced security, you could
-    # implement a token blacklist here.
+    """User logout endpoint (revokes the presented token)"""
+    from app.users.decorators import token_required
     
-    return jsonify({
-        'message': 'Logged out successfully'
-    }), 200
+    @token_required
+    def _logout():
+        data = request.get_json(silent=True) or {}
+        
+        try:
+            write(_revoke_session, g.token_payload, data.get('refresh_token'))
+        except DatabaseBusy:
+            raise
+        except Exception as e:
+            return jsonify({
+                'error': 'Internal Server Error',
+                'message': 'Failed to log out',
+                'status': 500
+            }), 500
+        
+        return jsonify({
+            'message': 'Logged out successfully'
+        }), 200
+    
+    return _logout()
 
 
 @auth_bp.route('/me', methods=['GET'])
 def get_current_user():
     """Get current user information from token"""
-    from app.users.decorators import token_required
+    from app.users.decorators import token_required, current_user_snapshot
     
     @token_required
     def _get_current_user():
-        return jsonify(g.current_user.to_dict(include_timestamps=True)), 200
+        return user_response(current_user_snapshot())
     
     return _get_current_user()
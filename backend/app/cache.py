@@ -0,0 +1,176 @@
+"""
+In-process caches for the authentication hot path
+
+Caches are per app and per worker process. They only ever hold data that
+is safe to serve until its expiry time, or that is explicitly invalidated
+by the code paths that change it.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+
+class TTLCache:
+    """Thread-safe LRU cache with an absolute expiry time per entry"""
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expires_at=None):
+        """Store a value until expires_at (epoch seconds) or the default TTL"""
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        """Invalidate a single entry"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Hit/miss counters for diagnostics"""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class TokenVersionMap:
+    """
+    Latest token_version per user, mirrored from the database
+
+    Only users whose version was ever bumped are listed, and the map is
+    refreshed at most every sync_interval seconds, so stateless auth can
+    reject revoked tokens without loading the user row per request. The
+    first sync loads every bumped user; later ones only read users updated
+    since the previous sync (less overlap seconds, for rows stamped before
+    but committed after it). Every bump also sets updated_at, and versions
+    only grow, so merged rows never need to be taken back out.
+    """
+
+    def __init__(self, sync_interval, overlap):
+        self.sync_interval = sync_interval
+        self.overlap = overlap
+        self._versions = {}
+        self._synced_at = None
+        self._watermark = None
+        self._lock = threading.Lock()
+
+    def _sync(self):
+        from app import db
+        from app.models import User
+
+        now = datetime.utcnow()
+        rows = db.session.query(User.id, User.token_version).filter(User.token_version > 0)
+        if self._watermark is not None:
+            rows = rows.filter(User.updated_at >= self._watermark)
+
+        with self._lock:
+            for user_id, version in rows:
+                if version > self._versions.get(user_id, 0):
+                    self._versions[user_id] = version
+            self._watermark = now - timedelta(seconds=self.overlap)
+            self._synced_at = time.monotonic()
+
+    def sync_due(self):
+        """Whether the next current() call reloads the map from the database"""
+        return self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_interval
+
+    def current(self, user_id):
+        """Minimum token version still accepted for user_id"""
+        if self.sync_due():
+            self._sync()
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_id, version):
+        """Record a revocation made by this process without waiting for a sync"""
+        with self._lock:
+            self._versions[user_id] = max(version, self._versions.get(user_id, 0))
+
+
+def init_app(app):
+    """Attach the configured caches to the app"""
+    if app.config['TOKEN_CACHE_ENABLED']:
+        app.extensions['token_cache'] = TTLCache(app.config['TOKEN_CACHE_SIZE'])
+
+    if app.config['USER_CACHE_TTL'] > 0:
+        app.extensions['user_cache'] = TTLCache(
+            app.config['USER_CACHE_SIZE'],
+            ttl=app.config['USER_CACHE_TTL']
+        )
+
+    app.extensions['token_versions'] = TokenVersionMap(
+        app.config['TOKEN_VERSION_SYNC_SECONDS'],
+        overlap=app.config['TOKEN_VERSION_SYNC_OVERLAP_SECONDS']
+    )
+
+
+def get_user_snapshot(user_id):
+    """Return a UserSnapshot for user_id, or None if the user does not exist"""
+    from app.models import User
+
+    cache = current_app.extensions.get('user_cache')
+    snapshot = cache.get(user_id) if cache is not None else None
+    if snapshot is None:
+        user = User.query.get(user_id)
+        if user is None:
+            return None
+        snapshot = user.snapshot()
+        if cache is not None:
+            cache.set(user_id, snapshot)
+
+    return snapshot
+
+
+def invalidate_user(user_id, token_version=None):
+    """Drop cached state after the user row has changed"""
+    cache = current_app.extensions.get('user_cache')
+    if cache is not None:
+        cache.pop(user_id)
+
+    if token_version:
+        current_app.extensions['token_versions'].bump(user_id, token_version)
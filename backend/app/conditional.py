@@ -0,0 +1,76 @@
+"""
+Conditional GET for polled endpoints
+
+Profile reads are validated by the user's updated_at and last_login;
+listings by the 'version' counter, which changes to the listed user
+fields bump (see app.counters). Handlers check the request's
+If-None-Match / If-Modified-Since before building a body and answer 304
+Not Modified when it still matches, so a hit costs neither serialization
+nor bandwidth. Responses carry
+Cache-Control: no-cache so clients always revalidate.
+"""
+import hashlib
+from datetime import timezone
+
+from flask import current_app, jsonify, request
+
+
+def _stamp(value):
+    return value.strftime('%Y%m%d%H%M%S%f') if value is not None else '0'
+
+
+def user_validators(user):
+    """
+    Validators for a single user's representation
+    Returns: (etag, last_modified)
+    """
+    etag = f'user-{user.id}-{_stamp(user.updated_at)}-{_stamp(user.last_login)}'
+    stamps = [stamp for stamp in (user.updated_at, user.last_login) if stamp is not None]
+    return etag, max(stamps) if stamps else None
+
+
+def listing_etag(version):
+    """Validator for a listing: the users table version plus the query string"""
+    args = hashlib.sha1(request.query_string).hexdigest()[:16]
+    return f'users-{version}-{args}'
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        # HTTP dates have whole-second resolution
+        modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return modified <= request.if_modified_since
+    return False
+
+
+def with_validators(response, etag, last_modified=None):
+    """Attach validators and a revalidate-always cache policy to response"""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """A 304 response if the request's validators still match, else None"""
+    if request.method not in ('GET', 'HEAD') or not _not_modified(etag, last_modified):
+        return None
+    return with_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def user_response(user):
+    """A user's representation with its validators, or a 304 if the client's copy is current"""
+    etag, last_modified = user_validators(user)
+
+    # The client's copy is current: skip serialization entirely
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+
+    response = jsonify(user.to_dict(include_timestamps=True))
+    return with_validators(response, etag, last_modified), 200
@@ -8,13 +8,107 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or os.environ.get('SECRET_KEY') or 'dev-jwt-secret-change-in-production'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_EXPIRATION_HOURS = int(os.environ.get('JWT_EXPIRATION_HOURS', 24))
-    JWT_EXPIRATION_DELTA = timedelta(hours=JWT_EXPIRATION_HOURS)
+    # Access token lifetime; set to a few minutes when clients use /api/auth/refresh
+    JWT_ACCESS_EXPIRATION_MINUTES = int(os.environ.get('JWT_ACCESS_EXPIRATION_MINUTES', JWT_EXPIRATION_HOURS * 60))
+    JWT_EXPIRATION_DELTA = timedelta(minutes=JWT_ACCESS_EXPIRATION_MINUTES)
+    JWT_REFRESH_EXPIRATION_DAYS = int(os.environ.get('JWT_REFRESH_EXPIRATION_DAYS', 14))
+    JWT_REFRESH_EXPIRATION_DELTA = timedelta(days=JWT_REFRESH_EXPIRATION_DAYS)
     
     # CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(',')
     
+    # JSON encoding: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    
     # Pagination
     USERS_PER_PAGE = 10
+    
+    # Most users a single bulk activate/deactivate request may touch
+    ADMIN_BULK_LIMIT = int(os.environ.get('ADMIN_BULK_LIMIT', 10000))
+    
+    # Bulk user import: rows per INSERT/commit, and rejected rows echoed back by the endpoint
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+    IMPORT_ERROR_REPORT_LIMIT = int(os.environ.get('IMPORT_ERROR_REPORT_LIMIT', 1000))
+    
+    # Streaming user export: rows fetched from the database cursor per chunk
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+    
+    # SQLite tuning applied to every new connection (ignored for other databases)
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -65536)),  # negative = KiB
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 268435456)),
+        'temp_store': 'MEMORY',
+    }
+    
+    # Connection pool for non-SQLite databases. Sized per gunicorn worker from
+    # its thread count and capped so all workers fit in DB_MAX_CONNECTIONS.
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 1))
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 90))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))  # 0 = derive from threads
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', -1))  # -1 = derive
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
+    # Async engine used by the ASGI entry point (asgi.py); derived from the
+    # database URL with the aiosqlite or asyncpg driver when unset
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+    
+    # Single-writer queue for file-backed SQLite: request writes are committed
+    # in groups by one thread per worker, and workers take turns via a lock file
+    WRITE_QUEUE_ENABLED = os.environ.get('WRITE_QUEUE_ENABLED', 'true').lower() == 'true'
+    WRITE_QUEUE_BATCH_SIZE = int(os.environ.get('WRITE_QUEUE_BATCH_SIZE', 64))
+    WRITE_QUEUE_LIMIT = int(os.environ.get('WRITE_QUEUE_LIMIT', 256))
+    WRITE_QUEUE_TIMEOUT = int(os.environ.get('WRITE_QUEUE_TIMEOUT', 10))
+    
+    # Password hashing pool (0 = hash inline on the request thread)
+    HASHING_POOL_SIZE = int(os.environ.get('HASHING_POOL_SIZE', min(4, os.cpu_count() or 1)))
+    HASHING_QUEUE_LIMIT = int(os.environ.get('HASHING_QUEUE_LIMIT', 32))
+    # Pool processes bulk hashing (admin imports) may use (0 = all but one)
+    HASHING_BULK_WORKERS = int(os.environ.get('HASHING_BULK_WORKERS', 0))
+    
+    # Cache of verified JWT payloads, keyed by token digest
+    TOKEN_CACHE_ENABLED = os.environ.get('TOKEN_CACHE_ENABLED', 'true').lower() == 'true'
+    TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 10000))
+    
+    # Cache of user snapshots read by token_required (0 disables). Writes in
+    # this process invalidate it; other workers see changes after the TTL.
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+    
+    # Stateless auth: trust role/status claims in the token instead of loading
+    # the user, rejecting tokens older than the user's token_version
+    AUTH_STATELESS = os.environ.get('AUTH_STATELESS', 'false').lower() == 'true'
+    TOKEN_VERSION_SYNC_SECONDS = int(os.environ.get('TOKEN_VERSION_SYNC_SECONDS', 5))
+    # Syncs re-read users updated this far behind the previous one (keep above the SQLite busy_timeout)
+    TOKEN_VERSION_SYNC_OVERLAP_SECONDS = int(os.environ.get('TOKEN_VERSION_SYNC_OVERLAP_SECONDS', 30))
+    
+    # Logout revocation store (bloom filter mirrored from revoked_tokens)
+    REVOCATION_BLOOM_CAPACITY = int(os.environ.get('REVOCATION_BLOOM_CAPACITY', 100000))
+    REVOCATION_SYNC_SECONDS = int(os.environ.get('REVOCATION_SYNC_SECONDS', 5))
+    # Re-read revocations this far behind the last sync; keep it above the
+    # SQLite busy_timeout so rows committed late are still picked up
+    REVOCATION_SYNC_OVERLAP_SECONDS = int(os.environ.get('REVOCATION_SYNC_OVERLAP_SECONDS', 30))
+    # Delete expired revocations and refresh tokens, and rebuild the filter without them
+    REVOCATION_PRUNE_SECONDS = int(os.environ.get('REVOCATION_PRUNE_SECONDS', 3600))
+    
+    # Write-behind last_login stamps: flushed every N seconds or once M users
+    # are waiting (0 seconds = write the stamp with the login)
+    LAST_LOGIN_FLUSH_SECONDS = float(os.environ.get('LAST_LOGIN_FLUSH_SECONDS', 5))
+    LAST_LOGIN_FLUSH_SIZE = int(os.environ.get('LAST_LOGIN_FLUSH_SIZE', 1000))
+    
+    # Password hasher: 'bcrypt', 'scrypt' or 'argon2id'
+    # Tune costs per host with: flask calibrate-hasher --target-ms 50
+    PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'bcrypt')
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    SCRYPT_COST = int(os.environ.get('SCRYPT_COST', 15))
+    ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', 3))
+    ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', 65536))
+    ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', 4))
 
 
 class DevelopmentConfig(Config):
@@ -53,6 +147,11 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    HASHING_POOL_SIZE = 0
+    BCRYPT_ROUNDS = 4
+    LAST_LOGIN_FLUSH_SECONDS = 0
+    # In-memory databases have no journal file or pages worth mapping
+    SQLITE_PRAGMAS = {**Config.SQLITE_PRAGMAS, 'journal_mode': 'MEMORY', 'mmap_size': 0}
 
 
 # Configuration dictionary
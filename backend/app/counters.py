@@ -0,0 +1,125 @@
+"""
+Materialized user counts
+
+The user_counters table keeps the total number of users plus counts per
+role and per status, so listings can report totals without a COUNT(*).
+A 'version' counter validates cached listings. Listings return updated_at,
+which every ORM update stamps, so it is bumped by inserts, deletes and any
+update. Buffered last_login stamps bump it once per flush rather than once
+per login. ORM writes keep the counters current through mapper events, in
+the same transaction as the change; set-based writes that bypass the ORM
+must call adjust_counters themselves.
+"""
+from sqlalchemy import event, func, insert, select, update
+
+from app import db
+from app.models import User, UserCounter
+
+TOTAL = 'total'
+VERSION = 'version'
+
+
+def counter_keys(role, status):
+    """Counter names a user with this role and status contributes to"""
+    return [TOTAL, f'role:{role}', f'status:{status}']
+
+
+def _insert_counter(dialect, name, delta):
+    """INSERT of a new counter that adds to the row instead if a concurrent writer created it first"""
+    table = UserCounter.__table__
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(table).values(name=name, value=delta)
+
+    statement = dialect_insert(table).values(name=name, value=delta)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={'value': table.c.value + statement.excluded.value}
+    )
+
+
+def adjust_counters(connection, deltas):
+    """Apply {name: delta} to the counters using the given connection"""
+    table = UserCounter.__table__
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        result = connection.execute(
+            update(table).where(table.c.name == name).values(value=table.c.value + delta)
+        )
+        if result.rowcount == 0:
+            connection.execute(_insert_counter(connection.dialect.name, name, delta))
+
+
+def counter_query(name):
+    """SELECT of one counter's value (no row if it was never touched)"""
+    return select(UserCounter.value).where(UserCounter.name == name)
+
+
+def get_counter(name):
+    """Current value of a counter (0 if it was never touched)"""
+    value = db.session.execute(counter_query(name)).scalar()
+    return value or 0
+
+
+def total_counter(role=None, status=None):
+    """Name of the counter holding the total for at most one role or status filter"""
+    if role and status:
+        return None
+    if role:
+        return f'role:{role}'
+    if status:
+        return f'status:{status}'
+    return TOTAL
+
+
+def recount():
+    """Rebuild every counter from the users table"""
+    # The version only ever moves forward, or stale listings would validate
+    deltas = {TOTAL: 0, VERSION: get_counter(VERSION) + 1}
+    for column in ('role', 'status'):
+        rows = db.session.execute(
+            select(getattr(User, column), func.count()).group_by(getattr(User, column))
+        )
+        for value, count in rows:
+            deltas[f'{column}:{value}'] = count
+    deltas[TOTAL] = db.session.execute(select(func.count()).select_from(User)).scalar()
+
+    db.session.execute(UserCounter.__table__.delete())
+    db.session.execute(insert(UserCounter.__table__), [
+        {'name': name, 'value': value} for name, value in deltas.items()
+    ])
+    db.session.commit()
+    return deltas
+
+
+@event.listens_for(User, 'after_insert')
+def _user_inserted(mapper, connection, user):
+    deltas = {key: 1 for key in counter_keys(user.role, user.status)}
+    deltas[VERSION] = 1
+    adjust_counters(connection, deltas)
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, user):
+    deltas = {key: -1 for key in counter_keys(user.role, user.status)}
+    deltas[VERSION] = 1
+    adjust_counters(connection, deltas)
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, user):
+    attrs = db.inspect(user).attrs
+    deltas = {}
+    # Any column change means an UPDATE, and with it a new updated_at
+    if any(attrs[column.key].history.has_changes() for column in mapper.column_attrs):
+        deltas[VERSION] = 1
+    for column in ('role', 'status'):
+        history = attrs[column].history
+        if history.has_changes() and history.deleted:
+            deltas[f'{column}:{history.deleted[0]}'] = -1
+            deltas[f'{column}:{getattr(user, column)}'] = 1
+    adjust_counters(connection, deltas)
@@ -0,0 +1,141 @@
+"""
+Database engine tuning
+
+SQLite gets the SQLITE_PRAGMAS profile applied on every new DBAPI
+connection, so WAL mode, busy timeouts and cache sizing hold for each
+pooled connection rather than only the first one. pysqlite's own
+transaction handling stays: reads run outside a transaction and a write
+opens one just before its first statement, so it waits out busy_timeout
+for the lock instead of failing on a stale read snapshot. The writer
+opens its batches with begin_immediate() instead, which takes the lock
+up front and keeps its SAVEPOINTs inside one transaction (on their own,
+a SAVEPOINT would open the transaction and its RELEASE commit it).
+
+Other databases (PostgreSQL in production) get a connection pool sized
+from the gunicorn worker and thread counts, instrumented so checkout
+waits and overflow show up in diagnostics before they become latency.
+"""
+import time
+
+from flask import current_app
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from app import db
+from app.metrics import LatencyStats
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = LatencyStats()
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.checkout_wait.record(time.perf_counter() - start)
+
+
+def pool_options(config, concurrency=None):
+    """
+    Engine pool options derived from the per-process request concurrency
+
+    Every gunicorn worker owns a separate pool, so each one is sized for
+    its own threads (or the given concurrency) and the total is kept under
+    DB_MAX_CONNECTIONS.
+    """
+    per_worker_cap = max(1, config['DB_MAX_CONNECTIONS'] // max(1, config['WEB_CONCURRENCY']))
+    concurrency = concurrency or config['GUNICORN_THREADS']
+    pool_size = config['DB_POOL_SIZE'] or min(concurrency, per_worker_cap)
+    max_overflow = config['DB_MAX_OVERFLOW']
+    if max_overflow < 0:
+        max_overflow = max(0, min(pool_size, per_worker_cap - pool_size))
+
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def configure_engine_options(app):
+    """Fill in pool options before the engine is created (non-SQLite only)"""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if uri.startswith('sqlite'):
+        return
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **pool_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
+
+
+def _apply_sqlite_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    return on_connect
+
+
+def begin_immediate(session):
+    """
+    Start session's transaction holding SQLite's write lock, waiting up to
+    busy_timeout for it; a no-op on other databases
+    """
+    connection = session.connection()
+    # In-memory databases share one connection (StaticPool) between sessions,
+    # so another session may already have the transaction open
+    if connection.dialect.name == 'sqlite' and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def init_app(app):
+    """Register engine event hooks for the configured database"""
+    with app.app_context():
+        engine = db.engine
+
+    if engine.dialect.name == 'sqlite' and app.config['SQLITE_PRAGMAS']:
+        event.listen(engine, 'connect', _apply_sqlite_pragmas(app.config['SQLITE_PRAGMAS']))
+
+
+def diagnostics():
+    """Effective database settings, read back from a live connection"""
+    engine = db.engine
+    info = {'dialect': engine.dialect.name}
+
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as connection:
+            info['pragmas'] = {
+                name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+                for name in current_app.config['SQLITE_PRAGMAS']
+            }
+
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        info['pool'] = {
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(0, pool.overflow()),
+            'max_overflow': pool._max_overflow,
+        }
+        if isinstance(pool, InstrumentedQueuePool):
+            info['pool']['timeouts'] = pool.timeouts
+            info['pool']['checkout_wait'] = pool.checkout_wait.to_dict()
+
+    return info
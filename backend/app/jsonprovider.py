@@ -0,0 +1,95 @@
+"""
+Fast JSON provider
+
+Every jsonify() call and every dict returned from a view is encoded by the
+app's JSON provider. This one writes datetimes as ISO 8601 (the format
+User.to_dict uses) instead of Flask's HTTP dates, so list endpoints can
+hand over raw datetime values and skip per-row isoformat() calls. When
+orjson is installed it does the encoding in C, datetimes included, and
+writes bytes straight into the response; otherwise the stdlib json module
+is used. JSON_PROVIDER picks 'auto' (orjson if available), 'orjson' or
+'stdlib'.
+"""
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+PROVIDERS = ('auto', 'orjson', 'stdlib')
+
+
+def _default(o):
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider with ISO 8601 datetimes, backed by orjson when available"""
+
+    default = staticmethod(_default)
+    sort_keys = False
+    use_orjson = orjson is not None
+
+    def _orjson_dumps(self, obj, option=0):
+        """Encode with orjson, or None when it cannot represent obj (e.g. huge ints)"""
+        try:
+            return orjson.dumps(obj, default=_default, option=option | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            data = self._orjson_dumps(obj)
+            if data is not None:
+                return data.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+
+        data = self._orjson_dumps(obj, option)
+        if data is None:
+            return super().response(obj)
+        return self._app.response_class(data, mimetype=self.mimetype)
+
+
+def init_app(app):
+    """Install the JSON provider selected by JSON_PROVIDER"""
+    choice = app.config['JSON_PROVIDER']
+    if choice not in PROVIDERS:
+        raise ValueError(f'JSON_PROVIDER must be one of: {", ".join(PROVIDERS)}')
+    if choice == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_PROVIDER is orjson but orjson is not installed')
+
+    provider = FastJSONProvider(app)
+    provider.use_orjson = orjson is not None and choice != 'stdlib'
+    app.json = provider
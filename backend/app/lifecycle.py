@@ -0,0 +1,47 @@
+"""
+Process lifecycle hooks for pre-forking servers
+
+With preload_app, gunicorn imports the app once in the master and forks
+workers from it. Pooled database connections must not cross that fork: two
+processes sharing one socket corrupt each other's protocol state. The
+master drops its connections before forking, and each worker replaces the
+pools it inherited without closing the parent's sockets. Background
+threads (writer, last_login flush, token prune, hashing pool) are started per
+process on first use. At worker exit, buffered last_login stamps are
+flushed and queued writes committed before the process goes away.
+
+gunicorn.conf.py calls these hooks. Each one accepts either the Flask app
+or the ASGI app wrapping it.
+"""
+from app import db
+
+
+def flask_app(app):
+    """The Flask app behind app, which may be the ASGI wrapper"""
+    return getattr(app, 'flask_app', app)
+
+
+def before_fork(app):
+    """In the master: close every pooled connection so workers inherit none"""
+    app = flask_app(app)
+    with app.app_context():
+        db.engine.dispose()
+
+
+def after_fork(app):
+    """In a new worker: start fresh pools, leaving the parent's sockets alone"""
+    app = flask_app(app)
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    async_engine = app.extensions.get('async_engine')
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+def shutdown(app):
+    """At worker exit: write buffered stamps and queued writes, stop helpers"""
+    app = flask_app(app)
+    app.extensions['last_login'].close()
+    app.extensions['writer'].close()
+    app.extensions['hashing'].shutdown()
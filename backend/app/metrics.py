@@ -0,0 +1,29 @@
+import threading
+
+
+class LatencyStats:
+    """Thread-safe running latency summary (count, average, max)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """Record a single observation, in seconds"""
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def to_dict(self):
+        """Summarize recorded latencies in milliseconds"""
+        with self._lock:
+            avg = (self.total / self.count) if self.count else 0.0
+            return {
+                'count': self.count,
+                'avg_ms': round(avg * 1000, 3),
+                'max_ms': round(self.max * 1000, 3)
+            }
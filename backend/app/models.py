@@ -1,7 +1,7 @@
+import uuid
 from datetime import datetime
 from app import db
-import bcrypt
-import jwt
+from app.auth import hashing
 from flask import current_app
 
 
@@ -18,21 +18,45 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
+    token_version = db.Column(db.Integer, nullable=False, default=0)  # bumped to revoke issued tokens
+    
+    __table_args__ = (
+        # Listing order and keyset pagination cursor
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+        # Listings filtered by status or role, in listing order
+        db.Index('ix_users_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_users_role_created_at_id', 'role', 'created_at', 'id'),
+        # Case-insensitive email lookups
+        db.Index('ix_users_email_lower', db.func.lower(email)),
+        # Stateless token version map: revoked users, synced by updated_at
+        db.Index('ix_users_token_version_updated_at', 'updated_at',
+                 sqlite_where=token_version > 0, postgresql_where=token_version > 0),
+    )
     
     def __repr__(self):
         return f'<User {self.email}>'
     
+    @staticmethod
+    def email_matches(email):
+        """Case-insensitive email criterion (uses ix_users_email_lower)"""
+        return db.func.lower(User.email) == email.lower()
+    
+    @staticmethod
+    def find_by_email(email):
+        """Case-insensitive lookup by email (uses ix_users_email_lower)"""
+        return User.query.filter(User.email_matches(email)).first()
+    
     def set_password(self, password):
         """Hash and set the user's password"""
-        password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+        self.password_hash = hashing.hash_password(password)
     
     def check_password(self, password):
         """Verify password against stored hash"""
-        password_bytes = password.encode('utf-8')
-        hash_bytes = self.password_hash.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hash_bytes)
+        return hashing.check_password(password, self.password_hash)
+    
+    def password_needs_rehash(self):
+        """Check whether the stored hash uses an outdated algorithm or cost"""
+        return hashing.needs_rehash(self.password_hash)
     
     def to_dict(self, include_timestamps=False):
         """Serialize user data (excluding password)"""
@@ -53,6 +77,14 @@ class User(db.Model):
         
         return data
     
+    def snapshot(self):
+        """Detached, read-only copy of this user for request-scoped caching"""
+        return UserSnapshot(self)
+    
+    def revoke_tokens(self):
+        """Invalidate every token issued to this user so far"""
+        self.token_version = (self.token_version or 0) + 1
+    
     def generate_token(self):
         """Generate JWT token for the user"""
         from datetime import datetime, timedelta
@@ -61,10 +93,15 @@ class User(db.Model):
             'user_id': self.id,
             'email': self.email,
             'role': self.role,
+            'status': self.status,
+            'ver': self.token_version or 0,
+            'jti': uuid.uuid4().hex,
             'exp': datetime.utcnow() + current_app.config['JWT_EXPIRATION_DELTA'],
             'iat': datetime.utcnow()
         }
         
+        import jwt
+
         token = jwt.encode(
             payload,
             current_app.config['SECRET_KEY'],
@@ -76,6 +113,8 @@ class User(db.Model):
     @staticmethod
     def verify_token(token):
         """Verify and decode JWT token"""
+        import jwt
+
         try:
             payload = jwt.decode(
                 token,
@@ -87,3 +126,75 @@ class User(db.Model):
             return None  # Token expired
         except jwt.InvalidTokenError:
             return None  # Invalid token
+
+
+class UserCounter(db.Model):
+    """Materialized user count (total, per role, per status)"""
+    __tablename__ = 'user_counters'
+    
+    name = db.Column(db.String(64), primary_key=True)  # 'total', 'role:<role>', 'status:<status>'
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<UserCounter {self.name}={self.value}>'
+
+
+class RevokedToken(db.Model):
+    """Token revoked by logout, kept until the token itself expires"""
+    __tablename__ = 'revoked_tokens'
+    
+    jti = db.Column(db.String(64), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
+
+
+class RefreshToken(db.Model):
+    """Rotating refresh token, stored as a SHA-256 digest"""
+    __tablename__ = 'refresh_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    family_id = db.Column(db.String(32), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    used_at = db.Column(db.DateTime, nullable=True)  # set when rotated
+    revoked_at = db.Column(db.DateTime, nullable=True)
+    
+    user = db.relationship('User')
+    
+    def __repr__(self):
+        return f'<RefreshToken {self.id} user={self.user_id}>'
+
+
+class UserSnapshot:
+    """Read-only copy of a User row, safe to share across requests"""
+    __slots__ = ('id', 'email', 'full_name', 'role', 'status',
+                 'created_at', 'updated_at', 'last_login', 'token_version')
+    
+    def __init__(self, user):
+        for name in self.__slots__:
+            setattr(self, name, getattr(user, name))
+    
+    def __repr__(self):
+        return f'<UserSnapshot {self.email}>'
+    
+    to_dict = User.to_dict
+
+
+class TokenUser:
+    """User identity rebuilt from verified token claims (stateless auth)"""
+    __slots__ = ('id', 'email', 'role', 'status', 'token_version')
+    
+    def __init__(self, payload):
+        self.id = payload['user_id']
+        self.email = payload['email']
+        self.role = payload['role']
+        self.status = payload['status']
+        self.token_version = payload['ver']
+    
+    def __repr__(self):
+        return f'<TokenUser {self.email}>'
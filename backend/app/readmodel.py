@@ -0,0 +1,30 @@
+"""
+Read model for user listings
+
+List endpoints only ever show the same handful of columns, so they select
+exactly those columns as plain rows instead of loading User objects. Rows
+skip the identity map and attribute instrumentation, never carry
+password_hash, and are turned into dicts by one function instead of a
+to_dict call per instance. Rows expose columns as attributes, so keyset
+cursors can be built from them just like from User objects. Timestamps
+stay datetime values; the app's JSON provider writes them as ISO 8601.
+"""
+from app import db
+from app.models import User
+
+COLUMNS = ('id', 'email', 'full_name', 'role', 'status', 'created_at', 'updated_at', 'last_login')
+
+
+def columns(names=COLUMNS):
+    """User column attributes for the given names"""
+    return [getattr(User, name) for name in names]
+
+
+def user_rows(names=COLUMNS):
+    """Query selecting only the given user columns, as rows"""
+    return db.session.query(*columns(names))
+
+
+def serialize_rows(rows, names=COLUMNS):
+    """Turn rows of the given columns into dicts that encode like User.to_dict"""
+    return [dict(zip(names, row)) for row in rows]
@@ -0,0 +1,49 @@
+"""
+Payload schemas of the auth, users and admin endpoints
+
+Shared by the Flask views and their coroutine versions in app.aio.routes.
+Signup and password changes check password strength after their database
+checks, as they always have, with app.validation.check_password_strength.
+"""
+from app.validation import Choice, Email, Password, Schema, Text
+
+ROLES = ('user', 'admin')
+STATUSES = ('active', 'inactive')
+
+SIGNUP = Schema(
+    Email('email'),
+    Password('password'),
+    Text('full_name'),
+)
+
+# Login looks the address up as given, so it is normalized but not parsed
+LOGIN = Schema(
+    Email('email', validate=False),
+    Password('password'),
+)
+
+REFRESH = Schema(
+    Text('refresh_token', strip=False),
+)
+
+PROFILE_UPDATE = Schema(
+    Text('full_name', required=False, empty_message='Full name cannot be empty'),
+    Email('email', required=False),
+    empty_message='No data provided',
+    no_fields_message='No valid fields to update',
+)
+
+PASSWORD_CHANGE = Schema(
+    Password('current_password'),
+    Password('new_password'),
+    missing_message='Current password and new password are required',
+)
+
+# One row of an admin bulk import (CSV or NDJSON)
+IMPORT_ROW = Schema(
+    Email('email'),
+    Password('password', strong=True),
+    Text('full_name'),
+    Choice('role', ROLES, default='user'),
+    Choice('status', STATUSES, default='active'),
+)
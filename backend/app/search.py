@@ -0,0 +1,102 @@
+"""
+User search for the admin console
+
+On SQLite, users_fts is an external-content FTS5 index over email and
+full_name, kept in sync with the users table by triggers and ranked with
+bm25. Other databases (or SQLite builds without FTS5) fall back to LIKE
+matching in listing order.
+"""
+import re
+
+from flask import current_app
+from sqlalchemy import DDL, event, func, or_, text
+
+from app import db
+from app.models import User
+from app.readmodel import user_rows
+
+FTS_TABLE_DDL = (
+    "CREATE VIRTUAL TABLE users_fts USING fts5("
+    "email, full_name, content='users', content_rowid='id')"
+)
+
+FTS_TRIGGERS_DDL = (
+    """CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, email, full_name) VALUES (new.id, new.email, new.full_name);
+    END""",
+    """CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, full_name)
+        VALUES ('delete', old.id, old.email, old.full_name);
+    END""",
+    """CREATE TRIGGER users_fts_au AFTER UPDATE OF email, full_name ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, full_name)
+        VALUES ('delete', old.id, old.email, old.full_name);
+        INSERT INTO users_fts(rowid, email, full_name) VALUES (new.id, new.email, new.full_name);
+    END""",
+)
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def _sqlite_has_fts5(ddl, target, bind, **kw):
+    if bind.dialect.name != 'sqlite':
+        return False
+    options = [row[0] for row in bind.exec_driver_sql('PRAGMA compile_options')]
+    return 'ENABLE_FTS5' in options
+
+
+# Schemas built with db.create_all() (tests, first runs) get the index too
+for _statement in (FTS_TABLE_DDL,) + FTS_TRIGGERS_DDL:
+    event.listen(User.__table__, 'after_create', DDL(_statement).execute_if(callable_=_sqlite_has_fts5))
+event.listen(User.__table__, 'before_drop',
+             DDL('DROP TABLE IF EXISTS users_fts').execute_if(dialect='sqlite'))
+
+
+def search_terms(query):
+    """Lowercased word tokens of a free-text query"""
+    return [term.lower() for term in TERM_PATTERN.findall(query)]
+
+
+def fts_available():
+    """Whether the users_fts index exists on this database (checked once per app)"""
+    available = current_app.extensions.get('search_fts')
+    if available is None:
+        engine = db.engine
+        available = engine.dialect.name == 'sqlite' and db.inspect(engine).has_table('users_fts')
+        current_app.extensions['search_fts'] = available
+    return available
+
+
+def _fts_search(terms, limit):
+    # Every term must match, each as a prefix: "jo smi" -> "jo"* "smi"*
+    match = ' '.join(f'"{term}"*' for term in terms)
+    ids = [row[0] for row in db.session.execute(
+        text('SELECT rowid FROM users_fts WHERE users_fts MATCH :match ORDER BY rank LIMIT :limit'),
+        {'match': match, 'limit': limit}
+    )]
+    if not ids:
+        return []
+
+    users = {user.id: user for user in user_rows().filter(User.id.in_(ids))}
+    return [users[user_id] for user_id in ids if user_id in users]
+
+
+def _like_search(terms, limit):
+    query = user_rows()
+    for term in terms:
+        pattern = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query = query.filter(or_(
+            func.lower(User.email).like(f'{pattern}%', escape='\\'),
+            func.lower(User.full_name).like(f'%{pattern}%', escape='\\')
+        ))
+    return query.order_by(User.created_at.desc(), User.id.desc()).limit(limit).all()
+
+
+def search_users(query, limit):
+    """Listing rows of users matching every term of query, best matches first"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if fts_available():
+        return _fts_search(terms, limit)
+    return _like_search(terms, limit)
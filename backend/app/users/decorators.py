@@ -1,53 +1,101 @@
+import hashlib
 from functools import wraps
-from flask import request, jsonify, g
-from app.models import User
+from flask import request, jsonify, g, current_app
+from app.models import User, UserSnapshot, TokenUser
+from app.cache import get_user_snapshot
+from app.auth import revocation
+
+
+def verify_token_cached(token):
+    """Verify a JWT, reusing the decoded payload for tokens seen recently"""
+    cache = current_app.extensions.get('token_cache')
+    if cache is None:
+        return User.verify_token(token)
+    
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    payload = cache.get(key)
+    if payload is None:
+        payload = User.verify_token(token)
+        if payload:
+            # Entries expire together with the token itself
+            cache.set(key, payload, expires_at=payload['exp'])
+    
+    return payload
+
+
+def current_user_snapshot():
+    """Full snapshot of the current user, loading it if auth was stateless"""
+    user = g.current_user
+    if isinstance(user, UserSnapshot):
+        return user
+    return get_user_snapshot(user.id)
+
+
+def unauthorized(message):
+    """401 response in the API's error format"""
+    return jsonify({
+        'error': 'Unauthorized',
+        'message': message,
+        'status': 401
+    }), 401
+
+
+def verify_request_token():
+    """
+    Read and verify the bearer token of the current request
+    Returns: (payload, None) or (None, error_response)
+    """
+    token = None
+    
+    # Get token from Authorization header
+    if 'Authorization' in request.headers:
+        auth_header = request.headers['Authorization']
+        try:
+            token = auth_header.split(' ')[1]  # Bearer <token>
+        except IndexError:
+            return None, unauthorized('Invalid authorization header format. Use: Bearer <token>')
+    
+    if not token:
+        return None, unauthorized('Authentication token is missing')
+    
+    # Verify token
+    payload = verify_token_cached(token)
+    if not payload:
+        return None, unauthorized('Invalid or expired token')
+    
+    return payload, None
 
 
 def token_required(f):
     """Decorator to require valid JWT token"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        token = None
+        payload, error = verify_request_token()
+        if error:
+            return error
         
-        # Get token from Authorization header
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(' ')[1]  # Bearer <token>
-            except IndexError:
-                return jsonify({
-                    'error': 'Unauthorized',
-                    'message': 'Invalid authorization header format. Use: Bearer <token>',
-                    'status': 401
-                }), 401
+        # Reject tokens revoked by logout
+        if revocation.is_revoked(payload):
+            return unauthorized('Token has been revoked')
         
-        if not token:
-            return jsonify({
-                'error': 'Unauthorized',
-                'message': 'Authentication token is missing',
-                'status': 401
-            }), 401
-        
-        # Verify token
-        payload = User.verify_token(token)
-        if not payload:
-            return jsonify({
-                'error': 'Unauthorized',
-                'message': 'Invalid or expired token',
-                'status': 401
-            }), 401
+        if current_app.config['AUTH_STATELESS'] and 'status' in payload:
+            # Trust the signed claims; only the version map is consulted
+            user = TokenUser(payload)
+            min_version = current_app.extensions['token_versions'].current(user.id)
+        else:
+            # Get user from the snapshot cache (or database)
+            user = get_user_snapshot(payload['user_id'])
+            if not user:
+                return unauthorized('User not found')
+            min_version = user.token_version
         
-        # Get user from database
-        user = User.query.get(payload['user_id'])
-        if not user:
-            return jsonify({
-                'error': 'Unauthorized',
-                'message': 'User not found',
-                'status': 401
-            }), 401
+        # Reject tokens issued before a deactivation or password change
+        if payload.get('ver', 0) < min_version:
+            return unauthorized('Token has been revoked')
         
-        # Store user in request context
+        # Store the read-only user and token claims in request context
         g.current_user = user
+        g.token_payload = payload
         
         return f(*args, **kwargs)
     
@@ -1,92 +1,128 @@
 from flask import Blueprint, request, jsonify, g
 from app import db
 from app.models import User
-from app.users.decorators import token_required, active_user_required
-from app.auth.utils import validate_email, validate_password_strength
+from app.users.decorators import token_required, active_user_required, current_user_snapshot
+from app.schemas import PASSWORD_CHANGE, PROFILE_UPDATE
+from app.validation import check_password_strength
+from app.cache import invalidate_user
+from app.auth import hashing, refresh
+from app.writer import write, DatabaseBusy
+from app.conditional import user_response
 
 users_bp = Blueprint('users', __name__)
 
 
-@users_bp.route('/profile', methods=['GET'])
-@token_required
-@active_user_required
-def get_profile():
-    """Get current user's profile"""
-    return jsonify(g.current_user.to_dict(include_timestamps=True)), 200
+def _update_user(user_id, changes):
+    """Write unit: apply profile changes and return the updated user"""
+    user = db.session.get(User, user_id)
+    for name, value in changes.items():
+        setattr(user, name, value)
+    db.session.flush()
+    return user.to_dict(include_timestamps=True)
 
 
-@users_bp.route('/profile', methods=['PUT'])
-@token_required
-@active_user_required
-def update_profile():
-    """Update current user's profile (name and email)"""
-    data = request.get_json()
-    
-    if not data:
+def _set_password(user_id, password_hash):
+    """Write unit: replace the password hash and revoke every issued token"""
+    user = db.session.get(User, user_id)
+    user.password_hash = password_hash
+    user.revoke_tokens()
+    refresh.revoke_for_user(user.id)
+    refresh_token = refresh.issue(user)
+    db.session.flush()
+    return user.generate_token(), refresh_token, user.token_version
+
+
+def _email_in_use_error(existing_user, user_id):
+    """The response refusing an email that belongs to another user, or None"""
+    if existing_user and existing_user.id != user_id:
         return jsonify({
             'error': 'Bad Request',
-            'message': 'No data provided',
+            'message': 'Email already in use',
             'status': 400
         }), 400
+    return None
+
+
+def _profile_response(user_id, user_data):
+    """200 with _update_user's result, or a 500 when it is None (the write failed)"""
+    if user_data is None:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to update profile',
+            'status': 500
+        }), 500
     
-    user = g.current_user
-    updated = False
-    
-    # Update full name
-    if 'full_name' in data:
-        full_name = data['full_name'].strip()
-        if not full_name:
-            return jsonify({
-                'error': 'Bad Request',
-                'message': 'Full name cannot be empty',
-                'status': 400
-            }), 400
-        user.full_name = full_name
-        updated = True
-    
-    # Update email
-    if 'email' in data:
-        email = data['email'].lower().strip()
-        
-        # Validate email format
-        is_valid, error_msg = validate_email(email)
-        if not is_valid:
-            return jsonify({
-                'error': 'Bad Request',
-                'message': f'Invalid email: {error_msg}',
-                'status': 400
-            }), 400
-        
-        # Check if email is already taken by another user
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user and existing_user.id != user.id:
-            return jsonify({
-                'error': 'Bad Request',
-                'message': 'Email already in use',
-                'status': 400
-            }), 400
-        
-        user.email = email
-        updated = True
-    
-    if not updated:
+    invalidate_user(user_id)
+    return jsonify(user_data), 200
+
+
+def _password_change_error(current_password_ok, new_password):
+    """The response refusing a password change, or None"""
+    if not current_password_ok:
         return jsonify({
             'error': 'Bad Request',
-            'message': 'No valid fields to update',
+            'message': 'Current password is incorrect',
             'status': 400
         }), 400
     
-    try:
-        db.session.commit()
-        return jsonify(user.to_dict(include_timestamps=True)), 200
-    
-    except Exception as e:
-        db.session.rollback()
+    # Validate new password strength
+    error = check_password_strength(new_password)
+    if error:
+        return error.response()
+    return None
+
+
+def _password_response(user_id, changed):
+    """200 with _set_password's new tokens, or a 500 when it is None (the write failed)"""
+    if changed is None:
         return jsonify({
             'error': 'Internal Server Error',
-            'message': 'Failed to update profile',
+            'message': 'Failed to update password',
             'status': 500
         }), 500
+    
+    token, refresh_token, token_version = changed
+    invalidate_user(user_id, token_version)
+    return jsonify({
+        'message': 'Password updated successfully',
+        'token': token,
+        'refresh_token': refresh_token
+    }), 200
+
+
+@users_bp.route('/profile', methods=['GET'])
+@token_required
+@active_user_required
+def get_profile():
+    """Get current user's profile (answers conditional requests with 304)"""
+    return user_response(current_user_snapshot())
+
+
+@users_bp.route('/profile', methods=['PUT'])
+@token_required
+@active_user_required
+def update_profile():
+    """Update current user's profile (name and email)"""
+    # Name and email, stripped and checked, or the first problem found
+    changes, error = PROFILE_UPDATE.validate(request.get_json())
+    if error:
+        return error.response()
+    
+    user_id = g.current_user.id
+    
+    # Check if email is already taken by another user
+    if 'email' in changes:
+        error = _email_in_use_error(User.find_by_email(changes['email']), user_id)
+        if error:
+            return error
+    
+    try:
+        user_data = write(_update_user, user_id, changes)
+    except DatabaseBusy:
+        raise
+    except Exception:
+        user_data = None
+    return _profile_response(user_id, user_data)
 
 
 @users_bp.route('/password', methods=['PUT'])
@@ -94,50 +130,25 @@ def update_profile():
 @active_user_required
 def change_password():
     """Change user's password"""
-    data = request.get_json()
-    
     # Validate required fields
-    if not data or 'current_password' not in data or 'new_password' not in data:
-        return jsonify({
-            'error': 'Bad Request',
-            'message': 'Current password and new password are required',
-            'status': 400
-        }), 400
+    data, error = PASSWORD_CHANGE.validate(request.get_json())
+    if error:
+        return error.response()
     
-    user = g.current_user
-    current_password = data['current_password']
-    new_password = data['new_password']
+    user = User.query.get(g.current_user.id)
     
-    # Verify current password
-    if not user.check_password(current_password):
-        return jsonify({
-            'error': 'Bad Request',
-            'message': 'Current password is incorrect',
-            'status': 400
-        }), 400
-    
-    # Validate new password strength
-    is_valid, error_msg = validate_password_strength(new_password)
-    if not is_valid:
-        return jsonify({
-            'error': 'Bad Request',
-            'message': error_msg,
-            'status': 400
-        }), 400
+    # Verify current password, then the new one's strength
+    error = _password_change_error(user.check_password(data['current_password']), data['new_password'])
+    if error:
+        return error
     
-    # Update password
-    user.set_password(new_password)
+    # Update password and revoke tokens issued with the old one
+    password_hash = hashing.hash_password(data['new_password'])
     
     try:
-        db.session.commit()
-        return jsonify({
-            'message': 'Password updated successfully'
-        }), 200
-    
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({
-            'error': 'Internal Server Error',
-            'message': 'Failed to update password',
-            'status': 500
-        }), 500
+        changed = write(_set_password, user.id, password_hash)
+    except DatabaseBusy:
+        raise
+    except Exception:
+        changed = None
+    return _password_response(user.id, changed)
@@ -0,0 +1,233 @@
+"""
+Declarative request validation
+
+A Schema lists the fields of a JSON payload. It is compiled once, at
+import: each field becomes a single converter function, and every error
+it can report with a fixed message (missing fields, wrong types, empty
+values, bad choices) is built up front as an Invalid, whose JSON body is
+already encoded. Validation is one pass over the fields that normalizes
+values (strip, lowercase, defaults) as it checks them and returns either
+the clean values or a ready-made error.
+
+Email checks (an email_validator parse) are remembered in a small LRU, so
+repeated logins and retries of the same address skip the parse. Password
+strength is one precompiled regex; the rule that failed is only worked out
+for rejected passwords.
+"""
+import json
+import re
+from functools import lru_cache
+from itertools import combinations
+
+from flask import current_app
+
+EMAIL_CACHE_SIZE = 1024
+
+_STRONG_PASSWORD = re.compile(r'(?=.*[A-Z])(?=.*[a-z])(?=.*\d).{8,}', re.DOTALL)
+
+
+class Invalid:
+    """A 400 error whose message and JSON body are built once"""
+
+    __slots__ = ('message', 'body')
+
+    def __init__(self, message):
+        self.message = message
+        self.body = json.dumps({
+            'error': 'Bad Request',
+            'message': message,
+            'status': 400
+        }).encode('utf-8') + b'\n'
+
+    def response(self):
+        """A new response per request (after_request hooks add headers to it)"""
+        return current_app.response_class(self.body, status=400, mimetype='application/json')
+
+
+PASSWORD_TOO_SHORT = Invalid('Password must be at least 8 characters long')
+PASSWORD_NO_UPPERCASE = Invalid('Password must contain at least one uppercase letter')
+PASSWORD_NO_LOWERCASE = Invalid('Password must contain at least one lowercase letter')
+PASSWORD_NO_DIGIT = Invalid('Password must contain at least one digit')
+
+
+def check_password_strength(password):
+    """
+    Minimum 8 characters with an uppercase letter, a lowercase letter and a digit
+    Returns: None, or the Invalid for the first rule the password breaks
+    """
+    if _STRONG_PASSWORD.match(password):
+        return None
+    if len(password) < 8:
+        return PASSWORD_TOO_SHORT
+    if not re.search(r'[A-Z]', password):
+        return PASSWORD_NO_UPPERCASE
+    if not re.search(r'[a-z]', password):
+        return PASSWORD_NO_LOWERCASE
+    return PASSWORD_NO_DIGIT
+
+
+@lru_cache(maxsize=EMAIL_CACHE_SIZE)
+def check_email(email):
+    """
+    Email format check, without DNS lookups
+    Returns: None, or an Invalid with email_validator's reason
+    """
+    # email_validator (and its idna tables) is imported on the first call
+    from email_validator import validate_email, EmailNotValidError
+
+    try:
+        validate_email(email, check_deliverability=False)
+        return None
+    except EmailNotValidError as e:
+        return Invalid(f'Invalid email: {e}')
+
+
+class Field:
+    """
+    A string field of a payload
+
+    Required fields must be present and non-empty; optional ones are only
+    checked when present. Subclasses add to check_value.
+    """
+    default = None
+
+    def __init__(self, name, required=True, strip=True, lower=False, empty_message=None):
+        self.name = name
+        self.required = required
+        self.strip = strip
+        self.lower = lower
+        self.empty_message = empty_message
+
+    def check_value(self, value):
+        """Returns: None, or the Invalid for a normalized value"""
+        return None
+
+    def compile(self):
+        """Returns: convert(value) -> (value, error) with its errors prebuilt"""
+        not_string = Invalid(f'{self.name} must be a string')
+        empty = Invalid(self.empty_message) if self.empty_message else None
+        strip, lower, check_value = self.strip, self.lower, self.check_value
+
+        def convert(value):
+            if not isinstance(value, str):
+                return None, not_string
+            if strip:
+                value = value.strip()
+            if lower:
+                value = value.lower()
+            if empty is not None and not value:
+                return None, empty
+            return value, check_value(value)
+
+        return convert
+
+
+class Text(Field):
+    """Free text, stripped of surrounding whitespace"""
+
+
+class Email(Field):
+    """An email address, stripped, lowercased and format-checked"""
+
+    def __init__(self, name='email', required=True, validate=True):
+        super().__init__(name, required=required, lower=True)
+        self.validate = validate
+
+    def check_value(self, value):
+        return check_email(value) if self.validate else None
+
+
+class Password(Field):
+    """A password, taken as sent; strong=True applies the strength rules"""
+
+    def __init__(self, name='password', required=True, strong=False):
+        super().__init__(name, required=required, strip=False)
+        self.strong = strong
+
+    def check_value(self, value):
+        return check_password_strength(value) if self.strong else None
+
+
+class Choice(Field):
+    """One of a fixed set of values; empty or absent means the default"""
+
+    def __init__(self, name, choices, default):
+        super().__init__(name, required=False)
+        self.choices = frozenset(choices)
+        self.default = default
+        self.invalid = Invalid(f'{name} must be one of: {", ".join(choices)}')
+
+    def compile(self):
+        convert = super().compile()
+
+        def convert_choice(value):
+            value, error = convert(value)
+            if error is None and not value:
+                value = self.default
+            return value, error
+
+        return convert_choice
+
+    def check_value(self, value):
+        return None if not value or value in self.choices else self.invalid
+
+
+class Schema:
+    """
+    A compiled payload schema
+
+    missing_message replaces the list of missing fields in the error;
+    empty_message is reported for an empty body (by default every required
+    field is missing); no_fields_message when none of the fields was sent.
+    """
+
+    def __init__(self, *fields, missing_message=None, empty_message=None, no_fields_message=None):
+        self.fields = fields
+        self._steps = tuple(
+            (field.name, field.required, field.default, field.compile())
+            for field in fields
+        )
+
+        # Every combination of missing required fields, in declaration order
+        required = [field.name for field in fields if field.required]
+        self._missing = {}
+        for size in range(1, len(required) + 1):
+            for names in combinations(required, size):
+                message = missing_message or f'Missing required fields: {", ".join(names)}'
+                self._missing[names] = Invalid(message)
+
+        all_missing = self._missing.get(tuple(required))
+        self._empty = Invalid(empty_message) if empty_message else all_missing
+        self._no_fields = Invalid(no_fields_message) if no_fields_message else None
+
+    def validate(self, data):
+        """
+        Check and normalize a payload in one pass over the fields
+        Returns: (values, None) or (None, Invalid)
+        """
+        if not data or not isinstance(data, dict):
+            return None, self._empty
+
+        values = {}
+        missing = ()
+        error = None
+        for name, required, default, convert in self._steps:
+            value = data.get(name)
+            if required and not value:
+                missing += (name,)
+                continue
+            if value is None:
+                if default is not None:
+                    values[name] = default
+                continue
+            if error is None:
+                values[name], error = convert(value)
+
+        # Missing fields are reported ahead of any other problem
+        if missing:
+            return None, self._missing[missing]
+        if error is not None:
+            return None, error
+        if not values and self._no_fields is not None:
+            return None, self._no_fields
+        return values, None
@@ -0,0 +1,249 @@
+"""
+Single-writer queue for SQLite
+
+SQLite allows one writer at a time, so request threads and gunicorn
+workers that write concurrently mostly wait on each other's locks and
+surface as "database is locked". Request handlers hand their writes to
+this module as units instead: a function that makes its changes through
+db.session and returns plain data. One writer thread per process takes
+whatever units are queued, runs each in its own SAVEPOINT and commits them
+together, so a burst of writes costs one transaction. That transaction
+starts with BEGIN IMMEDIATE: it waits out busy_timeout for the write lock
+up front instead of failing when a read snapshot is upgraded to a write. Writer threads in
+different workers take turns through a lock file next to the database.
+
+A unit that raises only rolls back its own savepoint; its caller gets the
+exception. Other databases (and in-memory SQLite) run units inline in the
+request session and commit straight away.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+from flask import current_app, has_app_context
+from sqlalchemy.exc import OperationalError
+
+from app.metrics import LatencyStats
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+
+class DatabaseBusy(Exception):
+    """Raised when a write could not get its turn at the database in time"""
+
+
+def _is_locked_error(error):
+    return isinstance(error, OperationalError) and 'database is locked' in str(error.orig)
+
+
+def _release_connection(session):
+    """
+    End the caller's read transaction so its pooled connection goes back
+    while it waits; enough waiting requests would otherwise leave the writer
+    thread none to write with. Loaded objects stay in the session with their
+    state. Unflushed changes are refused rather than dropped: writes belong
+    in the unit.
+    """
+    if session.new or session.dirty or session.deleted:
+        raise RuntimeError('write() called with unflushed changes in the session; '
+                           'make them in the write unit instead')
+
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
+
+
+class WriteQueue:
+    """Per-app queue of write units committed in groups by one thread"""
+
+    def __init__(self, app, enabled, batch_size, queue_limit, timeout, lock_path=None):
+        self.app = app
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.lock_path = lock_path
+        self._queue = queue.Queue(maxsize=queue_limit)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.units = 0
+        self.failures = 0
+        self.rejected = 0
+        self.commit_latency = LatencyStats()
+
+    def _ensure_thread(self):
+        # Threads do not survive fork(), so start one per process
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._commit_batch(batch)
+                    return
+                batch.append(item)
+            self._commit_batch(batch)
+
+    @contextmanager
+    def _turn(self):
+        """Hold the cross-process writer lock, where the platform has one"""
+        if self.lock_path is None or fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _commit_batch(self, batch):
+        from app import database, db
+
+        # Units whose callers already gave up are skipped
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        outcomes = []
+        start = time.perf_counter()
+        with self.app.app_context(), self._turn():
+            try:
+                database.begin_immediate(db.session)
+                for fn, args, future in batch:
+                    try:
+                        with db.session.begin_nested():
+                            outcomes.append((future, fn(*args), None))
+                    except Exception as e:
+                        outcomes.append((future, None, DatabaseBusy() if _is_locked_error(e) else e))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self.failures += 1
+                error = DatabaseBusy() if _is_locked_error(e) else e
+                for fn, args, future in batch:
+                    future.set_exception(error)
+                return
+            finally:
+                db.session.remove()
+
+        self.commit_latency.record(time.perf_counter() - start)
+        self.batches += 1
+        self.units += len(batch)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def run(self, fn, *args):
+        """Run a write unit and return its result once it is committed"""
+        from app import db
+
+        if not self.enabled:
+            try:
+                result = fn(*args)
+                db.session.commit()
+                return result
+            except Exception as e:
+                db.session.rollback()
+                if _is_locked_error(e):
+                    raise DatabaseBusy() from e
+                raise
+
+        if has_app_context():
+            _release_connection(db.session())
+
+        future = Future()
+        try:
+            self._queue.put_nowait((fn, args, future))
+        except queue.Full:
+            self.rejected += 1
+            raise DatabaseBusy()
+        self._ensure_thread()
+
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            if future.cancel():
+                self.rejected += 1
+                raise DatabaseBusy()
+            # Already being written; it will finish shortly
+            return future.result()
+
+    def close(self):
+        """Write whatever is queued and stop the writer thread"""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(None)
+        thread.join(timeout=self.timeout)
+        self._thread = None
+
+    def stats(self):
+        return {
+            'mode': 'queue' if self.enabled else 'inline',
+            'queued': self._queue.qsize(),
+            'batch_size': self.batch_size,
+            'batches': self.batches,
+            'units': self.units,
+            'avg_batch': round(self.units / self.batches, 2) if self.batches else 0.0,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'commit_latency': self.commit_latency.to_dict()
+        }
+
+
+def init_app(app):
+    """Attach the write queue; only file-backed SQLite uses the writer thread"""
+    from app import db
+
+    with app.app_context():
+        url = db.engine.url
+
+    file_backed = url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+    app.extensions['writer'] = WriteQueue(
+        app,
+        enabled=app.config['WRITE_QUEUE_ENABLED'] and file_backed,
+        batch_size=app.config['WRITE_QUEUE_BATCH_SIZE'],
+        queue_limit=app.config['WRITE_QUEUE_LIMIT'],
+        timeout=app.config['WRITE_QUEUE_TIMEOUT'],
+        lock_path=f'{url.database}.writer-lock' if file_backed else None
+    )
+
+
+def write(fn, *args):
+    """
+    Run fn(*args) as a write unit; it must return plain data, not ORM objects
+
+    With the writer thread, the caller's session gives its connection back
+    while it waits: objects it loaded stay attached and readable (they do
+    not see the unit's changes until refreshed), and unflushed changes in
+    it raise RuntimeError.
+    """
+    return current_app.extensions['writer'].run(fn, *args)
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point
+Run with: uvicorn asgi:app
+
+The auth, users and admin routes run as coroutines over an async engine;
+everything else is served by the same Flask app as run.py.
+"""
+from dotenv import load_dotenv
+from app.aio import create_asgi_app
+
+# Load environment variables
+load_dotenv()
+
+# Create ASGI app
+app = create_asgi_app()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Load comparison of the WSGI and ASGI entry points
+
+Drives the same request mix through the Flask app on a pool of threads (as
+gunicorn's gthread worker would) and through the ASGI app on one event loop
+with the same number of requests in flight, against one SQLite file. The
+user cache is off so every authenticated request reads the user row.
+Run with: python benchmarks/bench_asgi.py [--concurrency 32] [--requests 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('USER_CACHE_TTL', '0')
+_workdir = tempfile.mkdtemp(prefix='bench-asgi-')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(_workdir, "bench.db")}'
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import db  # noqa: E402
+from app.aio import create_asgi_app, database  # noqa: E402
+from app.config import Config, TestingConfig  # noqa: E402
+from app.models import User  # noqa: E402
+
+# Benchmark the production SQLite profile (WAL), not the test one
+TestingConfig.SQLITE_PRAGMAS = Config.SQLITE_PRAGMAS
+
+MIXES = {
+    'me': [('GET', '/api/auth/me', '', None)],
+    'listing': [('GET', '/api/admin/users', 'per_page=50&count=exact', None)],
+    'login': [('POST', '/api/auth/login', '', {'email': 'admin@example.com', 'password': 'AdminPass123'})],
+}
+
+
+def seed(app, count):
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        db.session.execute(insert(User.__table__), [{
+            'email': f'user{i}@example.com',
+            'password_hash': '$2b$12$' + 'x' * 53,
+            'full_name': f'User Number {i}',
+            'role': 'user',
+            'status': 'active',
+            'created_at': now - timedelta(seconds=i),
+            'updated_at': now - timedelta(seconds=i),
+            'token_version': 0,
+        } for i in range(count)])
+        admin = User(email='admin@example.com', full_name='Admin User', role='admin', status='active')
+        admin.set_password('AdminPass123')
+        db.session.add(admin)
+        db.session.commit()
+        db.session.remove()
+
+
+def run_wsgi(app, plan, headers, concurrency):
+    def one(item):
+        method, path, query, body = item
+        start = time.perf_counter()
+        response = app.test_client().open(path, method=method, query_string=query,
+                                          json=body, headers=headers)
+        assert response.status_code == 200, response.data
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, plan))
+
+
+async def asgi_request(app, item, headers):
+    method, path, query, body = item
+    data = json.dumps(body).encode('utf-8') if body is not None else b''
+    raw_headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+    if body is not None:
+        raw_headers.append((b'content-type', b'application/json'))
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'query_string': query.encode('ascii'), 'root_path': '',
+        'headers': raw_headers, 'server': ('localhost', 80),
+    }
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': data, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    assert sent[0]['status'] == 200, sent[1].get('body')
+
+
+def run_asgi(app, plan, headers, concurrency):
+    async def main():
+        limit = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one(item):
+            async with limit:
+                start = time.perf_counter()
+                await asgi_request(app, item, headers)
+                latencies.append(time.perf_counter() - start)
+
+        try:
+            await asyncio.gather(*[one(item) for item in plan])
+        finally:
+            await database.dispose(app.flask_app)
+        return latencies
+
+    return asyncio.run(main())
+
+
+def report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f'  {name:<5}: {len(latencies) / elapsed:8.0f} req/s   '
+          f'mean {statistics.mean(latencies) * 1000:7.2f} ms   '
+          f'p50 {statistics.median(latencies) * 1000:7.2f} ms   p99 {p99 * 1000:7.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--mix', default='me,listing', help=f'comma separated: {", ".join(MIXES)}')
+    args = parser.parse_args()
+
+    asgi_app = create_asgi_app('testing')
+    flask_app = asgi_app.flask_app
+    seed(flask_app, args.users)
+
+    token = flask_app.test_client().post('/api/auth/login', json={
+        'email': 'admin@example.com', 'password': 'AdminPass123'
+    }).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    kinds = [MIXES[name.strip()] for name in args.mix.split(',')]
+    plan = [kinds[i % len(kinds)][0] for i in range(args.requests)]
+
+    # Warm up statement caches and pools on both paths
+    run_wsgi(flask_app, plan[:50], headers, args.concurrency)
+    run_asgi(asgi_app, plan[:50], headers, args.concurrency)
+
+    print(f'{args.requests} requests ({args.mix}), {args.concurrency} in flight:')
+    for name, runner, app in (('wsgi', run_wsgi, flask_app), ('asgi', run_asgi, asgi_app)):
+        start = time.perf_counter()
+        latencies = runner(app, plan, headers, args.concurrency)
+        report(name, latencies, time.perf_counter() - start)
+
+    flask_app.extensions['writer'].close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Encoding cost of a 100-user admin page
+
+Compares formatting timestamps in Python and encoding with Flask's default
+JSON provider against handing raw listing rows to the app's
+FastJSONProvider, in stdlib and orjson mode.
+Run with: python benchmarks/bench_json.py [--per-page 100]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app import create_app, jsonprovider  # noqa: E402
+from app.jsonprovider import FastJSONProvider  # noqa: E402
+from app.readmodel import serialize_rows  # noqa: E402
+
+
+def rows(per_page):
+    now = datetime.utcnow()
+    return [
+        (i, f'user{i}@example.com', f'User Number {i}', 'user', 'active',
+         now - timedelta(seconds=i, microseconds=i), now - timedelta(seconds=i), now - timedelta(minutes=i))
+        for i in range(per_page)
+    ]
+
+
+def payload(users):
+    return {'users': users, 'total': 5000, 'page': 1, 'pages': 50, 'per_page': len(users)}
+
+
+def formatted_page(page_rows):
+    """The old path: every timestamp formatted in Python, as to_dict does"""
+    return payload([
+        {name: value.isoformat() if isinstance(value, datetime) else value for name, value in user.items()}
+        for user in serialize_rows(page_rows)
+    ])
+
+
+def raw_page(page_rows):
+    """The new path: raw datetimes, encoded by the provider"""
+    return payload(serialize_rows(page_rows))
+
+
+def measure(provider, build, page_rows, iterations):
+    provider.response(build(page_rows))
+    start = time.perf_counter()
+    for _ in range(iterations):
+        provider.response(build(page_rows)).get_data()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    page_rows = rows(args.per_page)
+
+    cases = [('Flask default, formatted timestamps', DefaultJSONProvider(app), formatted_page)]
+    stdlib = FastJSONProvider(app)
+    stdlib.use_orjson = False
+    cases.append(('FastJSONProvider stdlib, raw rows', stdlib, raw_page))
+    if jsonprovider.orjson is not None:
+        cases.append(('FastJSONProvider orjson, raw rows', FastJSONProvider(app), raw_page))
+    else:
+        print('orjson is not installed; skipping the orjson case')
+
+    baseline = None
+    print(f'{args.per_page}-user page, {args.iterations} responses:')
+    for name, provider, build in cases:
+        elapsed = measure(provider, build, page_rows, args.iterations)
+        baseline = baseline or elapsed
+        print(f'  {name:36}: {elapsed * 1e6:9.1f} us  ({baseline / elapsed:5.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
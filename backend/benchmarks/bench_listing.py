@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Per-page CPU cost of the admin user listing
+
+Compares the ORM path (User objects + to_dict) with the read-model path
+(projected rows + serialize_rows) for one page of users, each iteration in
+a fresh session as a request would be.
+Run with: python benchmarks/bench_listing.py [--users 5000] [--per-page 100]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.admin.pagination import listing_order  # noqa: E402
+from app.models import User  # noqa: E402
+from app.readmodel import serialize_rows, user_rows  # noqa: E402
+
+
+def seed(count):
+    now = datetime.utcnow()
+    db.session.execute(insert(User.__table__), [{
+        'email': f'user{i}@example.com',
+        'password_hash': '$2b$12$' + 'x' * 53,
+        'full_name': f'User Number {i}',
+        'role': 'user',
+        'status': 'active',
+        'created_at': now - timedelta(seconds=i),
+        'updated_at': now - timedelta(seconds=i),
+        'last_login': now - timedelta(minutes=i),
+        'token_version': 0,
+    } for i in range(count)])
+    db.session.commit()
+
+
+def orm_page(per_page):
+    users = listing_order(User.query).limit(per_page).all()
+    return [user.to_dict(include_timestamps=True) for user in users]
+
+
+def row_page(per_page):
+    return serialize_rows(listing_order(user_rows()).limit(per_page).all())
+
+
+def measure(fn, per_page, iterations):
+    fn(per_page)  # warm up statement caches
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(per_page)
+        db.session.remove()
+    return (time.process_time() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=300)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed(args.users)
+        assert app.json.dumps(orm_page(args.per_page)) == app.json.dumps(row_page(args.per_page))
+
+        before = measure(orm_page, args.per_page, args.iterations)
+        after = measure(row_page, args.per_page, args.iterations)
+
+    print(f'{args.per_page} users per page, {args.iterations} pages, CPU time per page:')
+    print(f'  ORM objects + to_dict : {before * 1000:8.3f} ms')
+    print(f'  rows + serialize_rows : {after * 1000:8.3f} ms')
+    print(f'  speedup               : {before / after:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cold start time of the app factory, with an import-time breakdown
+
+Each run is a fresh interpreter that imports the app and calls
+create_app(), as a scaled-from-zero container or the migrate-then-serve
+Docker command does. Prints the median import and create_app() times, the
+packages that took the longest to import (from python -X importtime) and
+exits non-zero when the median total is over --budget-ms or a dependency
+that should load on first use was imported at startup.
+Run with: python benchmarks/bench_startup.py [--runs 7] [--budget-ms 900]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Needed only by the requests (or CLI commands) that use them; tests/test_startup.py
+# checks the same list
+LAZY_MODULES = ('bcrypt', 'jwt', 'email_validator', 'flask_migrate', 'alembic',
+                'argon2', 'multiprocessing', 'concurrent.futures.process')
+
+SNIPPET = f"""
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app({{config!r}})
+created = time.perf_counter()
+print(json.dumps({{{{
+    'import_ms': (imported - start) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'eager': [name for name in {LAZY_MODULES!r} if name in sys.modules],
+}}}}))
+"""
+
+
+def run_once(config, importtime=False):
+    """Returns: (timings, importtime stderr) for one fresh interpreter"""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', SNIPPET.format(config=config)]
+    result = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def import_breakdown(stderr):
+    """Self import time (ms) summed per top-level package, and app.* cumulative times"""
+    packages = defaultdict(float)
+    app_modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        packages[name.split('.')[0]] += int(self_us) / 1000
+        if name == 'app' or name.startswith('app.'):
+            app_modules[name] = int(cumulative_us) / 1000
+    return packages, app_modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--config', default='testing')
+    parser.add_argument('--budget-ms', type=float, default=900,
+                        help='fail when median import + create_app() exceeds this')
+    parser.add_argument('--top', type=int, default=12)
+    args = parser.parse_args()
+
+    # One untimed run to warm the page cache and write .pyc files
+    run_once(args.config)
+    runs = [run_once(args.config)[0] for _ in range(args.runs)]
+    import_ms = statistics.median(run['import_ms'] for run in runs)
+    create_ms = statistics.median(run['create_ms'] for run in runs)
+    total_ms = statistics.median(run['import_ms'] + run['create_ms'] for run in runs)
+
+    print(f'{args.runs} cold starts ({args.config} config), median:')
+    print(f'  import app   : {import_ms:7.1f} ms')
+    print(f'  create_app() : {create_ms:7.1f} ms')
+    print(f'  total        : {total_ms:7.1f} ms   (budget {args.budget_ms:.0f} ms)')
+
+    _, stderr = run_once(args.config, importtime=True)
+    packages, app_modules = import_breakdown(stderr)
+    print('\nSlowest packages to import (self time, -X importtime, one run):')
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f'  {name:<24} {ms:7.1f} ms')
+    print('\nSlowest app modules (cumulative):')
+    for name, ms in sorted(app_modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f'  {name:<24} {ms:7.1f} ms')
+
+    failed = False
+    eager = sorted({name for run in runs for name in run['eager']})
+    if eager:
+        print(f'\nFAIL: imported at startup instead of on first use: {", ".join(eager)}')
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f'\nFAIL: cold start {total_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
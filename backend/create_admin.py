@@ -27,7 +27,7 @@ def create_admin_user():
         ADMIN_NAME = "System Administrator"
         
         # Check if admin user already exists
-        existing_admin = User.query.filter_by(email=ADMIN_EMAIL).first()
+        existing_admin = User.find_by_email(ADMIN_EMAIL)
         if existing_admin:
             print(f"❌ Admin user already exists with email: {ADMIN_EMAIL}")
             print(f"\n📋 Existing Admin Credentials:")
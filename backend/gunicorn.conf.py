@@ -0,0 +1,148 @@
+"""
+Gunicorn configuration
+Run with: gunicorn --config gunicorn.conf.py
+
+Workers and threads are sized from the CPUs this container may use and
+the database backend, unless WEB_CONCURRENCY / GUNICORN_THREADS are set:
+
+- SQLite allows one writer at a time, so a few workers with a few threads
+  each cover it; more processes only add lock handoffs.
+- PostgreSQL gets 2 x CPUs + 1 workers (one per CPU for the async worker),
+  capped so every worker's pool fits in DB_MAX_CONNECTIONS.
+
+The chosen numbers are written back to the environment, where the app
+reads them to size its connection pools. The app is preloaded in the
+master so workers share its memory copy-on-write; app.lifecycle keeps
+database connections from crossing the fork and flushes buffered writes
+when a worker exits. Workers are recycled after GUNICORN_MAX_REQUESTS
+requests (with jitter, so they do not all restart at once).
+
+GUNICORN_WORKER_CLASS picks gthread (default), sync, uvicorn (serves
+asgi:app) or any worker class path.
+"""
+import math
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'uvicorn': 'uvicorn.workers.UvicornWorker',
+}
+ASYNC_WORKER_CLASSES = ('uvicorn.workers.UvicornWorker',)
+
+
+def _cgroup_cpu_quota():
+    """CPU limit of this container in CPUs, or None when unlimited"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:  # cgroup v2
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:  # cgroup v1
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def cpu_count():
+    """CPUs this process may run on, capped by the container's CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS
+        cpus = os.cpu_count() or 1
+
+    quota = _cgroup_cpu_quota()
+    if quota:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+def database_backend(url):
+    """'sqlite' or 'postgresql', from a DATABASE_URL (unset means SQLite)"""
+    return 'sqlite' if not url or url.startswith('sqlite') else 'postgresql'
+
+
+def default_threads(worker_class):
+    """Threads per worker; only the gthread worker runs more than one"""
+    return 4 if worker_class == 'gthread' else 1
+
+
+def default_workers(backend, worker_class, cpus, threads, max_connections):
+    """Worker processes for this backend, CPU count and threads per worker"""
+    if backend == 'sqlite':
+        return max(1, min(cpus, 4))
+
+    workers = cpus if worker_class in ASYNC_WORKER_CLASSES else 2 * cpus + 1
+    # Each worker pools up to one connection per thread
+    return max(1, min(workers, max_connections // threads))
+
+
+_worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+_backend = database_backend(os.environ.get('DATABASE_URL'))
+_cpus = cpu_count()
+
+worker_class = WORKER_CLASSES.get(_worker_class, _worker_class)
+wsgi_app = 'asgi:app' if worker_class in ASYNC_WORKER_CLASSES else 'run:app'
+threads = int(os.environ.get('GUNICORN_THREADS') or default_threads(worker_class))
+workers = int(os.environ.get('WEB_CONCURRENCY') or default_workers(
+    _backend, worker_class, _cpus, threads, int(os.environ.get('DB_MAX_CONNECTIONS', 90))
+))
+
+# The app sizes its connection pools from these
+os.environ['WEB_CONCURRENCY'] = str(workers)
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Heartbeat files on tmpfs, so a slow container disk cannot stall workers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def _preloaded_app(server):
+    # Without preload_app the app is only imported inside each worker
+    return getattr(server.app, 'callable', None)
+
+
+def when_ready(server):
+    application = _preloaded_app(server)
+    if application is not None:
+        from app import lifecycle
+
+        lifecycle.before_fork(application)
+
+
+def post_fork(server, worker):
+    application = _preloaded_app(server)
+    if application is not None:
+        from app import lifecycle
+
+        lifecycle.after_fork(application)
+
+
+def worker_exit(server, worker):
+    application = getattr(worker, 'wsgi', None)
+    if application is not None:
+        from app import lifecycle
+
+        lifecycle.shutdown(application)
@@ -0,0 +1,35 @@
+"""add user_counters
+
+Revision ID: 294ba1f7b22e
+Revises: b51463cd28ca
+Create Date: 2026-10-17 13:30:52.918406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '294ba1f7b22e'
+down_revision = 'b51463cd28ca'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_counters',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    # Backfill from existing rows; the app keeps the counters current from here on
+    op.execute("INSERT INTO user_counters (name, value) SELECT 'total', COUNT(*) FROM users")
+    op.execute("INSERT INTO user_counters (name, value) SELECT 'role:' || role, COUNT(*) FROM users GROUP BY role")
+    op.execute("INSERT INTO user_counters (name, value) SELECT 'status:' || status, COUNT(*) FROM users GROUP BY status")
+    # Seeded so the first writes only ever UPDATE the listing version row
+    op.execute("INSERT INTO user_counters (name, value) VALUES ('version', 0)")
+
+
+def downgrade():
+    op.drop_table('user_counters')
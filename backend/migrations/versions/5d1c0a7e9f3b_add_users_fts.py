@@ -0,0 +1,53 @@
+"""add users_fts search index
+
+Revision ID: 5d1c0a7e9f3b
+Revises: bc3a3dbdbede
+Create Date: 2026-10-17 15:02:11.408312
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1c0a7e9f3b'
+down_revision = 'bc3a3dbdbede'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite only; other backends search with LIKE
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE users_fts USING fts5("
+        "email, full_name, content='users', content_rowid='id')"
+    )
+    op.execute("""CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, email, full_name) VALUES (new.id, new.email, new.full_name);
+    END""")
+    op.execute("""CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, full_name)
+        VALUES ('delete', old.id, old.email, old.full_name);
+    END""")
+    op.execute("""CREATE TRIGGER users_fts_au AFTER UPDATE OF email, full_name ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, full_name)
+        VALUES ('delete', old.id, old.email, old.full_name);
+        INSERT INTO users_fts(rowid, email, full_name) VALUES (new.id, new.email, new.full_name);
+    END""")
+    # Index the users that already exist
+    op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    op.execute('DROP TRIGGER IF EXISTS users_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_ai')
+    op.execute('DROP TABLE IF EXISTS users_fts')
@@ -0,0 +1,26 @@
+"""add token_version
+
+Revision ID: 79f0e8898619
+Revises: 3271b52ea071
+Create Date: 2026-10-17 09:12:44.102318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '79f0e8898619'
+down_revision = '3271b52ea071'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
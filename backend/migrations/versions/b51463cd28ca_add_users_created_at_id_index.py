@@ -0,0 +1,26 @@
+"""add users created_at/id index
+
+Revision ID: b51463cd28ca
+Revises: 28738d06a418
+Create Date: 2026-10-17 12:41:19.263054
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b51463cd28ca'
+down_revision = '28738d06a418'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_created_at_id')
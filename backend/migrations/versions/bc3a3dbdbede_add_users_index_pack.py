@@ -0,0 +1,32 @@
+"""add users index pack
+
+Revision ID: bc3a3dbdbede
+Revises: 294ba1f7b22e
+Create Date: 2026-10-17 14:18:36.740215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bc3a3dbdbede'
+down_revision = '294ba1f7b22e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_status_created_at_id', 'users', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_role_created_at_id', 'users', ['role', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False)
+    op.create_index('ix_users_token_version', 'users', ['token_version'], unique=False,
+                    sqlite_where=sa.text('token_version > 0'),
+                    postgresql_where=sa.text('token_version > 0'))
+
+
+def downgrade():
+    op.drop_index('ix_users_token_version', table_name='users')
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.drop_index('ix_users_role_created_at_id', table_name='users')
+    op.drop_index('ix_users_status_created_at_id', table_name='users')
@@ -0,0 +1,30 @@
+"""index token versions by updated_at
+
+Revision ID: e7c41b6a2d98
+Revises: 5d1c0a7e9f3b
+Create Date: 2026-10-17 16:05:42.913527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c41b6a2d98'
+down_revision = '5d1c0a7e9f3b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_token_version_updated_at', 'users', ['updated_at'], unique=False,
+                    sqlite_where=sa.text('token_version > 0'),
+                    postgresql_where=sa.text('token_version > 0'))
+    op.drop_index('ix_users_token_version', table_name='users')
+
+
+def downgrade():
+    op.create_index('ix_users_token_version', 'users', ['token_version'], unique=False,
+                    sqlite_where=sa.text('token_version > 0'),
+                    postgresql_where=sa.text('token_version > 0'))
+    op.drop_index('ix_users_token_version_updated_at', table_name='users')
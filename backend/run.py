@@ -4,6 +4,7 @@ Application entry point
 Run with: python run.py
 """
 import os
+import click
 from dotenv import load_dotenv
 from app import create_app, db
 from app.models import User
@@ -29,7 +30,7 @@ def create_admin():
     full_name = input("Enter admin full name: ")
     
     # Check if user exists
-    if User.query.filter_by(email=email).first():
+    if User.find_by_email(email):
         print("Error: Email already exists")
         return
     
@@ -48,6 +49,155 @@ def create_admin():
     print(f"Admin user created successfully: {email}")
 
 
+@app.cli.command('calibrate-hasher')
+@click.option('--target-ms', default=50.0, show_default=True,
+              help='Target verify latency in milliseconds')
+@click.option('--algorithm', default=None,
+              help='Hasher to calibrate (defaults to PASSWORD_HASHER)')
+def calibrate_hasher(target_ms, algorithm):
+    """Pick the password hashing cost that hits a target verify latency"""
+    from app.auth import hashers
+    
+    algorithm = algorithm or app.config['PASSWORD_HASHER']
+    if algorithm not in hashers.HASHERS:
+        print(f"Error: Unknown hasher '{algorithm}'")
+        return
+    
+    # Calibrate with the configured parameters (argon2 memory and parallelism)
+    hasher = hashers.from_config(app.config, algorithm)
+    cost, elapsed_ms = hashers.calibrate(hasher, target_ms)
+    
+    print(f"{algorithm}: cost {cost} verifies in {elapsed_ms:.1f} ms (target {target_ms:.0f} ms)")
+    print(f"Set {hasher.cost_setting}={cost} to use it")
+
+
+@app.cli.command('prune-tokens')
+def prune_tokens():
+    """Delete expired refresh tokens and revocation entries"""
+    from app.auth import refresh, revocation
+    from app.writer import write
+    
+    removed_refresh = write(refresh.prune_expired)
+    removed_revoked = write(revocation.prune_expired)
+    
+    print(f"Removed {removed_refresh} refresh tokens and {removed_revoked} revocation entries")
+
+
+@app.cli.command('recount-users')
+def recount_users():
+    """Rebuild the materialized user counters from the users table"""
+    from app.counters import recount
+    
+    for name, value in sorted(recount().items()):
+        print(f"{name}: {value}")
+
+
+@app.cli.command('import-users')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Input format (defaults to the file extension)')
+@click.option('--batch-size', default=None, type=int,
+              help='Rows per INSERT and commit (defaults to IMPORT_BATCH_SIZE)')
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True,
+              help='Password hashing processes')
+@click.option('--errors', 'errors_path', default=None,
+              help='Error report path (defaults to PATH.errors.ndjson)')
+@click.option('--resume/--no-resume', default=True, show_default=True,
+              help='Continue from PATH.checkpoint if an earlier run stopped')
+def import_users(path, fmt, batch_size, workers, errors_path, resume):
+    """Import users from a CSV or NDJSON file"""
+    import json
+    from app.admin import importer
+    from app.auth.hashing import HashingExecutor
+    
+    fmt = fmt or importer.detect_format(name=path)
+    if fmt is None:
+        print("Error: Cannot tell the format from the file name; pass --format")
+        return
+    
+    checkpoint_path = f'{path}.checkpoint'
+    errors_path = errors_path or f'{path}.errors.ndjson'
+    start = 0
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            start = json.load(f)['row']
+        print(f"Resuming after row {start}")
+    
+    def on_checkpoint(row):
+        with open(checkpoint_path, 'w') as f:
+            json.dump({'row': row}, f)
+    
+    # A dedicated pool so the import can use every core
+    executor = HashingExecutor(workers, 0, hasher=app.extensions['hashing'].hasher, bulk_workers=workers)
+    
+    with open(path, newline='', encoding='utf-8-sig') as stream, \
+            open(errors_path, 'a' if start else 'w') as errors:
+        def on_error(row, email, message):
+            errors.write(json.dumps({'row': row, 'email': email, 'message': message}) + '\n')
+        
+        try:
+            summary = importer.import_users(
+                importer.read_rows(stream, fmt),
+                batch_size=batch_size or app.config['IMPORT_BATCH_SIZE'],
+                start=start,
+                executor=executor,
+                on_error=on_error,
+                on_checkpoint=on_checkpoint
+            )
+        finally:
+            executor.shutdown()
+    
+    os.remove(checkpoint_path)
+    print(f"Imported {summary['imported']} of {summary['processed']} rows, "
+          f"{summary['failed']} rejected (see {errors_path})")
+
+
+@app.cli.command('export-users')
+@click.argument('path', type=click.Path(dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default=None,
+              help='Output format (defaults to the file extension, then ndjson)')
+@click.option('--columns', default=None,
+              help='Comma separated columns to export (defaults to all)')
+@click.option('--status', default=None, help='Only export users with this status')
+@click.option('--role', default=None, help='Only export users with this role')
+@click.option('--gzip/--no-gzip', 'compress', default=None,
+              help='Gzip the output (defaults to on when PATH ends in .gz)')
+@click.option('--chunk-size', default=None, type=int,
+              help='Rows fetched per chunk (defaults to EXPORT_CHUNK_SIZE)')
+def export_users(path, fmt, columns, status, role, compress, chunk_size):
+    """Stream users to a NDJSON or CSV file ('-' for stdout)"""
+    import sys
+    from app.admin import exporter
+    
+    name = path[:-3] if path.endswith('.gz') else path
+    fmt = fmt or ('csv' if name.lower().endswith('.csv') else 'ndjson')
+    if compress is None:
+        compress = path.endswith('.gz')
+    
+    try:
+        columns = exporter.parse_columns(columns)
+    except exporter.ExportRequestError as e:
+        print(f"Error: {e.message}")
+        return
+    
+    body = exporter.export_users(
+        columns,
+        fmt,
+        status=status,
+        role=role,
+        chunk_size=chunk_size or app.config['EXPORT_CHUNK_SIZE'],
+        compress=compress
+    )
+    
+    out = sys.stdout.buffer if path == '-' else open(path, 'wb')
+    try:
+        for block in body:
+            out.write(block)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
 if __name__ == '__main__':
     # Tables should be created manually or via flask db upgrade
     # Uncomment below to create tables on first run:
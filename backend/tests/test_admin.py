@@ -111,6 +111,100 @@ def test_get_all_users_pagination(client, admin_headers, app):
     assert data['page'] == 1
 
 
+
+def test_get_all_users_selects_listing_columns_only(client, admin_headers, app):
+    """Test the listing reads plain rows without password_hash and matches to_dict"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        response = client.get('/api/admin/users?count=none', headers=admin_headers)
+        event.remove(db.engine, 'before_cursor_execute', capture)
+        expected = [user.to_dict(include_timestamps=True) for user in User.query.all()]
+
+    listing = [statement for statement in statements if 'FROM users' in statement and 'LIMIT' in statement]
+    assert listing and all('password_hash' not in statement for statement in listing)
+    assert json.loads(response.data)['users'] == expected
+
+
+def test_get_all_users_conditional(client, admin_headers, app, regular_user_headers):
+    """Test listings answer 304 until any user row changes"""
+    response = client.get('/api/admin/users?per_page=5', headers=admin_headers)
+    etag = response.headers['ETag']
+
+    response = client.get('/api/admin/users?per_page=5', headers={**admin_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    # The validator covers the query string too
+    response = client.get('/api/admin/users?per_page=6', headers={**admin_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+
+    with app.app_context():
+        user_id = User.find_by_email('user@example.com').id
+    client.put(f'/api/admin/users/{user_id}/deactivate', headers=admin_headers)
+
+    response = client.get('/api/admin/users?per_page=5', headers={**admin_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert {u['email']: u['status'] for u in json.loads(response.data)['users']}['user@example.com'] == 'inactive'
+
+
+def test_listing_version_follows_core_writes(client, admin_headers, app):
+    """Test bulk updates, imports and recounts all move the listing version"""
+    from app.counters import VERSION, get_counter, recount
+
+    def version():
+        with app.app_context():
+            return get_counter(VERSION)
+
+    with app.app_context():
+        user = User(email='plain@example.com', full_name='Plain', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+
+    before = version()
+    client.put('/api/admin/users/bulk/activate', headers=admin_headers, json={'filter': {'role': 'user'}})
+    assert version() == before
+
+    client.put('/api/admin/users/bulk/deactivate', headers=admin_headers, json={'filter': {'role': 'user'}})
+    assert version() == before + 1
+
+    client.post('/api/admin/users/import', headers=admin_headers, content_type='text/csv',
+                data='email,password,full_name\nnew@example.com,NewPass123,New\n')
+    assert version() == before + 2
+
+    with app.app_context():
+        recount()
+    assert version() == before + 3
+
+
+def test_listing_version_follows_listed_columns(client, app, regular_user_headers):
+    """Test logins and password changes move the listing version, since listings show their timestamps"""
+    from app.counters import VERSION, get_counter
+
+    def version():
+        with app.app_context():
+            return get_counter(VERSION)
+
+    before = version()
+    response = client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'UserPass123'})
+    assert response.status_code == 200
+    assert version() == before + 1
+
+    response = client.put('/api/users/password', headers=regular_user_headers,
+                          json={'current_password': 'UserPass123', 'new_password': 'NewPass1234'})
+    assert response.status_code == 200
+    assert version() == before + 2
+
+    headers = {'Authorization': f'Bearer {json.loads(response.data)["token"]}'}
+    response = client.put('/api/users/profile', headers=headers, json={'full_name': 'Renamed'})
+    assert response.status_code == 200
+    assert version() == before + 3
+
 def test_get_all_users_non_admin(client, regular_user_headers):
     """Test regular user cannot access admin endpoint"""
     response = client.get('/api/admin/users', headers=regular_user_headers)
@@ -185,3 +279,250 @@ def test_activate_nonexistent_user(client, admin_headers):
     assert response.status_code == 404
     data = json.loads(response.data)
     assert 'not found' in data['message'].lower()
+
+
+def test_get_all_users_cursor_pagination(client, admin_headers, app):
+    """Test cursor mode walks every user exactly once"""
+    with app.app_context():
+        for i in range(12):
+            user = User(
+                email=f'user{i}@example.com',
+                full_name=f'User {i}',
+                role='user',
+                status='active'
+            )
+            user.set_password('Pass123')
+            db.session.add(user)
+        db.session.commit()
+
+    seen = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get(f'/api/admin/users?per_page=5&after={cursor}', headers=admin_headers)
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert 'total' not in data
+        seen.extend(user['id'] for user in data['users'])
+        cursor = data['next_cursor']
+
+    assert len(seen) == 13
+    assert len(set(seen)) == 13
+
+
+def test_cursor_pagination_matches_page_order(client, admin_headers, app):
+    """Test cursor and page modes return the same ordering"""
+    with app.app_context():
+        for i in range(6):
+            user = User(
+                email=f'user{i}@example.com',
+                full_name=f'User {i}',
+                role='user',
+                status='active'
+            )
+            user.set_password('Pass123')
+            db.session.add(user)
+        db.session.commit()
+
+    paged = json.loads(client.get('/api/admin/users?per_page=7', headers=admin_headers).data)
+    cursored = json.loads(client.get('/api/admin/users?per_page=7&after=', headers=admin_headers).data)
+
+    assert [u['id'] for u in paged['users']] == [u['id'] for u in cursored['users']]
+    assert cursored['next_cursor'] is None
+
+
+def test_cursor_pagination_invalid_cursor(client, admin_headers):
+    """Test a malformed cursor is rejected"""
+    response = client.get('/api/admin/users?after=not-a-cursor', headers=admin_headers)
+
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert 'cursor' in data['message'].lower()
+
+
+def test_get_all_users_cached_count(client, admin_headers, app, regular_user_headers):
+    """Test cached totals match the exact count and follow status changes"""
+    with app.app_context():
+        for i in range(4):
+            user = User(
+                email=f'user{i}@example.com',
+                full_name=f'User {i}',
+                role='user',
+                status='active'
+            )
+            user.set_password('Pass123')
+            db.session.add(user)
+        db.session.commit()
+        user_id = User.query.filter_by(email='user0@example.com').first().id
+
+    exact = json.loads(client.get('/api/admin/users?per_page=2', headers=admin_headers).data)
+    cached = json.loads(client.get('/api/admin/users?per_page=2&count=cached', headers=admin_headers).data)
+    assert cached['total'] == exact['total'] == 6
+    assert cached['pages'] == exact['pages'] == 3
+
+    client.put(f'/api/admin/users/{user_id}/deactivate', headers=admin_headers)
+
+    with app.app_context():
+        from app.counters import get_counter
+        assert get_counter('status:active') == 5
+        assert get_counter('status:inactive') == 1
+        assert get_counter('role:admin') == 1
+
+
+def test_get_all_users_without_count(client, admin_headers):
+    """Test count=none skips totals entirely"""
+    response = client.get('/api/admin/users?count=none', headers=admin_headers)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['total'] is None
+    assert data['pages'] is None
+    assert len(data['users']) == 1
+
+
+def test_get_all_users_invalid_count_mode(client, admin_headers):
+    """Test an unknown count mode is rejected"""
+    response = client.get('/api/admin/users?count=approximate', headers=admin_headers)
+
+    assert response.status_code == 400
+
+
+def test_recount_rebuilds_counters(app):
+    """Test counters can be rebuilt from the users table"""
+    from app.counters import recount, get_counter
+    from app.models import UserCounter
+
+    with app.app_context():
+        db.session.add(User(email='a@example.com', full_name='A', role='user', status='active', password_hash='x'))
+        db.session.commit()
+        UserCounter.query.delete()
+        db.session.commit()
+
+        recount()
+        assert get_counter('total') == 1
+        assert get_counter('role:user') == 1
+
+
+def test_counter_insert_adds_to_a_concurrently_created_row(app):
+    """Test a first insert that loses the race adds its delta instead of failing"""
+    from app.counters import _insert_counter, get_counter
+
+    with app.app_context():
+        connection = db.session.connection()
+        connection.execute(_insert_counter(connection.dialect.name, 'role:auditor', 1))
+        connection.execute(_insert_counter(connection.dialect.name, 'role:auditor', 2))
+        assert get_counter('role:auditor') == 3
+
+
+def _create_users(app, count, status='active'):
+    with app.app_context():
+        for i in range(count):
+            user = User(
+                email=f'bulk{i}@example.com',
+                full_name=f'Bulk {i}',
+                role='user',
+                status=status
+            )
+            user.password_hash = 'unused'
+            db.session.add(user)
+        db.session.commit()
+        return [u.id for u in User.query.filter(User.email.like('bulk%')).order_by(User.id)]
+
+
+def test_bulk_deactivate_by_ids(client, admin_headers, app, regular_user_headers):
+    """Test one request deactivates many users and reports each id"""
+    ids = _create_users(app, 3)
+    with app.app_context():
+        admin_id = User.query.filter_by(email='admin@example.com').first().id
+        user_id = User.query.filter_by(email='user@example.com').first().id
+
+    client.put(f'/api/admin/users/{ids[2]}/deactivate', headers=admin_headers)
+
+    response = client.put('/api/admin/users/bulk/deactivate', headers=admin_headers,
+        json={'ids': [ids[0], ids[1], ids[2], user_id, admin_id, 9999]})
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    outcomes = {r['id']: r['outcome'] for r in data['results']}
+    assert outcomes == {
+        ids[0]: 'updated', ids[1]: 'updated', ids[2]: 'unchanged',
+        user_id: 'updated', admin_id: 'self', 9999: 'not_found'
+    }
+    assert data['summary'] == {'updated': 3, 'unchanged': 1, 'self': 1, 'not_found': 1}
+
+    # Deactivated users lose their sessions immediately
+    response = client.get('/api/users/profile', headers=regular_user_headers)
+    assert response.status_code == 401
+
+    with app.app_context():
+        from app.counters import get_counter
+        assert User.query.get(ids[0]).status == 'inactive'
+        assert User.query.get(admin_id).status == 'active'
+        assert get_counter('status:inactive') == 4
+        assert get_counter('status:active') == 1
+
+
+def test_bulk_activate_by_filter(client, admin_headers, app):
+    """Test a filter selects the targets of a bulk change"""
+    ids = _create_users(app, 4, status='inactive')
+
+    response = client.put('/api/admin/users/bulk/activate', headers=admin_headers,
+        json={'filter': {'role': 'user', 'status': 'inactive'}})
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [r['id'] for r in data['results']] == ids
+    assert data['summary'] == {'updated': 4}
+
+    with app.app_context():
+        from app.counters import get_counter
+        assert User.query.filter_by(status='inactive').count() == 0
+        assert get_counter('status:active') == 5
+
+
+def test_bulk_status_statement_count_is_constant(client, admin_headers, app):
+    """Test the number of queries does not grow with the number of users"""
+    from sqlalchemy import event
+
+    ids = _create_users(app, 20)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        # Warm up the auth caches and create the status counters
+        client.put('/api/admin/users/bulk/deactivate', headers=admin_headers, json={'ids': ids[:1]})
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        client.put('/api/admin/users/bulk/deactivate', headers=admin_headers, json={'ids': ids[1:3]})
+        small = len(statements)
+        del statements[:]
+        client.put('/api/admin/users/bulk/deactivate', headers=admin_headers, json={'ids': ids[3:]})
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert len(statements) == small
+
+
+def test_bulk_status_invalid_requests(client, admin_headers, app):
+    """Test malformed and oversized bulk requests are rejected"""
+    for body in ({}, {'ids': []}, {'ids': ['1']}, {'ids': [1], 'filter': {'role': 'user'}},
+                 {'filter': {'email': 'x'}}):
+        response = client.put('/api/admin/users/bulk/deactivate', headers=admin_headers, json=body)
+        assert response.status_code == 400
+
+    app.config['ADMIN_BULK_LIMIT'] = 2
+    ids = _create_users(app, 3)
+    response = client.put('/api/admin/users/bulk/deactivate', headers=admin_headers,
+        json={'filter': {'role': 'user'}})
+    assert response.status_code == 400
+
+    with app.app_context():
+        assert User.query.filter_by(status='inactive').count() == 0
+        assert [db.session.get(User, user_id).status for user_id in ids] == ['active'] * 3
+
+
+def test_bulk_status_non_admin(client, regular_user_headers):
+    """Test regular users cannot run bulk changes"""
+    response = client.put('/api/admin/users/bulk/activate', headers=regular_user_headers,
+        json={'ids': [1]})
+
+    assert response.status_code == 403
@@ -0,0 +1,319 @@
+import pytest
+import asyncio
+import json
+from app import db
+from app.config import Config, TestingConfig
+from app.models import User
+
+pytest.importorskip('aiosqlite')
+
+from app.aio import create_asgi_app, database
+from app.aio.database import async_url
+
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    """ASGI app on a SQLite file, which the sync and async engines share"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "app.db"}')
+    monkeypatch.setattr(TestingConfig, 'SQLITE_PRAGMAS', Config.SQLITE_PRAGMAS)
+    asgi_app = create_asgi_app('testing')
+    flask_app = asgi_app.flask_app
+
+    with flask_app.app_context():
+        db.create_all()
+        admin = User(
+            email='admin@example.com',
+            full_name='Admin User',
+            role='admin',
+            status='active'
+        )
+        admin.set_password('AdminPass123')
+        db.session.add(admin)
+        db.session.commit()
+        db.session.remove()
+
+    yield asgi_app
+
+    with flask_app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+async def request(app, method, path, json_body=None, headers=None, query=''):
+    """Send one HTTP request through the ASGI callable; returns (status, headers, body)"""
+    body = json.dumps(json_body).encode('utf-8') if json_body is not None else b''
+    raw_headers = [(b'host', b'testserver')]
+    if json_body is not None:
+        raw_headers += [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode('ascii'))]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode('latin-1'), value.encode('latin-1')))
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode('ascii'),
+        'query_string': query.encode('ascii'),
+        'root_path': '',
+        'headers': raw_headers,
+        'client': ('127.0.0.1', 12345),
+        'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+
+    start = sent[0]
+    response_headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in start['headers']}
+    data = b''.join(message.get('body', b'') for message in sent[1:])
+    return start['status'], response_headers, data
+
+
+def run(app, scenario):
+    """Run a scenario on a fresh event loop, closing async connections after"""
+    async def main():
+        try:
+            await scenario()
+        finally:
+            await database.dispose(app.flask_app)
+
+    asyncio.run(main())
+
+
+async def login(app, email, password):
+    status, _, data = await request(app, 'POST', '/api/auth/login',
+                                    {'email': email, 'password': password})
+    assert status == 200
+    return {'Authorization': f'Bearer {json.loads(data)["token"]}'}
+
+
+def test_async_url_swaps_driver():
+    """Test the async engine URL uses the asyncio driver for the same database"""
+    assert str(async_url('sqlite:////tmp/app.db')) == 'sqlite+aiosqlite:////tmp/app.db'
+    assert str(async_url('postgresql://u:p@db:5432/app')).startswith('postgresql+asyncpg://u:')
+    assert str(async_url('postgres://u:p@db/app')).startswith('postgresql+asyncpg://')
+
+    with pytest.raises(ValueError):
+        async_url('mysql://u:p@db/app')
+
+
+def test_signup_login_and_profile(asgi_app):
+    """Test the coroutine auth and users routes answer like the Flask views"""
+    async def scenario():
+        status, _, data = await request(asgi_app, 'POST', '/api/auth/signup', {
+            'email': 'user@example.com',
+            'password': 'UserPass123',
+            'full_name': 'Test User'
+        })
+        assert status == 201
+        assert json.loads(data)['user']['email'] == 'user@example.com'
+
+        status, _, data = await request(asgi_app, 'POST', '/api/auth/signup', {
+            'email': 'USER@example.com',
+            'password': 'UserPass123',
+            'full_name': 'Test User'
+        })
+        assert status == 400
+        assert json.loads(data)['message'] == 'Email already registered'
+
+        status, _, data = await request(asgi_app, 'POST', '/api/auth/login',
+                                        {'email': 'user@example.com', 'password': 'WrongPass123'})
+        assert status == 401
+
+        headers = await login(asgi_app, 'user@example.com', 'UserPass123')
+        status, response_headers, data = await request(asgi_app, 'GET', '/api/users/profile',
+                                                       headers=headers)
+        assert status == 200
+        assert json.loads(data)['last_login'] is not None
+
+        # Conditional GET is answered without a body
+        status, _, data = await request(asgi_app, 'GET', '/api/auth/me', headers={
+            **headers, 'If-None-Match': response_headers['etag']
+        })
+        assert status == 304
+        assert data == b''
+
+        status, _, data = await request(asgi_app, 'PUT', '/api/users/profile',
+                                        {'full_name': 'Renamed User'}, headers=headers)
+        assert status == 200
+        assert json.loads(data)['full_name'] == 'Renamed User'
+
+    run(asgi_app, scenario)
+
+
+def test_password_change_revokes_old_token(asgi_app):
+    """Test a password change through the coroutine route revokes earlier tokens"""
+    async def scenario():
+        headers = await login(asgi_app, 'admin@example.com', 'AdminPass123')
+
+        status, _, data = await request(asgi_app, 'PUT', '/api/users/password', {
+            'current_password': 'AdminPass123',
+            'new_password': 'NewAdminPass123'
+        }, headers=headers)
+        assert status == 200
+        new_headers = {'Authorization': f'Bearer {json.loads(data)["token"]}'}
+
+        status, _, data = await request(asgi_app, 'GET', '/api/auth/me', headers=headers)
+        assert status == 401
+        assert json.loads(data)['message'] == 'Token has been revoked'
+
+        status, _, _ = await request(asgi_app, 'GET', '/api/auth/me', headers=new_headers)
+        assert status == 200
+
+    run(asgi_app, scenario)
+
+
+def test_admin_listing_matches_wsgi(asgi_app):
+    """Test the async listing returns the same pages as the Flask view"""
+    with asgi_app.flask_app.app_context():
+        for i in range(7):
+            user = User(email=f'user{i}@example.com', full_name=f'User {i}',
+                        password_hash='x', role='user', status='active' if i % 2 else 'inactive')
+            db.session.add(user)
+        db.session.commit()
+        db.session.remove()
+
+    client = asgi_app.flask_app.test_client()
+    token = json.loads(client.post('/api/auth/login', json={
+        'email': 'admin@example.com', 'password': 'AdminPass123'
+    }).data)['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    queries = ['per_page=3', 'per_page=3&page=3', 'status=inactive&count=cached',
+               'count=none&role=user', 'after=&per_page=4']
+
+    async def scenario():
+        for query in queries:
+            status, _, data = await request(asgi_app, 'GET', '/api/admin/users',
+                                            headers=headers, query=query)
+            assert status == 200
+            expected = client.get(f'/api/admin/users?{query}', headers=headers)
+            assert json.loads(data) == json.loads(expected.data)
+
+        # Follow the cursor to the last page
+        status, _, data = await request(asgi_app, 'GET', '/api/admin/users',
+                                        headers=headers, query='after=&per_page=4')
+        cursor = json.loads(data)['next_cursor']
+        status, _, data = await request(asgi_app, 'GET', '/api/admin/users',
+                                        headers=headers, query=f'after={cursor}&per_page=4')
+        assert len(json.loads(data)['users']) == 4
+        assert json.loads(data)['next_cursor'] is None
+
+        status, _, data = await request(asgi_app, 'GET', '/api/admin/users',
+                                        headers=headers, query='after=***')
+        assert status == 400
+
+    run(asgi_app, scenario)
+
+
+def test_error_responses_match_wsgi(asgi_app):
+    """Test refused requests get the same status and body from both stacks"""
+    client = asgi_app.flask_app.test_client()
+    token = json.loads(client.post('/api/auth/login', json={
+        'email': 'admin@example.com', 'password': 'AdminPass123'
+    }).data)['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    admin_id = json.loads(client.get('/api/auth/me', headers=headers).data)['id']
+
+    cases = [
+        ('POST', '/api/auth/signup', {'email': 'new@example.com', 'password': 'weak', 'full_name': 'New'}, ''),
+        ('POST', '/api/auth/login', {'email': 'admin@example.com', 'password': 'WrongPass123'}, ''),
+        ('PUT', '/api/users/password', {'current_password': 'Wrong123', 'new_password': 'NewPass123'}, ''),
+        ('PUT', '/api/users/password', {'current_password': 'AdminPass123', 'new_password': 'short'}, ''),
+        ('GET', '/api/admin/users', None, 'count=all'),
+        ('PUT', f'/api/admin/users/{admin_id}/deactivate', None, ''),
+        ('PUT', f'/api/admin/users/{admin_id}/activate', None, ''),
+    ]
+
+    async def scenario():
+        for method, path, body, query in cases:
+            status, _, data = await request(asgi_app, method, path, body, headers=headers, query=query)
+            expected = client.open(f'{path}?{query}', method=method, json=body, headers=headers)
+            assert (status, json.loads(data)) == (expected.status_code, json.loads(expected.data))
+
+    run(asgi_app, scenario)
+
+
+def test_admin_status_changes(asgi_app):
+    """Test activate/deactivate through the coroutine routes"""
+    async def scenario():
+        status, _, data = await request(asgi_app, 'POST', '/api/auth/signup', {
+            'email': 'user@example.com',
+            'password': 'UserPass123',
+            'full_name': 'Test User'
+        })
+        user_id = json.loads(data)['user']['id']
+        user_headers = {'Authorization': f'Bearer {json.loads(data)["token"]}'}
+        headers = await login(asgi_app, 'admin@example.com', 'AdminPass123')
+
+        status, _, _ = await request(asgi_app, 'PUT', f'/api/admin/users/{user_id}/deactivate',
+                                     headers=user_headers)
+        assert status == 403
+
+        status, _, data = await request(asgi_app, 'PUT', f'/api/admin/users/{user_id}/deactivate',
+                                        headers=headers)
+        assert status == 200
+        assert json.loads(data)['user']['status'] == 'inactive'
+
+        status, _, _ = await request(asgi_app, 'GET', '/api/auth/me', headers=user_headers)
+        assert status == 401
+
+        status, _, data = await request(asgi_app, 'PUT', f'/api/admin/users/{user_id}/activate',
+                                        headers=headers)
+        assert json.loads(data)['message'] == 'User activated successfully'
+
+        status, _, _ = await request(asgi_app, 'PUT', '/api/admin/users/9999/activate',
+                                     headers=headers)
+        assert status == 404
+
+    run(asgi_app, scenario)
+
+
+def test_concurrent_logins(asgi_app):
+    """Test many logins in flight on one event loop all complete"""
+    async def scenario():
+        results = await asyncio.gather(*[
+            request(asgi_app, 'POST', '/api/auth/login',
+                    {'email': 'admin@example.com', 'password': 'AdminPass123'})
+            for _ in range(8)
+        ])
+        assert [status for status, _, _ in results] == [200] * 8
+
+    run(asgi_app, scenario)
+
+
+def test_other_routes_fall_back_to_flask(asgi_app):
+    """Test paths without a coroutine handler are served by the Flask app"""
+    async def scenario():
+        status, _, data = await request(asgi_app, 'GET', '/health')
+        assert status == 200
+        assert json.loads(data)['status'] == 'healthy'
+
+        headers = await login(asgi_app, 'admin@example.com', 'AdminPass123')
+        status, _, data = await request(asgi_app, 'GET', '/api/admin/users/search',
+                                        headers=headers, query='q=admin')
+        assert status == 200
+        assert json.loads(data)['users'][0]['email'] == 'admin@example.com'
+
+        status, response_headers, _ = await request(asgi_app, 'OPTIONS', '/api/auth/login', headers={
+            'Origin': 'http://localhost:3000',
+            'Access-Control-Request-Method': 'POST'
+        })
+        assert response_headers['access-control-allow-origin'] == 'http://localhost:3000'
+
+    run(asgi_app, scenario)
@@ -153,6 +153,119 @@ def test_user_login_success(client):
     assert 'last_login' in data['user']
 
 
+
+def test_login_stamps_last_login_inline(client, app):
+    """Test inline mode writes last_login with the login and keeps updated_at"""
+    client.post('/api/auth/signup', json={
+        'email': 'stamp@example.com',
+        'password': 'StampPass123',
+        'full_name': 'Stamp User'
+    })
+    with app.app_context():
+        updated_at = User.find_by_email('stamp@example.com').updated_at
+
+    response = client.post('/api/auth/login', json={'email': 'stamp@example.com', 'password': 'StampPass123'})
+
+    with app.app_context():
+        user = User.find_by_email('stamp@example.com')
+        assert user.last_login.isoformat() == json.loads(response.data)['user']['last_login']
+        assert user.updated_at == updated_at
+
+
+def test_login_buffers_last_login(client, app):
+    """Test write-behind mode skips the users UPDATE and flushes in one batch"""
+    from datetime import datetime, timedelta
+    from sqlalchemy import event
+    from app.auth.last_login import LastLoginBuffer
+    from app.models import RefreshToken
+
+    buffer = LastLoginBuffer(app, flush_interval=60, max_entries=1000)
+    app.extensions['last_login'] = buffer
+    for email in ('one@example.com', 'two@example.com'):
+        client.post('/api/auth/signup', json={'email': email, 'password': 'BufferPass123', 'full_name': 'B'})
+
+    updates = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE users'):
+            updates.append(executemany)
+
+    try:
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', capture)
+            for email in ('one@example.com', 'two@example.com', 'one@example.com'):
+                response = client.post('/api/auth/login', json={'email': email, 'password': 'BufferPass123'})
+                assert response.status_code == 200
+            assert updates == []
+            assert User.find_by_email('one@example.com').last_login is None
+            # Refresh tokens are written with the login, not buffered
+            assert RefreshToken.query.count() == 5
+
+            # An older stamp from another worker never wins
+            one = User.find_by_email('one@example.com')
+            latest = buffer._pending[one.id]
+            buffer.record(one.id, latest - timedelta(minutes=5))
+
+            assert buffer.flush() == 2
+            event.remove(db.engine, 'before_cursor_execute', capture)
+            assert updates == [True]
+
+            db.session.expire_all()
+            assert User.find_by_email('one@example.com').last_login == latest
+            assert User.find_by_email('two@example.com').last_login is not None
+
+            buffer.record(one.id, datetime(2000, 1, 1))
+            buffer.flush()
+            db.session.expire_all()
+            assert User.find_by_email('one@example.com').last_login == latest
+            assert buffer.stats()['rows_written'] == 3
+    finally:
+        buffer.close()
+
+
+def test_last_login_flushes_when_full(client, app):
+    """Test the flush thread writes early once max_entries users are waiting"""
+    import time
+    from datetime import datetime
+    from app.auth.last_login import LastLoginBuffer
+
+    with app.app_context():
+        for i in range(2):
+            user = User(email=f'full{i}@example.com', full_name='Full', password_hash='x')
+            db.session.add(user)
+        db.session.commit()
+        ids = [user.id for user in User.query.filter(User.email.like('full%'))]
+
+    buffer = LastLoginBuffer(app, flush_interval=60, max_entries=2)
+    try:
+        for user_id in ids:
+            buffer.record(user_id, datetime.utcnow())
+
+        deadline = time.monotonic() + 5
+        while buffer.flushes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert buffer.flushes == 1
+        with app.app_context():
+            assert User.query.filter(User.last_login.isnot(None)).count() == 2
+    finally:
+        buffer.close()
+
+
+def test_me_if_modified_since(client, auth_headers):
+    """Test /me honours If-Modified-Since using updated_at and last_login"""
+    response = client.get('/api/auth/me', headers=auth_headers)
+    last_modified = response.headers['Last-Modified']
+
+    response = client.get('/api/auth/me', headers={**auth_headers, 'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+
+    response = client.get('/api/auth/me', headers={
+        **auth_headers, 'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'
+    })
+    assert response.status_code == 200
+    assert json.loads(response.data)['email'] == 'test@example.com'
+
 def test_user_login_invalid_credentials(client):
     """Test login with invalid credentials fails"""
     response = client.post('/api/auth/login',
@@ -199,3 +312,268 @@ def test_jwt_token_validation(client):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data['email'] == 'token@example.com'
+
+
+def test_password_change_revokes_old_tokens(client, auth_headers):
+    """Test tokens issued before a password change are rejected"""
+    response = client.put('/api/users/password',
+        headers=auth_headers,
+        json={
+            'current_password': 'TestPass123',
+            'new_password': 'ChangedPass123'
+        }
+    )
+    assert response.status_code == 200
+    new_token = json.loads(response.data)['token']
+
+    response = client.get('/api/auth/me', headers=auth_headers)
+    assert response.status_code == 401
+    assert 'revoked' in json.loads(response.data)['message'].lower()
+
+    response = client.get('/api/auth/me',
+        headers={'Authorization': f'Bearer {new_token}'}
+    )
+    assert response.status_code == 200
+
+
+def test_stateless_auth_skips_user_lookup(client, app, admin_headers):
+    """Test stateless mode authorizes from token claims alone"""
+    app.config['AUTH_STATELESS'] = True
+    app.extensions['user_cache'].clear()
+
+    response = client.get('/api/admin/users', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert len(app.extensions['user_cache']) == 0
+
+
+def test_stateless_auth_profile(client, app, auth_headers):
+    """Test stateless mode still serves the full profile"""
+    app.config['AUTH_STATELESS'] = True
+
+    response = client.get('/api/auth/me', headers=auth_headers)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['email'] == 'test@example.com'
+    assert 'created_at' in data
+
+
+def test_stateless_auth_rejects_deactivated_user(client, app, auth_headers, admin_headers):
+    """Test deactivation revokes tokens in stateless mode"""
+    app.config['AUTH_STATELESS'] = True
+    assert client.get('/api/auth/me', headers=auth_headers).status_code == 200
+
+    with app.app_context():
+        user_id = User.query.filter_by(email='test@example.com').first().id
+
+    response = client.put(f'/api/admin/users/{user_id}/deactivate', headers=admin_headers)
+    assert response.status_code == 200
+
+    response = client.get('/api/auth/me', headers=auth_headers)
+    assert response.status_code == 401
+
+
+def test_stateless_auth_sees_revocations_from_other_workers(client, app, auth_headers):
+    """Test the version map picks up bumps committed elsewhere after a sync"""
+    app.config['AUTH_STATELESS'] = True
+    assert client.get('/api/auth/me', headers=auth_headers).status_code == 200
+
+    with app.app_context():
+        user = User.query.filter_by(email='test@example.com').first()
+        user.revoke_tokens()
+        db.session.commit()
+
+    app.extensions['token_versions'].sync_interval = 0
+
+    response = client.get('/api/auth/me', headers=auth_headers)
+    assert response.status_code == 401
+
+
+def test_token_version_sync_is_incremental(app, auth_headers):
+    """Test later syncs only read users updated since the previous one"""
+    from datetime import datetime, timedelta
+    from sqlalchemy import update
+
+    versions = app.extensions['token_versions']
+    with app.app_context():
+        user = User.query.filter_by(email='test@example.com').first()
+        user.revoke_tokens()
+        db.session.commit()
+        assert versions.current(user.id) == 1
+
+        # Bumped without touching updated_at: outside the window, so not re-read
+        db.session.execute(update(User).where(User.id == user.id).values(
+            token_version=5, updated_at=datetime.utcnow() - timedelta(days=1)
+        ))
+        db.session.commit()
+        versions.sync_interval = 0
+        assert versions.current(user.id) == 1
+
+        user = db.session.get(User, user.id)
+        user.revoke_tokens()
+        db.session.commit()
+        assert versions.current(user.id) == 6
+
+
+def test_logout_revokes_token(client, auth_headers):
+    """Test a logged-out token can no longer be used"""
+    response = client.post('/api/auth/logout', headers=auth_headers)
+    assert response.status_code == 200
+
+    response = client.get('/api/auth/me', headers=auth_headers)
+    assert response.status_code == 401
+    assert 'revoked' in json.loads(response.data)['message'].lower()
+
+
+def test_logout_keeps_other_sessions(client, auth_headers):
+    """Test logout only revokes the token that was presented"""
+    response = client.post('/api/auth/login',
+        json={
+            'email': 'test@example.com',
+            'password': 'TestPass123'
+        }
+    )
+    other_headers = {'Authorization': f'Bearer {json.loads(response.data)["token"]}'}
+
+    client.post('/api/auth/logout', headers=auth_headers)
+
+    response = client.get('/api/auth/me', headers=other_headers)
+    assert response.status_code == 200
+
+
+def test_revocation_check_is_io_free_for_valid_tokens(client, app, auth_headers):
+    """Test unrevoked tokens are answered by the bloom filter alone"""
+    store = app.extensions['revocation']
+
+    for _ in range(3):
+        client.get('/api/auth/me', headers=auth_headers)
+
+    stats = store.stats()
+    assert stats['checks'] == 3
+    assert stats['confirmations'] == 0
+
+
+def test_revocations_sync_and_prune(app):
+    """Test revocations from other workers load, checks never write, and prune deletes"""
+    from datetime import datetime, timedelta
+    from app.auth import revocation
+    from app.models import RevokedToken
+
+    store = app.extensions['revocation']
+    assert not store.is_revoked('other-worker')
+
+    with app.app_context():
+        db.session.add(RevokedToken(jti='other-worker', expires_at=datetime.utcnow() + timedelta(hours=1)))
+        db.session.add(RevokedToken(jti='expired', expires_at=datetime.utcnow() - timedelta(hours=1)))
+        db.session.commit()
+
+        store.sync()
+        assert store.is_revoked('other-worker')
+        assert store.is_revoked('expired')
+
+        # A rebuild drops expired entries from the filter but deletes nothing
+        store.rebuild_interval = 0
+        store.sync()
+        assert RevokedToken.query.count() == 2
+        assert not store.is_revoked('expired')
+        assert store.is_revoked('other-worker')
+
+        assert revocation.prune_expired() == 1
+        assert RevokedToken.query.count() == 1
+
+
+def test_expired_tokens_are_pruned_in_the_background(app, auth_headers):
+    """Test the prune thread starts with the first sync and deletes expired rows"""
+    from datetime import datetime, timedelta
+    from app.models import RefreshToken, RevokedToken
+
+    store = app.extensions['revocation']
+    with app.app_context():
+        user = User.find_by_email('test@example.com')
+        expired = datetime.utcnow() - timedelta(hours=1)
+        db.session.add(RevokedToken(jti='expired', expires_at=expired))
+        db.session.add(RevokedToken(jti='live', expires_at=datetime.utcnow() + timedelta(hours=1)))
+        db.session.add(RefreshToken(user_id=user.id, token_hash='0' * 64, family_id='family', expires_at=expired))
+        db.session.commit()
+
+        store.sync()
+        assert store._pruner.is_alive()
+
+        assert store.prune() == 2
+        assert [row.jti for row in RevokedToken.query] == ['live']
+        assert RefreshToken.query.filter_by(family_id='family').count() == 0
+        assert store.stats()['pruned'] == 2
+
+
+def _login_tokens(client, email='test@example.com', password='TestPass123'):
+    response = client.post('/api/auth/login',
+        json={'email': email, 'password': password}
+    )
+    return json.loads(response.data)
+
+
+def test_refresh_rotates_tokens(client, auth_headers):
+    """Test a refresh token yields a working access token and a new refresh token"""
+    tokens = _login_tokens(client)
+
+    response = client.post('/api/auth/refresh',
+        json={'refresh_token': tokens['refresh_token']}
+    )
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['refresh_token'] != tokens['refresh_token']
+
+    response = client.get('/api/auth/me',
+        headers={'Authorization': f'Bearer {data["token"]}'}
+    )
+    assert response.status_code == 200
+
+
+def test_refresh_reuse_revokes_family(client, auth_headers):
+    """Test replaying a rotated refresh token revokes the whole family"""
+    tokens = _login_tokens(client)
+
+    response = client.post('/api/auth/refresh',
+        json={'refresh_token': tokens['refresh_token']}
+    )
+    rotated = json.loads(response.data)['refresh_token']
+
+    response = client.post('/api/auth/refresh',
+        json={'refresh_token': tokens['refresh_token']}
+    )
+    assert response.status_code == 401
+    assert 'reuse' in json.loads(response.data)['message'].lower()
+
+    response = client.post('/api/auth/refresh',
+        json={'refresh_token': rotated}
+    )
+    assert response.status_code == 401
+
+
+def test_refresh_rejects_unknown_token(client):
+    """Test an unknown refresh token is rejected"""
+    response = client.post('/api/auth/refresh',
+        json={'refresh_token': 'not-a-refresh-token'}
+    )
+
+    assert response.status_code == 401
+
+
+def test_password_change_revokes_refresh_tokens(client, auth_headers):
+    """Test refresh tokens issued before a password change stop working"""
+    tokens = _login_tokens(client)
+
+    client.put('/api/users/password',
+        headers=auth_headers,
+        json={
+            'current_password': 'TestPass123',
+            'new_password': 'ChangedPass123'
+        }
+    )
+
+    response = client.post('/api/auth/refresh',
+        json={'refresh_token': tokens['refresh_token']}
+    )
+    assert response.status_code == 401
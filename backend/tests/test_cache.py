@@ -0,0 +1,154 @@
+import pytest
+import json
+import time
+from app import create_app, db
+from app.cache import TTLCache
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for making requests"""
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Create a user and return auth headers"""
+    response = client.post('/api/auth/signup',
+        json={
+            'email': 'user@example.com',
+            'password': 'UserPass123',
+            'full_name': 'Test User'
+        }
+    )
+
+    data = json.loads(response.data)
+    return {'Authorization': f'Bearer {data["token"]}'}
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test the cache stays bounded and evicts the oldest entry"""
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_cache_expires_entries():
+    """Test entries are not served past their expiry time"""
+    cache = TTLCache(maxsize=10)
+    cache.set('expired', 1, expires_at=time.time() - 1)
+    cache.set('live', 2, expires_at=time.time() + 60)
+
+    assert cache.get('expired') is None
+    assert cache.get('live') == 2
+    assert len(cache) == 1
+
+
+def test_token_cache_hits_on_repeated_requests(client, app, auth_headers):
+    """Test repeated requests with the same token reuse the decoded payload"""
+    token_cache = app.extensions['token_cache']
+
+    for _ in range(3):
+        response = client.get('/api/users/profile', headers=auth_headers)
+        assert response.status_code == 200
+
+    stats = token_cache.stats()
+    assert stats['size'] == 1
+    assert stats['misses'] == 1
+    assert stats['hits'] == 2
+
+
+def test_token_cache_rejects_invalid_tokens(client, app):
+    """Test invalid tokens are never cached"""
+    response = client.get('/api/users/profile',
+        headers={'Authorization': 'Bearer not-a-jwt'}
+    )
+
+    assert response.status_code == 401
+    assert len(app.extensions['token_cache']) == 0
+
+
+def test_token_cache_can_be_disabled(monkeypatch):
+    """Test the cache switch in config"""
+    from app.config import TestingConfig
+    monkeypatch.setattr(TestingConfig, 'TOKEN_CACHE_ENABLED', False)
+
+    app = create_app('testing')
+    assert 'token_cache' not in app.extensions
+
+
+def test_user_cache_serves_repeated_requests(client, app, auth_headers):
+    """Test the user snapshot is loaded once and reused"""
+    user_cache = app.extensions['user_cache']
+
+    for _ in range(3):
+        response = client.get('/api/auth/me', headers=auth_headers)
+        assert response.status_code == 200
+
+    stats = user_cache.stats()
+    assert stats['size'] == 1
+    assert stats['hits'] == 2
+
+
+def test_user_cache_invalidated_by_profile_update(client, auth_headers):
+    """Test a profile update is visible on the next request"""
+    client.get('/api/users/profile', headers=auth_headers)
+
+    response = client.put('/api/users/profile',
+        headers=auth_headers,
+        json={'full_name': 'Renamed User'}
+    )
+    assert response.status_code == 200
+
+    response = client.get('/api/users/profile', headers=auth_headers)
+    data = json.loads(response.data)
+    assert data['full_name'] == 'Renamed User'
+
+
+def test_user_cache_invalidated_by_deactivation(client, app, auth_headers):
+    """Test a deactivated user is rejected even with a warm cache"""
+    from app.models import User
+
+    assert client.get('/api/users/profile', headers=auth_headers).status_code == 200
+
+    with app.app_context():
+        admin = User(
+            email='admin@example.com',
+            full_name='Admin User',
+            role='admin',
+            status='active'
+        )
+        admin.set_password('AdminPass123')
+        db.session.add(admin)
+        db.session.commit()
+        user_id = User.query.filter_by(email='user@example.com').first().id
+
+    response = client.post('/api/auth/login',
+        json={'email': 'admin@example.com', 'password': 'AdminPass123'}
+    )
+    admin_headers = {'Authorization': f'Bearer {json.loads(response.data)["token"]}'}
+
+    response = client.put(f'/api/admin/users/{user_id}/deactivate', headers=admin_headers)
+    assert response.status_code == 200
+
+    response = client.get('/api/users/profile', headers=auth_headers)
+    assert response.status_code == 401
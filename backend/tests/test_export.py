@@ -0,0 +1,151 @@
+import pytest
+import csv
+import gzip
+import io
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for making requests"""
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(client, app):
+    """Create an admin and a few users and return admin auth headers"""
+    with app.app_context():
+        admin = User(
+            email='admin@example.com',
+            full_name='Admin User',
+            role='admin',
+            status='active'
+        )
+        admin.set_password('AdminPass123')
+        db.session.add(admin)
+        for i in range(5):
+            user = User(
+                email=f'user{i}@example.com',
+                full_name=f'User {i}',
+                role='user',
+                status='inactive' if i % 2 else 'active'
+            )
+            user.password_hash = 'x'
+            db.session.add(user)
+        db.session.commit()
+
+    response = client.post('/api/auth/login',
+        json={
+            'email': 'admin@example.com',
+            'password': 'AdminPass123'
+        }
+    )
+
+    data = json.loads(response.data)
+    return {'Authorization': f'Bearer {data["token"]}'}
+
+
+def test_export_ndjson(client, admin_headers):
+    """Test every user is streamed as one JSON object per line"""
+    response = client.get('/api/admin/users/export', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'Content-Length' not in response.headers
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['email'] for row in rows] == ['admin@example.com'] + [f'user{i}@example.com' for i in range(5)]
+    assert 'password_hash' not in rows[0]
+    assert rows[0]['created_at'] is not None
+
+
+def test_export_csv_with_columns_and_filter(client, admin_headers):
+    """Test CSV output with a column selection and a status filter"""
+    response = client.get('/api/admin/users/export?format=csv&columns=email,status&status=inactive',
+                          headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows == [
+        ['email', 'status'],
+        ['user1@example.com', 'inactive'],
+        ['user3@example.com', 'inactive'],
+    ]
+
+
+def test_export_csv_empty(client, admin_headers):
+    """Test a CSV export with no matching rows still has a header"""
+    response = client.get('/api/admin/users/export?format=csv&columns=id&role=nobody',
+                          headers=admin_headers)
+
+    assert response.get_data(as_text=True) == 'id\n'
+
+
+def test_export_gzip(client, admin_headers):
+    """Test gzip output decompresses to the plain export"""
+    plain = client.get('/api/admin/users/export?columns=id,email', headers=admin_headers).get_data()
+    response = client.get('/api/admin/users/export?columns=id,email&gzip=true', headers=admin_headers)
+
+    assert response.mimetype == 'application/gzip'
+    assert 'users.ndjson.gz' in response.headers['Content-Disposition']
+    assert gzip.decompress(response.get_data()) == plain
+
+
+def test_export_fetches_in_chunks(client, app, admin_headers):
+    """Test rows come from one SELECT yielded per chunk, not one query per page"""
+    app.config['EXPORT_CHUNK_SIZE'] = 2
+    selects = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.endswith('ORDER BY users.id'):
+            selects.append(context.execution_options.get('yield_per'))
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        response = client.get('/api/admin/users/export?columns=id,email', headers=admin_headers)
+        chunks = list(response.response)
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert selects == [2]
+    assert len(chunks) == 3
+
+
+def test_export_invalid_options(client, admin_headers):
+    """Test unknown formats and columns are rejected"""
+    response = client.get('/api/admin/users/export?format=xml', headers=admin_headers)
+    assert response.status_code == 400
+
+    response = client.get('/api/admin/users/export?columns=email,password_hash', headers=admin_headers)
+    assert response.status_code == 400
+    assert 'password_hash' in json.loads(response.data)['message']
+
+
+def test_export_requires_admin(client, app):
+    """Test regular users cannot export"""
+    client.post('/api/auth/signup', json={
+        'email': 'regular@example.com',
+        'password': 'UserPass123',
+        'full_name': 'Regular User'
+    })
+    response = client.post('/api/auth/login', json={'email': 'regular@example.com', 'password': 'UserPass123'})
+    token = json.loads(response.data)['token']
+
+    response = client.get('/api/admin/users/export', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 403
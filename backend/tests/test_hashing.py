@@ -0,0 +1,227 @@
+import pytest
+import json
+import time
+from app import create_app, db
+from app.auth import hashing, hashers
+from app.models import User
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        app.extensions['hashing'].shutdown()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for making requests"""
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(client, app):
+    """Create an admin user and return auth headers"""
+    with app.app_context():
+        admin = User(
+            email='admin@example.com',
+            full_name='Admin User',
+            role='admin',
+            status='active'
+        )
+        admin.set_password('AdminPass123')
+        db.session.add(admin)
+        db.session.commit()
+
+    response = client.post('/api/auth/login',
+        json={
+            'email': 'admin@example.com',
+            'password': 'AdminPass123'
+        }
+    )
+
+    data = json.loads(response.data)
+    return {'Authorization': f'Bearer {data["token"]}'}
+
+
+def test_inline_hashing_when_pool_disabled(app):
+    """Test hashing falls back to inline mode with a zero-sized pool"""
+    executor = app.extensions['hashing']
+    assert not executor.enabled
+
+    password_hash = hashing.hash_password('SecurePass123')
+    assert hashing.check_password('SecurePass123', password_hash)
+    assert not hashing.check_password('WrongPass123', password_hash)
+
+    stats = executor.stats()
+    assert stats['mode'] == 'inline'
+    assert stats['latency']['count'] == 3
+
+
+def test_pool_hashing(app):
+    """Test hashing through the process pool"""
+    app.extensions['hashing'] = hashing.HashingExecutor(pool_size=1, queue_limit=4)
+
+    password_hash = hashing.hash_password('SecurePass123')
+    assert hashing.check_password('SecurePass123', password_hash)
+
+    stats = app.extensions['hashing'].stats()
+    assert stats['mode'] == 'pool'
+    assert stats['in_flight'] == 0
+    assert stats['latency']['count'] == 2
+
+
+def test_broken_pool_is_replaced():
+    """Test a pool whose worker died is recreated and the hash retried"""
+    import os
+    from concurrent.futures.process import BrokenProcessPool
+
+    executor = hashing.HashingExecutor(pool_size=1, queue_limit=4)
+    try:
+        broken = executor._get_pool()
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        assert executor.run(abs, -1) == 1
+        assert executor._pool is not broken
+
+        executor._get_pool().submit(os._exit, 1).exception()
+        assert executor.map(abs, [-1, -2]) == [1, 2]
+    finally:
+        executor.shutdown()
+    assert executor.stats()['in_flight'] == 0
+
+
+def test_full_queue_returns_503(client, app):
+    """Test signup is rejected with 503 when the hashing queue is full"""
+    executor = hashing.HashingExecutor(pool_size=1, queue_limit=0)
+    executor._pending = 1
+    app.extensions['hashing'] = executor
+
+    response = client.post('/api/auth/signup',
+        json={
+            'email': 'busy@example.com',
+            'password': 'SecurePass123',
+            'full_name': 'Busy User'
+        }
+    )
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert executor.stats()['rejected'] == 1
+
+
+def test_diagnostics_reports_hashing(client, admin_headers):
+    """Test admin diagnostics expose hashing queue stats"""
+    response = client.get('/api/admin/diagnostics', headers=admin_headers)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['hashing']['mode'] == 'inline'
+    assert data['hashing']['queue_depth'] == 0
+    assert data['hashing']['latency']['count'] >= 2
+
+
+@pytest.mark.parametrize('hasher', [
+    hashers.BcryptHasher(cost=4),
+    hashers.ScryptHasher(cost=10),
+    hashers.Argon2Hasher(cost=1, memory_cost=1024, parallelism=1),
+])
+def test_hasher_roundtrip(hasher):
+    """Test each registered hasher verifies its own hashes"""
+    encoded = hasher.hash('SecurePass123')
+
+    identified = hashers.identify(encoded)
+    assert identified.algorithm == hasher.algorithm
+    assert identified.cost == hasher.cost
+    assert identified.verify('SecurePass123', encoded)
+    assert not identified.verify('WrongPass123', encoded)
+    assert not hasher.needs_update(encoded)
+
+
+def test_login_rehashes_outdated_hash(client, app):
+    """Test a successful login upgrades a hash made with old settings"""
+    with app.app_context():
+        user = User(
+            email='legacy@example.com',
+            full_name='Legacy User',
+            role='user',
+            status='active'
+        )
+        user.password_hash = hashers.BcryptHasher(cost=5).hash('LegacyPass123')
+        db.session.add(user)
+        db.session.commit()
+
+    app.extensions['hashing'].hasher = hashers.ScryptHasher(cost=10)
+
+    response = client.post('/api/auth/login',
+        json={
+            'email': 'legacy@example.com',
+            'password': 'LegacyPass123'
+        }
+    )
+    assert response.status_code == 200
+
+    with app.app_context():
+        user = User.query.filter_by(email='legacy@example.com').first()
+        assert user.password_hash.startswith('$scrypt$ln=10,')
+        assert user.check_password('LegacyPass123')
+
+
+def test_calibrate_respects_target():
+    """Test calibration picks a cost whose verify time fits the target"""
+    hasher = hashers.BcryptHasher()
+    cost, elapsed_ms = hashers.calibrate(hasher, target_ms=20)
+
+    assert cost in hasher.cost_range
+    assert hasher.cost == cost
+    assert cost == hasher.cost_range[0] or elapsed_ms <= 20
+
+
+def test_calibrate_hasher_uses_configured_parameters(monkeypatch):
+    """Test the CLI calibrates argon2 with the configured memory and parallelism"""
+    import run
+
+    calibrated = []
+    monkeypatch.setattr(hashers, 'calibrate', lambda hasher, target_ms: calibrated.append(hasher) or (1, 1.0))
+    monkeypatch.setitem(run.app.config, 'ARGON2_MEMORY_COST', 2048)
+    monkeypatch.setitem(run.app.config, 'ARGON2_PARALLELISM', 2)
+
+    result = run.app.test_cli_runner().invoke(run.calibrate_hasher, ['--algorithm', 'argon2id'])
+    assert result.exit_code == 0, result.output
+    assert (calibrated[0].memory_cost, calibrated[0].parallelism) == (2048, 2)
+
+
+def test_bulk_hashing_leaves_a_worker_for_logins():
+    """Test a login verify gets a pool slot while an import batch is hashing"""
+    import threading
+
+    executor = hashing.HashingExecutor(pool_size=2, queue_limit=4)
+    try:
+        # Start both worker processes before timing anything
+        assert executor.map(time.sleep, [0, 0]) == [None, None]
+
+        bulk = threading.Thread(target=executor.map, args=(time.sleep, [0.4] * 6))
+        bulk.start()
+        while executor.stats()['bulk_in_flight'] == 0:
+            time.sleep(0.01)
+
+        start = time.perf_counter()
+        assert executor.run(abs, -1) == 1
+        elapsed = time.perf_counter() - start
+
+        stats = executor.stats()
+        assert stats['bulk_in_flight'] == 1
+        assert stats['in_flight'] == 1
+        bulk.join()
+    finally:
+        executor.shutdown()
+
+    assert elapsed < 0.3
+    assert executor.stats()['in_flight'] == 0
@@ -0,0 +1,179 @@
+import pytest
+import io
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for making requests"""
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(client, app):
+    """Create an admin user and return auth headers"""
+    with app.app_context():
+        admin = User(
+            email='admin@example.com',
+            full_name='Admin User',
+            role='admin',
+            status='active'
+        )
+        admin.set_password('AdminPass123')
+        db.session.add(admin)
+        db.session.commit()
+
+    response = client.post('/api/auth/login',
+        json={
+            'email': 'admin@example.com',
+            'password': 'AdminPass123'
+        }
+    )
+
+    data = json.loads(response.data)
+    return {'Authorization': f'Bearer {data["token"]}'}
+
+
+CSV_DATA = (
+    'email,password,full_name,role,status\n'
+    'Ann@Example.com,AnnPass123,Ann Lee,,\n'
+    'ben@example.com,BenPass123,Ben Ode,user,inactive\n'
+    'not-an-email,CarlPass123,Carl,,\n'
+    'dee@example.com,weak,Dee,,\n'
+    'ann@example.com,AnnPass123,Ann Again,,\n'
+    'admin@example.com,AdminPass123,Admin Again,,\n'
+    'eve@example.com,EvePass123,Eve Ray,admin,\n'
+)
+
+
+def _import(client, headers, data, content_type='text/csv', query=''):
+    return client.post(f'/api/admin/users/import{query}', headers=headers,
+                       data=data, content_type=content_type)
+
+
+def test_import_csv(client, app, admin_headers):
+    """Test valid rows are imported and each rejected row is reported"""
+    response = _import(client, admin_headers, CSV_DATA)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['processed'] == 7
+    assert data['imported'] == 3
+    assert data['failed'] == 4
+    assert data['checkpoint'] == 7
+    assert {(e['row'], e['message'].split(':')[0]) for e in data['errors']} == {
+        (3, 'Invalid email'),
+        (4, 'Password must be at least 8 characters long'),
+        (5, 'Duplicate email in import'),
+        (6, 'Email already registered'),
+    }
+
+    with app.app_context():
+        from app.counters import get_counter
+        ben = User.find_by_email('ben@example.com')
+        assert ben.status == 'inactive'
+        assert User.find_by_email('eve@example.com').role == 'admin'
+        assert get_counter('total') == 4
+        assert get_counter('status:inactive') == 1
+        assert get_counter('role:admin') == 2
+
+    # Imported users can log in and are searchable
+    response = client.post('/api/auth/login', json={'email': 'ann@example.com', 'password': 'AnnPass123'})
+    assert response.status_code == 200
+    response = client.get('/api/admin/users/search?q=ann', headers=admin_headers)
+    assert [u['email'] for u in json.loads(response.data)['users']] == ['ann@example.com']
+
+
+def test_import_ndjson(client, admin_headers):
+    """Test NDJSON input, including lines that are not valid records"""
+    lines = [
+        json.dumps({'email': 'a@example.com', 'password': 'APass1234', 'full_name': 'A'}),
+        '{not json',
+        '',
+        json.dumps(['a', 'list']),
+        json.dumps({'email': 'b@example.com', 'full_name': 'B'}),
+    ]
+    response = _import(client, admin_headers, '\n'.join(lines), content_type='application/x-ndjson')
+
+    data = json.loads(response.data)
+    assert data['imported'] == 1
+    assert [e['row'] for e in data['errors']] == [2, 3, 4]
+    assert data['errors'][2]['message'] == 'Missing required fields: password'
+
+
+def test_import_resumes_from_checkpoint(client, app, admin_headers):
+    """Test start skips rows an earlier run already handled"""
+    response = _import(client, admin_headers, CSV_DATA, query='?start=5')
+
+    data = json.loads(response.data)
+    assert data['processed'] == 2
+    assert data['imported'] == 1
+
+    with app.app_context():
+        assert User.find_by_email('ann@example.com') is None
+        assert User.find_by_email('eve@example.com') is not None
+
+
+def test_import_inserts_in_batches(client, app, admin_headers):
+    """Test rows are written with one executemany INSERT per batch"""
+    app.config['IMPORT_BATCH_SIZE'] = 10
+    rows = ''.join(f'user{i}@example.com,UserPass{i}A,User {i}\n' for i in range(25))
+    inserts = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO users '):
+            inserts.append(executemany)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        response = _import(client, admin_headers, 'email,password,full_name\n' + rows)
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert json.loads(response.data)['imported'] == 25
+    assert inserts == [True, True, True]
+
+
+def test_import_invalid_format(client, admin_headers):
+    """Test the format must be known"""
+    response = _import(client, admin_headers, 'x', content_type='text/plain')
+
+    assert response.status_code == 400
+
+
+def test_import_read_rows_from_stream():
+    """Test CSV rows are numbered from the first data row"""
+    from app.admin.importer import read_rows
+
+    rows = list(read_rows(io.StringIO('email,password\na@example.com,x\n'), 'csv'))
+
+    assert rows == [(1, {'email': 'a@example.com', 'password': 'x'}, None)]
+
+
+def test_hash_passwords_across_pool(app):
+    """Test a batch of passwords is hashed by the worker processes in order"""
+    from app.auth import hashers, hashing
+
+    executor = hashing.HashingExecutor(2, 0, hasher=hashers.BcryptHasher(cost=4))
+    try:
+        hashes = hashing.hash_passwords(['FirstPass1', 'SecondPass2', 'ThirdPass3'], executor)
+    finally:
+        executor.shutdown()
+
+    assert len(hashes) == 3
+    assert executor.hasher.verify('SecondPass2', hashes[1])
+    assert not executor.hasher.verify('FirstPass1', hashes[1])
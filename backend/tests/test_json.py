@@ -0,0 +1,74 @@
+import pytest
+import json
+from datetime import datetime
+from app import create_app, db, jsonprovider
+from app.models import User
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def provider(request, app):
+    """The app's JSON provider in each mode"""
+    if request.param == 'orjson' and jsonprovider.orjson is None:
+        pytest.skip('orjson is not installed')
+    app.json.use_orjson = request.param == 'orjson'
+    return app.json
+
+
+def test_datetimes_encode_like_to_dict(provider):
+    """Test datetimes are written as ISO 8601, as User.to_dict formats them"""
+    stamps = [datetime(2025, 1, 2, 3, 4, 5), datetime(2025, 1, 2, 3, 4, 5, 120)]
+
+    assert json.loads(provider.dumps(stamps)) == [stamp.isoformat() for stamp in stamps]
+
+
+def test_response_is_compact_with_newline(provider):
+    """Test responses are compact JSON with a trailing newline"""
+    response = provider.response({'b': 1, 'a': [1, 2]})
+
+    assert response.mimetype == 'application/json'
+    assert response.get_data(as_text=True) == '{"b":1,"a":[1,2]}\n'
+
+
+def test_values_orjson_cannot_encode_fall_back(provider):
+    """Test integers beyond 64 bits still encode"""
+    response = provider.response({'big': 2 ** 70})
+
+    assert json.loads(response.get_data()) == {'big': 2 ** 70}
+
+
+def test_listing_timestamps_match_to_dict(app, provider):
+    """Test the admin listing's raw timestamps encode like to_dict output"""
+    from app.readmodel import serialize_rows, user_rows
+
+    user = User(email='json@example.com', full_name='Json', password_hash='x',
+                last_login=datetime(2025, 6, 1, 12, 0, 0, 500))
+    db.session.add(user)
+    db.session.commit()
+
+    encoded = json.loads(provider.dumps(serialize_rows(user_rows().all())))
+
+    assert encoded == [user.to_dict(include_timestamps=True)]
+
+
+def test_json_provider_setting(monkeypatch):
+    """Test JSON_PROVIDER selects the encoder and rejects unknown names"""
+    from app.config import TestingConfig
+
+    monkeypatch.setattr(TestingConfig, 'JSON_PROVIDER', 'stdlib')
+    assert create_app('testing').json.use_orjson is False
+
+    monkeypatch.setattr(TestingConfig, 'JSON_PROVIDER', 'simplejson')
+    with pytest.raises(ValueError):
+        create_app('testing')
@@ -0,0 +1,105 @@
+import pytest
+import os
+import runpy
+from datetime import datetime
+from app import create_app, db
+from app.config import Config, TestingConfig
+from app.models import User
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """Test app backed by a SQLite file, as a preloaded production app would be"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "app.db"}')
+    monkeypatch.setattr(TestingConfig, 'SQLITE_PRAGMAS', Config.SQLITE_PRAGMAS)
+    monkeypatch.setattr(TestingConfig, 'LAST_LOGIN_FLUSH_SECONDS', 60)
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+def load_conf(monkeypatch, **env):
+    """Evaluate gunicorn.conf.py under the given environment"""
+    for name in ('WEB_CONCURRENCY', 'GUNICORN_THREADS', 'GUNICORN_WORKER_CLASS', 'DATABASE_URL'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(CONF_PATH)
+
+
+def test_conf_sizes_workers_from_backend(monkeypatch):
+    """Test worker and thread counts follow the database backend and CPUs"""
+    conf = load_conf(monkeypatch, DATABASE_URL='postgresql://u:p@db/app')
+    cpus = conf['cpu_count']()
+    assert conf['worker_class'] == 'gthread'
+    assert conf['threads'] == 4
+    assert conf['workers'] == min(2 * cpus + 1, 90 // 4)
+    assert conf['preload_app'] is True
+    assert 0 < conf['max_requests_jitter'] < conf['max_requests']
+    # The app sizes its pools from the same numbers
+    assert os.environ['WEB_CONCURRENCY'] == str(conf['workers'])
+    assert os.environ['GUNICORN_THREADS'] == '4'
+
+    default_workers = conf['default_workers']
+    assert default_workers('sqlite', 'gthread', 16, 4, 90) == 4
+    assert default_workers('postgresql', 'gthread', 16, 4, 40) == 10
+    assert default_workers('postgresql', 'uvicorn.workers.UvicornWorker', 8, 1, 90) == 8
+
+
+def test_conf_worker_class_and_overrides(monkeypatch):
+    """Test the worker class comes from the environment and explicit sizes win"""
+    conf = load_conf(monkeypatch, GUNICORN_WORKER_CLASS='uvicorn', WEB_CONCURRENCY='3')
+    assert conf['worker_class'] == 'uvicorn.workers.UvicornWorker'
+    assert conf['wsgi_app'] == 'asgi:app'
+    assert conf['workers'] == 3
+    assert conf['threads'] == 1
+
+    conf = load_conf(monkeypatch, GUNICORN_WORKER_CLASS='sync')
+    assert conf['wsgi_app'] == 'run:app'
+    assert conf['threads'] == 1
+
+
+def test_fork_hooks_replace_pools(file_app):
+    """Test the master drops its connections and workers start new pools"""
+    from app import lifecycle
+
+    engine = db.engine
+    with engine.connect() as connection:
+        connection.exec_driver_sql('SELECT 1')
+    assert engine.pool.checkedin() == 1
+
+    lifecycle.before_fork(file_app)
+    assert db.engine.pool.checkedin() == 0
+
+    pool = db.engine.pool
+    lifecycle.after_fork(file_app)
+    assert db.engine.pool is not pool
+
+
+def test_shutdown_flushes_buffered_logins(file_app):
+    """Test a worker exit writes last_login stamps still in the buffer"""
+    from app import lifecycle
+
+    user = User(email='user@example.com', full_name='Test User', role='user', status='active')
+    user.set_password('UserPass123')
+    db.session.add(user)
+    db.session.commit()
+
+    response = file_app.test_client().post('/api/auth/login', json={
+        'email': 'user@example.com', 'password': 'UserPass123'
+    })
+    assert response.status_code == 200
+    assert len(file_app.extensions['last_login']) == 1
+
+    lifecycle.shutdown(file_app)
+
+    assert len(file_app.extensions['last_login']) == 0
+    db.session.expire_all()
+    assert isinstance(db.session.get(User, user.id).last_login, datetime)
@@ -0,0 +1,204 @@
+import pytest
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for making requests"""
+    return app.test_client()
+
+
+@pytest.fixture
+def tokens(client, app):
+    """Create an admin and a regular user; return their login responses"""
+    with app.app_context():
+        for i in range(20):
+            user = User(
+                email=f'user{i}@example.com',
+                full_name=f'User {i}',
+                role='user',
+                status='active' if i % 2 else 'inactive'
+            )
+            user.password_hash = 'unused'
+            db.session.add(user)
+
+        admin = User(
+            email='admin@example.com',
+            full_name='Admin User',
+            role='admin',
+            status='active'
+        )
+        admin.set_password('AdminPass123')
+        db.session.add(admin)
+        db.session.commit()
+
+    admin = json.loads(client.post('/api/auth/login',
+        json={'email': 'admin@example.com', 'password': 'AdminPass123'}
+    ).data)
+    user = json.loads(client.post('/api/auth/signup',
+        json={'email': 'user@example.com', 'password': 'UserPass123', 'full_name': 'Test User'}
+    ).data)
+    return {'admin': admin, 'user': user}
+
+
+@pytest.fixture
+def captured(app):
+    """Record every SELECT/UPDATE/DELETE issued while the fixture is active"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', capture)
+
+
+def _headers(login):
+    return {'Authorization': f'Bearer {login["token"]}'}
+
+
+def _target_user_id(app):
+    with app.app_context():
+        return User.query.filter_by(email='user1@example.com').first().id
+
+
+def scenario_signup(client, tokens, app):
+    client.post('/api/auth/signup',
+        json={'email': 'new@example.com', 'password': 'NewPass123', 'full_name': 'New User'})
+
+
+def scenario_login(client, tokens, app):
+    client.post('/api/auth/login',
+        json={'email': 'USER@example.com', 'password': 'UserPass123'})
+
+
+def scenario_profile(client, tokens, app):
+    client.get('/api/users/profile', headers=_headers(tokens['user']))
+    client.get('/api/auth/me', headers=_headers(tokens['user']))
+
+
+def scenario_update_profile(client, tokens, app):
+    client.put('/api/users/profile', headers=_headers(tokens['user']),
+        json={'full_name': 'Renamed', 'email': 'renamed@example.com'})
+
+
+def scenario_change_password(client, tokens, app):
+    client.put('/api/users/password', headers=_headers(tokens['user']),
+        json={'current_password': 'UserPass123', 'new_password': 'ChangedPass123'})
+
+
+def scenario_refresh_and_logout(client, tokens, app):
+    refreshed = json.loads(client.post('/api/auth/refresh',
+        json={'refresh_token': tokens['user']['refresh_token']}).data)
+    client.post('/api/auth/refresh', json={'refresh_token': tokens['user']['refresh_token']})
+    client.post('/api/auth/logout', headers={'Authorization': f'Bearer {refreshed["token"]}'},
+        json={'refresh_token': refreshed['refresh_token']})
+    client.get('/api/auth/me', headers={'Authorization': f'Bearer {refreshed["token"]}'})
+
+
+def scenario_admin_listing(client, tokens, app):
+    headers = _headers(tokens['admin'])
+    for query in ('', 'count=cached', 'count=none', 'page=2&per_page=5',
+                  'status=active', 'role=user&count=cached', 'status=inactive&role=user&count=cached'):
+        client.get(f'/api/admin/users?{query}', headers=headers)
+
+
+def scenario_admin_cursor(client, tokens, app):
+    headers = _headers(tokens['admin'])
+    page = json.loads(client.get('/api/admin/users?per_page=5&after=', headers=headers).data)
+    client.get(f'/api/admin/users?per_page=5&after={page["next_cursor"]}', headers=headers)
+    client.get(f'/api/admin/users?per_page=5&status=active&after={page["next_cursor"]}', headers=headers)
+
+
+def scenario_admin_search(client, tokens, app):
+    headers = _headers(tokens['admin'])
+    client.get('/api/admin/users/search?q=user 1', headers=headers)
+    client.get('/api/admin/users/search?q=exam&limit=5', headers=headers)
+
+
+def scenario_admin_status(client, tokens, app):
+    headers = _headers(tokens['admin'])
+    user_id = _target_user_id(app)
+    client.put(f'/api/admin/users/{user_id}/deactivate', headers=headers)
+    client.put(f'/api/admin/users/{user_id}/activate', headers=headers)
+
+
+def scenario_admin_bulk(client, tokens, app):
+    headers = _headers(tokens['admin'])
+    user_id = _target_user_id(app)
+    client.put('/api/admin/users/bulk/deactivate', headers=headers, json={'ids': [user_id, 9999]})
+    client.put('/api/admin/users/bulk/activate', headers=headers,
+        json={'filter': {'role': 'user', 'status': 'inactive'}})
+    client.put('/api/admin/users/bulk/deactivate', headers=headers, json={'filter': {'status': 'active'}})
+
+
+def scenario_stateless_auth(client, tokens, app):
+    app.config['AUTH_STATELESS'] = True
+    client.get('/api/admin/users?count=none', headers=_headers(tokens['admin']))
+
+
+SCENARIOS = [
+    scenario_signup,
+    scenario_login,
+    scenario_profile,
+    scenario_update_profile,
+    scenario_change_password,
+    scenario_refresh_and_logout,
+    scenario_admin_listing,
+    scenario_admin_cursor,
+    scenario_admin_search,
+    scenario_admin_status,
+    scenario_admin_bulk,
+    scenario_stateless_auth,
+]
+
+
+def _full_scans(statements):
+    """EXPLAIN QUERY PLAN each statement; return the ones that scan a table or sort"""
+    problems = []
+    connection = db.session.connection()
+    for statement, parameters in statements:
+        plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+        for row in plan:
+            detail = row[-1]
+            # FTS5 lookups show up as "SCAN users_fts VIRTUAL TABLE INDEX ..."
+            scan = detail.startswith('SCAN ') and ' USING ' not in detail and 'VIRTUAL TABLE' not in detail
+            if scan or 'TEMP B-TREE' in detail:
+                problems.append(f'{detail}\n    {" ".join(statement.split())}')
+    return problems
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS, ids=lambda s: s.__name__[len('scenario_'):])
+def test_blueprint_queries_use_indexes(scenario, client, app, tokens, captured):
+    """Test no query issued by the blueprints falls back to a full table scan"""
+    scenario(client, tokens, app)
+
+    assert captured, 'scenario issued no queries'
+    assert _full_scans(captured) == []
+
+
+def test_full_scan_detection(app):
+    """Test the plan check flags unindexed filters and sorts"""
+    problems = _full_scans([
+        ('SELECT id FROM users WHERE full_name = ?', ('Test User',)),
+        ('SELECT id FROM users WHERE status = ? ORDER BY last_login', ('active',)),
+    ])
+
+    assert len(problems) == 2
@@ -0,0 +1,146 @@
+import pytest
+import json
+from app import create_app, db
+from app.models import User
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for making requests"""
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(client, app):
+    """Create an admin plus a few users to search; return admin auth headers"""
+    with app.app_context():
+        people = [
+            ('alice.smith@example.com', 'Alice Smith'),
+            ('bob.jones@example.com', 'Bob Jones'),
+            ('carol@smithfield.org', 'Carol White'),
+            ('dave@example.com', 'Dave Smithers'),
+        ]
+        for email, full_name in people:
+            user = User(email=email, full_name=full_name, role='user', status='active')
+            user.password_hash = 'unused'
+            db.session.add(user)
+
+        admin = User(
+            email='admin@example.com',
+            full_name='Admin User',
+            role='admin',
+            status='active'
+        )
+        admin.set_password('AdminPass123')
+        db.session.add(admin)
+        db.session.commit()
+
+    response = client.post('/api/auth/login',
+        json={
+            'email': 'admin@example.com',
+            'password': 'AdminPass123'
+        }
+    )
+
+    data = json.loads(response.data)
+    return {'Authorization': f'Bearer {data["token"]}'}
+
+
+def _search(client, headers, q, **params):
+    response = client.get('/api/admin/users/search', headers=headers,
+                          query_string={'q': q, **params})
+    assert response.status_code == 200
+    return [user['email'] for user in json.loads(response.data)['users']]
+
+
+def test_search_uses_fts_index(client, app, admin_headers):
+    """Test SQLite searches go through the users_fts index"""
+    _search(client, admin_headers, 'alice')
+
+    assert app.extensions['search_fts'] is True
+
+
+def test_search_prefix_matches_email_and_name(client, admin_headers):
+    """Test terms match word prefixes in either column"""
+    assert _search(client, admin_headers, 'ali') == ['alice.smith@example.com']
+    assert _search(client, admin_headers, 'JON') == ['bob.jones@example.com']
+    assert set(_search(client, admin_headers, 'smith')) == {
+        'alice.smith@example.com', 'carol@smithfield.org', 'dave@example.com'
+    }
+
+
+def test_search_requires_every_term(client, admin_headers):
+    """Test multi-word queries narrow the results"""
+    assert _search(client, admin_headers, 'smith alice') == ['alice.smith@example.com']
+    assert _search(client, admin_headers, 'smith bob') == []
+
+
+def test_search_ranks_best_match_first(client, admin_headers):
+    """Test a user matching in both columns outranks single-column matches"""
+    results = _search(client, admin_headers, 'smith')
+
+    assert results[0] == 'alice.smith@example.com'
+
+
+def test_search_respects_limit(client, admin_headers):
+    """Test the limit parameter caps the result count"""
+    assert len(_search(client, admin_headers, 'smith', limit=2)) == 2
+
+
+def test_search_index_follows_updates_and_deletes(client, app, admin_headers):
+    """Test the triggers keep the index in step with the users table"""
+    with app.app_context():
+        bob = User.find_by_email('bob.jones@example.com')
+        bob.full_name = 'Robert Jones'
+        dave = User.find_by_email('dave@example.com')
+        db.session.delete(dave)
+        db.session.commit()
+
+    assert _search(client, admin_headers, 'bob jon') == ['bob.jones@example.com']
+    assert _search(client, admin_headers, 'robert') == ['bob.jones@example.com']
+    assert 'dave@example.com' not in _search(client, admin_headers, 'smith')
+
+
+def test_search_like_fallback(client, app, admin_headers):
+    """Test backends without FTS5 get the same matches through LIKE"""
+    app.extensions['search_fts'] = False
+
+    assert _search(client, admin_headers, 'ali') == ['alice.smith@example.com']
+    assert _search(client, admin_headers, 'smith alice') == ['alice.smith@example.com']
+    assert _search(client, admin_headers, '100%') == []
+
+
+def test_search_requires_query(client, admin_headers):
+    """Test an empty or punctuation-only query"""
+    response = client.get('/api/admin/users/search?q=', headers=admin_headers)
+    assert response.status_code == 400
+
+    assert _search(client, admin_headers, '"*') == []
+
+
+def test_search_non_admin(client, admin_headers):
+    """Test regular users cannot search"""
+    response = client.post('/api/auth/signup',
+        json={
+            'email': 'user@example.com',
+            'password': 'UserPass123',
+            'full_name': 'Regular User'
+        }
+    )
+    headers = {'Authorization': f'Bearer {json.loads(response.data)["token"]}'}
+
+    response = client.get('/api/admin/users/search?q=alice', headers=headers)
+
+    assert response.status_code == 403
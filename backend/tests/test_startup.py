@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+from app import create_app, db
+from app.models import User
+from app.validation import check_email
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Kept in step with benchmarks/bench_startup.py
+LAZY_MODULES = ('bcrypt', 'jwt', 'email_validator', 'flask_migrate', 'alembic',
+                'argon2', 'multiprocessing', 'concurrent.futures.process')
+
+
+def test_create_app_defers_heavy_imports():
+    """Test a fresh process builds the app without loading first-use dependencies"""
+    code = (
+        'import sys\n'
+        'from app import create_app\n'
+        'create_app("testing")\n'
+        f'print(",".join(name for name in {LAZY_MODULES!r} if name in sys.modules))\n'
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
+
+
+def test_lazy_dependencies_load_on_first_use():
+    """Test hashing, tokens and email validation still work once called"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        user = User(email='user@example.com', full_name='Test User', role='user', status='active')
+        user.set_password('UserPass123')
+        db.session.add(user)
+        db.session.commit()
+
+        assert user.check_password('UserPass123')
+        assert User.verify_token(user.generate_token())['user_id'] == user.id
+        assert check_email('user@example.com') is None
+        assert check_email('not-an-email').message.startswith('Invalid email')
+        db.session.remove()
+        db.drop_all()
+
+
+def test_migrate_loads_with_db_commands():
+    """Test the flask db commands are always there and set up Flask-Migrate when used"""
+    app = create_app('testing')
+    assert 'migrate' not in app.extensions
+
+    result = app.test_cli_runner().invoke(args=['db', '--help'])
+    assert result.exit_code == 0
+    assert 'upgrade' in result.output
+    assert app.extensions['migrate'].db is db
@@ -50,6 +50,26 @@ def test_get_profile(client, auth_headers):
     assert 'created_at' in data
 
 
+
+def test_get_profile_conditional(client, auth_headers):
+    """Test an unchanged profile answers 304 until it is updated"""
+    response = client.get('/api/users/profile', headers=auth_headers)
+    etag = response.headers['ETag']
+    assert response.headers['Last-Modified']
+    assert 'no-cache' in response.headers['Cache-Control']
+
+    response = client.get('/api/users/profile', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+    client.put('/api/users/profile', headers=auth_headers, json={'full_name': 'Changed Name'})
+
+    response = client.get('/api/users/profile', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert json.loads(response.data)['full_name'] == 'Changed Name'
+
 def test_update_profile_name(client, auth_headers):
     """Test updating user name"""
     response = client.put('/api/users/profile',
@@ -0,0 +1,93 @@
+import pytest
+import json
+from app import create_app, db
+from app.schemas import IMPORT_ROW, PASSWORD_CHANGE, PROFILE_UPDATE, SIGNUP
+from app.validation import check_email, check_password_strength
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for making requests"""
+    return app.test_client()
+
+
+def test_schema_normalizes_in_one_pass():
+    """Test valid payloads come back stripped and lowercased"""
+    values, error = SIGNUP.validate({
+        'email': '  New.User@Example.COM ', 'password': ' Pass 1234a ', 'full_name': ' New User '
+    })
+    assert error is None
+    assert values == {'email': 'new.user@example.com', 'password': ' Pass 1234a ', 'full_name': 'New User'}
+
+
+def test_schema_reports_missing_fields_first():
+    """Test every missing field is listed, ahead of other errors, with a prebuilt error"""
+    _, error = SIGNUP.validate({'email': 'not-an-email', 'full_name': ''})
+    assert error.message == 'Missing required fields: password, full_name'
+    assert SIGNUP.validate({'email': 'x'})[1] is SIGNUP.validate({'email': 'y'})[1]
+
+    assert SIGNUP.validate(None)[1].message == 'Missing required fields: email, password, full_name'
+    assert PASSWORD_CHANGE.validate({'new_password': 'x'})[1].message == \
+        'Current password and new password are required'
+
+
+def test_schema_optional_fields():
+    """Test optional fields are only checked when sent"""
+    assert PROFILE_UPDATE.validate({})[1].message == 'No data provided'
+    assert PROFILE_UPDATE.validate({'role': 'admin'})[1].message == 'No valid fields to update'
+    assert PROFILE_UPDATE.validate({'full_name': '  '})[1].message == 'Full name cannot be empty'
+    assert PROFILE_UPDATE.validate({'email': 'bad'})[1].message.startswith('Invalid email')
+    assert PROFILE_UPDATE.validate({'full_name': ' Ann '}) == ({'full_name': 'Ann'}, None)
+
+    values, error = IMPORT_ROW.validate({'email': 'a@example.com', 'password': 'APass1234', 'full_name': 'A',
+                                         'role': ''})
+    assert error is None
+    assert (values['role'], values['status']) == ('user', 'active')
+    _, error = IMPORT_ROW.validate({'email': 'a@example.com', 'password': 'APass1234', 'full_name': 'A',
+                                    'status': 'gone'})
+    assert error.message == 'status must be one of: active, inactive'
+
+
+def test_password_strength_rules():
+    """Test the failing rule is reported in order"""
+    assert check_password_strength('GoodPass1') is None
+    assert check_password_strength('Ab1').message == 'Password must be at least 8 characters long'
+    assert 'uppercase' in check_password_strength('lowercase1').message
+    assert 'lowercase' in check_password_strength('UPPERCASE1').message
+    assert 'digit' in check_password_strength('NoDigitsHere').message
+
+
+def test_email_results_are_cached():
+    """Test repeated addresses skip the email_validator parse"""
+    check_email.cache_clear()
+    assert check_email('cached@example.com') is None
+    error = check_email('cached@')
+    assert check_email('cached@example.com') is None
+    assert check_email('cached@') is error
+    assert check_email.cache_info().hits == 2
+
+
+def test_invalid_payload_response(client):
+    """Test a prebuilt error goes out as a normal JSON 400"""
+    response = client.post('/api/auth/login', json={'email': ['a@example.com'], 'password': 'x'})
+    assert response.status_code == 400
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.data) == {
+        'error': 'Bad Request', 'message': 'email must be a string', 'status': 400
+    }
+
+    response = client.post('/api/auth/signup', json={'email': 'a@example.com'})
+    assert response.status_code == 400
+    assert json.loads(response.data)['message'] == 'Missing required fields: password, full_name'
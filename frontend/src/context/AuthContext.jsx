@@ -20,9 +20,10 @@ export const AuthProvider = ({ children }) => {
 
     const login = async (email, password) => {
         const response = await authAPI.login({ email, password });
-        const { token, user } = response.data;
+        const { token, refresh_token, user } = response.data;
 
         localStorage.setItem('token', token);
+        localStorage.setItem('refresh_token', refresh_token);
         localStorage.setItem('user', JSON.stringify(user));
         setUser(user);
 
@@ -31,9 +32,10 @@ export const AuthProvider = ({ children }) => {
 
     const signup = async (email, password, full_name) => {
         const response = await authAPI.signup({ email, password, full_name });
-        const { token, user } = response.data;
+        const { token, refresh_token, user } = response.data;
 
         localStorage.setItem('token', token);
+        localStorage.setItem('refresh_token', refresh_token);
         localStorage.setItem('user', JSON.stringify(user));
         setUser(user);
 
@@ -41,7 +43,10 @@ export const AuthProvider = ({ children }) => {
     };
 
     const logout = () => {
+        // Revoke the token server-side; local state is cleared regardless
+        authAPI.logout().catch(() => {});
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         localStorage.removeItem('user');
         setUser(null);
     };
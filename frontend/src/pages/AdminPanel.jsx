@@ -9,6 +9,8 @@ export const AdminPanel = () => {
     const [page, setPage] = useState(1);
     const [totalPages, setTotalPages] = useState(1);
     const [message, setMessage] = useState({ type: '', text: '' });
+    const [searchQuery, setSearchQuery] = useState('');
+    const [searching, setSearching] = useState(false);
 
     // Confirmation modal state
     const [confirmModal, setConfirmModal] = useState({
@@ -33,6 +35,28 @@ export const AdminPanel = () => {
         }
     };
 
+    const searchUsers = async (query) => {
+        if (!query.trim()) {
+            setSearching(false);
+            fetchUsers(1);
+            return;
+        }
+
+        setLoading(true);
+        try {
+            const response = await adminAPI.searchUsers(query.trim());
+            setUsers(response.data.users);
+            setSearching(true);
+        } catch (err) {
+            setMessage({ type: 'error', text: 'Failed to search users' });
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    // Reload whichever view is showing after an action
+    const refreshUsers = () => (searching ? searchUsers(searchQuery) : fetchUsers(page));
+
     useEffect(() => {
         fetchUsers();
     }, []);
@@ -70,7 +94,7 @@ export const AdminPanel = () => {
                     await adminAPI.activateUser(userId);
                     setMessage({ type: 'success', text: 'User activated successfully!' });
                     setTimeout(() => setMessage({ type: '', text: '' }), 3000);
-                    fetchUsers(page);
+                    refreshUsers();
                 } catch (err) {
                     setMessage({ type: 'error', text: err.response?.data?.message || 'Failed to activate user' });
                 } finally {
@@ -80,7 +104,7 @@ export const AdminPanel = () => {
                 }
             }
         });
-    }, [users, page]);
+    }, [users, page, searching, searchQuery]);
 
     const handleDeactivate = useCallback(async (e, userId) => {
         // Prevent event bubbling
@@ -113,7 +137,7 @@ export const AdminPanel = () => {
                     await adminAPI.deactivateUser(userId);
                     setMessage({ type: 'success', text: 'User deactivated successfully!' });
                     setTimeout(() => setMessage({ type: '', text: '' }), 3000);
-                    fetchUsers(page);
+                    refreshUsers();
                 } catch (err) {
                     console.error('Deactivate error:', err);
                     const errorMsg = err.response?.data?.message || 'Failed to deactivate user';
@@ -125,7 +149,7 @@ export const AdminPanel = () => {
                 }
             }
         });
-    }, [users, page]);
+    }, [users, page, searching, searchQuery]);
 
     return (
         <>
@@ -155,7 +179,25 @@ export const AdminPanel = () => {
 
                     <div className="card">
                         <div className="card-header">
-                            <h2 className="card-title">All Users</h2>
+                            <h2 className="card-title">{searching ? 'Search Results' : 'All Users'}</h2>
+                            <form
+                                className="flex gap-2"
+                                onSubmit={(e) => {
+                                    e.preventDefault();
+                                    searchUsers(searchQuery);
+                                }}
+                            >
+                                <input
+                                    type="search"
+                                    className="form-input"
+                                    placeholder="Search by name or email"
+                                    value={searchQuery}
+                                    onChange={(e) => setSearchQuery(e.target.value)}
+                                />
+                                <button type="submit" className="btn btn-primary btn-sm">
+                                    Search
+                                </button>
+                            </form>
                         </div>
 
                         {loading ? (
@@ -225,7 +267,7 @@ export const AdminPanel = () => {
                                 </div>
 
                                 {/* Pagination */}
-                                {totalPages > 1 && (
+                                {!searching && totalPages > 1 && (
                                     <div className="pagination">
                                         <button
                                             className="pagination-btn"
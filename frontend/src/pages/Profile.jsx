@@ -47,10 +47,13 @@ export const Profile = () => {
         setLoading(true);
 
         try {
-            await userAPI.changePassword({
+            const response = await userAPI.changePassword({
                 current_password: passwordData.current_password,
                 new_password: passwordData.new_password
             });
+            // Changing the password revokes older tokens, so keep the new one
+            localStorage.setItem('token', response.data.token);
+            localStorage.setItem('refresh_token', response.data.refresh_token);
             setMessage({ type: 'success', text: 'Password changed successfully!' });
             setPasswordData({ current_password: '', new_password: '', confirm_password: '' });
         } catch (err) {
@@ -20,12 +20,47 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Share one refresh call between concurrent 401s, since refresh tokens rotate
+let refreshPromise = null;
+
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refresh_token');
+    refreshPromise = axios
+      .post(`${API_URL}/auth/refresh`, { refresh_token: refreshToken })
+      .then((response) => {
+        localStorage.setItem('token', response.data.token);
+        localStorage.setItem('refresh_token', response.data.refresh_token);
+        return response.data.token;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 // Handle errors
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const original = error.config;
+
+    // Access tokens are short-lived: try one refresh before logging out
+    if (error.response?.status === 401 && localStorage.getItem('refresh_token') && !original._retried) {
+      original._retried = true;
+      try {
+        const token = await refreshAccessToken();
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch (refreshError) {
+        // Fall through to logout
+      }
+    }
+
     if (error.response?.status === 401) {
       localStorage.removeItem('token');
+      localStorage.removeItem('refresh_token');
       localStorage.removeItem('user');
       window.location.href = '/login';
     }
@@ -37,7 +72,12 @@ api.interceptors.response.use(
 export const authAPI = {
   signup: (data) => api.post('/auth/signup', data),
   login: (data) => api.post('/auth/login', data),
-  logout: () => api.post('/auth/logout'),
+  // Tokens are read eagerly because the caller clears storage right after
+  logout: () => api.post(
+    '/auth/logout',
+    { refresh_token: localStorage.getItem('refresh_token') },
+    { headers: { Authorization: `Bearer ${localStorage.getItem('token')}` } }
+  ),
   getCurrentUser: () => api.get('/auth/me'),
 };
 
@@ -51,7 +91,9 @@ export const userAPI = {
 // Admin endpoints
 export const adminAPI = {
   getUsers: (page = 1, perPage = 10) => 
-    api.get(`/admin/users?page=${page}&per_page=${perPage}`),
+    api.get(`/admin/users?page=${page}&per_page=${perPage}&count=cached`),
+  searchUsers: (query, limit = 20) =>
+    api.get('/admin/users/search', { params: { q: query, limit } }),
   activateUser: (userId) => api.put(`/admin/users/${userId}/activate`),
   deactivateUser: (userId) => api.put(`/admin/users/${userId}/deactivate`),
 };